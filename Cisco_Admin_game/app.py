@@ -4,21 +4,41 @@ import json
 import re
 import os
 import random
+import sys
 from datetime import datetime
 
 BASE_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, '..')))
+from learning_common.question_bank import QuestionBank, get_bank
+from learning_common.storage import open_store
+from learning_common.tk_history import HistoryPager
+from learning_common.tk_study_search import StudySearchBar
+from device_sim import LabSimulation
+from ios_grammar import load_grammar, split_commands
+from lab_matcher import LabMatcher
+from scenario_index import load_index
+
 QUESTIONS_FILE = os.path.join(BASE_DIR, 'questions.json')
 STUDY_FILE = os.path.join(BASE_DIR, 'study_content.md')
-SCORES_FILE = os.path.join(BASE_DIR, 'scores.json')
 LABS_FILE = os.path.join(BASE_DIR, 'labs.json')
 SCENARIOS_FILE = os.path.join(BASE_DIR, 'scenarios.json')
+# search index over scenarios.json and labs.json, rebuilt when either file changes
+SCENARIO_INDEX_FILE = os.path.join(BASE_DIR, 'scenario_index_cache.json')
+SCENARIO_RESULTS_LIMIT = 500
+DIFFICULTY_ORDER = ['beginner', 'easy', 'intermediate', 'medium', 'advanced', 'hard']
+
+# saved scores go through the configured store (scores.jsonl by default, SQLite with LEARNING_STORAGE=sqlite);
+# the old scores.json was stored oldest first
+STORE = open_store(BASE_DIR, 'cisco_admin', legacy_scores_newest_first=False)
+HISTORY_PAGE_SIZE = 20
 
 class CiscoAdminGame(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title('Cisco Admin Learning Game')
         self.geometry('900x600')
-        self.questions = self.load_questions()
+        self.bank = self.load_questions()
+        self.questions = self.bank.questions
         self.create_widgets()
         self.current_quiz = []
         self.current_index = 0
@@ -26,12 +46,10 @@ class CiscoAdminGame(tk.Tk):
 
     def load_questions(self):
         try:
-            with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('questions', [])
+            return get_bank(QUESTIONS_FILE)
         except Exception as e:
             messagebox.showerror('Error', f'Failed to load questions: {e}')
-            return []
+            return QuestionBank([])
 
     def create_widgets(self):
         notebook = ttk.Notebook(self)
@@ -40,15 +58,9 @@ class CiscoAdminGame(tk.Tk):
         # Study tab
         study_frame = ttk.Frame(notebook)
         notebook.add(study_frame, text='Study')
-        # Search bar for study content
+        # Search bar for study content (filled in once the text widget exists)
         search_frame = ttk.Frame(study_frame)
         search_frame.pack(fill='x', padx=6, pady=(6,2))
-        ttk.Label(search_frame, text='Search Study:').pack(side='left')
-        self.study_search_var = tk.StringVar()
-        self.study_search_entry = ttk.Entry(search_frame, textvariable=self.study_search_var, width=60)
-        self.study_search_entry.pack(side='left', padx=(6,4))
-        ttk.Button(search_frame, text='Find', command=self.search_study).pack(side='left')
-        ttk.Button(search_frame, text='Clear', command=self.clear_search).pack(side='left', padx=4)
         # place study text inside a frame with a vertical scrollbar
         study_text_frame = ttk.Frame(study_frame)
         study_text_frame.pack(fill='both', expand=True, padx=6, pady=(0,6))
@@ -57,11 +69,10 @@ class CiscoAdminGame(tk.Tk):
         self.study_text.configure(yscrollcommand=vsb.set)
         vsb.pack(side='right', fill='y')
         self.study_text.pack(side='left', fill='both', expand=True)
+        # highlights matches as you type; Enter steps through them
+        self.study_search = StudySearchBar(search_frame, self.study_text, label='Search Study:', width=60)
+        self.study_search.pack(side='left', fill='x')
         self.load_study()
-        # configure search tag
-        self.study_text.tag_configure('search', background='yellow')
-        # bind Enter in search entry
-        self.study_search_entry.bind('<Return>', lambda e: self.search_study())
 
         # Quiz tab
         quiz_frame = ttk.Frame(notebook)
@@ -108,8 +119,14 @@ class CiscoAdminGame(tk.Tk):
         # History tab
         history_frame = ttk.Frame(notebook)
         notebook.add(history_frame, text='History')
-        ttk.Button(history_frame, text='View Scores', command=self.view_scores).pack(pady=8)
-        ttk.Button(history_frame, text='Clear Scores', command=self.clear_scores).pack()
+        self.history_pager = HistoryPager(history_frame, STORE.scores, STORE.score_count, self._format_score,
+                                          page_size=HISTORY_PAGE_SIZE)
+        self.history_pager.pack(fill='both', expand=True, padx=10, pady=8)
+        btns = ttk.Frame(history_frame)
+        btns.pack(pady=(0, 8))
+        ttk.Button(btns, text='View Scores', command=self.view_scores).pack(side=tk.LEFT, padx=4)
+        ttk.Button(btns, text='Clear Scores', command=self.clear_scores).pack(side=tk.LEFT, padx=4)
+        self.history_pager.refresh()
 
         # Labs tab - guided, step-by-step CLI labs
         labs_frame = ttk.Frame(notebook)
@@ -139,10 +156,22 @@ class CiscoAdminGame(tk.Tk):
         self.lab_step_label.pack(anchor='w')
         self.lab_cmd_entry = ttk.Entry(right, width=120)
         self.lab_cmd_entry.pack(fill='x', pady=4)
-        ttk.Button(right, text='Submit Command', command=self.submit_lab_command).pack(pady=4)
+        lab_btns = ttk.Frame(right)
+        lab_btns.pack(pady=4)
+        ttk.Label(lab_btns, text='Device:').pack(side='left')
+        self.lab_device_var = tk.StringVar()
+        self.lab_device_combo = ttk.Combobox(lab_btns, textvariable=self.lab_device_var, state='readonly', width=14)
+        self.lab_device_combo.pack(side='left', padx=(2, 8))
+        self.lab_device_combo.bind('<<ComboboxSelected>>', self.select_lab_device)
+        ttk.Button(lab_btns, text='Submit Command', command=self.submit_lab_command).pack(side='left', padx=4)
+        ttk.Button(lab_btns, text='Previous Step', command=self.previous_lab_step).pack(side='left', padx=4)
+        ttk.Button(lab_btns, text='Restart Lab', command=self.restart_lab).pack(side='left', padx=4)
         self.lab_output = tk.Text(right, height=10, wrap='word')
         self.lab_output.pack(fill='both', expand=True)
         self.labs = self.load_labs()
+        # compiled once here; submit_lab_command and submit_answer only look commands up
+        self.grammar = self.load_grammar()
+        self.lab_matchers = [LabMatcher(lab, self.grammar) for lab in self.labs]
         for lab in self.labs:
             self.labs_listbox.insert(tk.END, lab.get('title'))
 
@@ -156,11 +185,17 @@ class CiscoAdminGame(tk.Tk):
         self.scenario_search_entry = ttk.Entry(top_s, textvariable=self.scenario_search_var, width=50)
         self.scenario_search_entry.pack(side='left', padx=(6,4))
         ttk.Button(top_s, text='Find', command=self.search_scenarios).pack(side='left')
-        ttk.Button(top_s, text='Clear', command=lambda: self.populate_scenarios_list(self.scenarios)).pack(side='left', padx=4)
+        ttk.Button(top_s, text='Clear', command=lambda: self.scenario_search_var.set('')).pack(side='left', padx=4)
         ttk.Label(top_s, text='Difficulty:').pack(side='left', padx=(12,4))
         self.scenario_diff_var = tk.StringVar(value='all')
-        ttk.Combobox(top_s, textvariable=self.scenario_diff_var, values=['all','beginner','intermediate','advanced'], width=12).pack(side='left')
+        self.scenario_diff_combo = ttk.Combobox(top_s, textvariable=self.scenario_diff_var, values=['all'], width=12, state='readonly')
+        self.scenario_diff_combo.pack(side='left')
+        self.scenario_diff_combo.bind('<<ComboboxSelected>>', lambda e: self.search_scenarios(live=True))
+        self.scenario_facets_label = ttk.Label(top_s, text='')
+        self.scenario_facets_label.pack(side='left', padx=(12,0))
         self.scenario_search_entry.bind('<Return>', lambda e: self.search_scenarios())
+        # results follow the query as it is typed; the index answers each keystroke
+        self.scenario_search_var.trace_add('write', lambda *a: self.search_scenarios(live=True))
 
         main_s = ttk.Frame(scenarios_frame)
         main_s.pack(fill='both', expand=True, padx=6, pady=6)
@@ -181,7 +216,10 @@ class CiscoAdminGame(tk.Tk):
 
         # load scenarios
         self.scenarios = self.load_scenarios()
-        self.populate_scenarios_list(self.scenarios)
+        self.scenario_index = load_index(self.scenarios, self.labs, [SCENARIOS_FILE, LABS_FILE], SCENARIO_INDEX_FILE)
+        facets = sorted(self.scenario_index.facets, key=lambda d: (DIFFICULTY_ORDER.index(d) if d in DIFFICULTY_ORDER else len(DIFFICULTY_ORDER), d))
+        self.scenario_diff_combo.config(values=['all'] + [d for d in facets if d])
+        self.search_scenarios(live=True)
 
     def load_study(self):
         content = ''
@@ -190,41 +228,9 @@ class CiscoAdminGame(tk.Tk):
                 content = f.read()
         except Exception:
             content = '# Study content not found.\nAdd `study_content.md` to the game folder.'
-        # keep a copy for searching
-        self.study_content = content
         self.study_text.delete('1.0', tk.END)
         self.study_text.insert(tk.END, content)
-
-    def search_study(self):
-        query = (self.study_search_var.get() or '').strip()
-        self.clear_search()
-        if not query:
-            messagebox.showinfo('Search', 'Enter a search term or command to find in the study guide.')
-            return
-        start = '1.0'
-        found = 0
-        while True:
-            idx = self.study_text.search(query, start, stopindex=tk.END, nocase=1)
-            if not idx:
-                break
-            end = f"{idx}+{len(query)}c"
-            self.study_text.tag_add('search', idx, end)
-            found += 1
-            start = end
-        if found:
-            # show first occurrence
-            first = self.study_text.tag_ranges('search')
-            if first:
-                self.study_text.see(first[0])
-            messagebox.showinfo('Search Results', f'Found {found} matches for "{query}"')
-        else:
-            messagebox.showinfo('Search Results', f'No matches for "{query}"')
-
-    def clear_search(self):
-        try:
-            self.study_text.tag_remove('search', '1.0', tk.END)
-        except Exception:
-            pass
+        self.study_search.load(content)
 
     def shuffle_all(self):
         random.shuffle(self.questions)
@@ -239,6 +245,13 @@ class CiscoAdminGame(tk.Tk):
         except Exception:
             return []
 
+    def load_grammar(self):
+        """IOS command grammar from the command inventories plus every command the labs and CLI questions expect."""
+        extra = [e for lab in self.labs for step in lab.get('steps', []) for e in step.get('expected', [])
+                 if isinstance(e, str) and not e.startswith('re:')]
+        extra += [a for q in self.questions if q.get('type') == 'cli' for a in q.get('accepted_answers', [])]
+        return load_grammar(extra=extra)
+
     def load_scenarios(self):
         if not os.path.exists(SCENARIOS_FILE):
             return []
@@ -254,28 +267,26 @@ class CiscoAdminGame(tk.Tk):
             title = f"[{s.get('difficulty','?')}] {s.get('title') }"
             self.scenarios_listbox.insert(tk.END, title)
 
-    def search_scenarios(self):
+    def search_scenarios(self, live=False):
         query = (self.scenario_search_var.get() or '').strip().lower()
         diff = (self.scenario_diff_var.get() or 'all').lower()
-        results = []
-        for s in self.scenarios:
-            if diff != 'all' and s.get('difficulty','').lower() != diff:
-                continue
-            hay = ' '.join([
-                s.get('title',''), s.get('summary',''), s.get('scenario_description',''), s.get('full_config_snippet','')
-            ]).lower()
-            # also search within steps and commands
-            for st in s.get('steps',[]):
-                hay += ' ' + ' '.join([str(x).lower() for x in st.get('commands',[])])
-                hay += ' ' + (st.get('title','') or '').lower()
-            if not query or query in hay:
-                results.append(s)
-        if not results:
+        hits = self.scenario_index.search(query, diff, limit=SCENARIO_RESULTS_LIMIT)
+        results = [self.scenarios[pos] if kind == 'scenario' else self.lab_as_scenario(self.labs[pos]) for kind, pos, _ in hits]
+        counts = self.scenario_index.facet_counts(query)
+        self.scenario_facets_label.config(text='  '.join(f'{d or "unrated"}: {n}' for d, n in sorted(counts.items())))
+        if not results and not live:
             messagebox.showinfo('Search Results', f'No scenarios match "{query}" with difficulty {diff}.')
         self.populate_scenarios_list(results)
         # temporarily store last search results to map listbox index
         self._last_scenario_results = results
 
+    def lab_as_scenario(self, lab):
+        """A lab from labs.json in the shape render_scenario_details shows."""
+        steps = [{'step': n, 'title': st.get('title', ''), 'notes': st.get('description', ''),
+                  'commands': [c for e in st.get('expected', []) if isinstance(e, str) and not e.startswith('re:') for c in split_commands(e)]}
+                 for n, st in enumerate(lab.get('steps', []), start=1)]
+        return {'title': f"Lab: {lab.get('title', '')}", 'difficulty': lab.get('difficulty') or '?', 'summary': lab.get('description', ''), 'steps': steps}
+
     def show_selected_scenario(self):
         sel = self.scenarios_listbox.curselection()
         if not sel:
@@ -336,11 +347,11 @@ class CiscoAdminGame(tk.Tk):
 
     def start_quiz(self):
         diff = self.difficulty_var.get()
-        self.current_quiz = [q for q in self.questions if q.get('difficulty') == diff]
+        # sampling the whole difficulty pool returns it in shuffled order
+        self.current_quiz = self.bank.sample(self.bank.count(diff), difficulty=diff)
         if not self.current_quiz:
             messagebox.showwarning('No Questions', f'No questions found for difficulty: {diff}')
             return
-        random.shuffle(self.current_quiz)
         self.current_index = 0
         self.score = 0
         self.review_items = []
@@ -432,9 +443,9 @@ class CiscoAdminGame(tk.Tk):
             messagebox.showinfo('Result', f'Timeout. Correct answer: {correct}')
         else:
             if qtype == 'cli':
-                # compare against accepted answers list (case-insensitive)
+                # compare against accepted answers list (case-insensitive, IOS abbreviations allowed)
                 accepted = q.get('accepted_answers', [])
-                ok = any(a.strip().lower() == selected.lower() for a in accepted)
+                ok = any(self.grammar.same_commands(selected, a) for a in accepted)
                 if ok:
                     self.score += 1
                     messagebox.showinfo('Result', 'Correct CLI command')
@@ -466,6 +477,12 @@ class CiscoAdminGame(tk.Tk):
             return
         idx = sel[0]
         self.current_lab = self.labs[idx]
+        self.current_matcher = self.lab_matchers[idx]
+        # one simulated device per router/switch in the diagram; lab_snapshots[i] is the state at the start of step i
+        self.lab_sim = LabSimulation(self.current_lab, self.grammar)
+        self.lab_snapshots = []
+        self.lab_device_combo.config(values=list(self.lab_sim.devices))
+        self.lab_device_var.set(self.lab_sim.active)
         self.lab_step = 0
         self.lab_title.config(text=self.current_lab.get('title', 'Lab'))
         # ensure markdown doc exists and open it
@@ -486,6 +503,9 @@ class CiscoAdminGame(tk.Tk):
         self.lab_step_label.config(text=f"Step {self.lab_step+1}/{len(steps)}: {step.get('title','')}")
         self.lab_cmd_entry.delete(0, tk.END)
         self.lab_output.delete('1.0', tk.END)
+        self.lab_progress = {}
+        del self.lab_snapshots[self.lab_step:]
+        self.lab_snapshots.append(self.lab_sim.snapshot())
         # draw diagram if available
         self.lab_canvas.delete('all')
         diagram = self.current_lab.get('diagram')
@@ -497,45 +517,58 @@ class CiscoAdminGame(tk.Tk):
             messagebox.showwarning('No Lab', 'Start a lab first')
             return
         steps = self.current_lab.get('steps', [])
+        if self.lab_step >= len(steps):
+            return
         step = steps[self.lab_step]
         entered = self.lab_cmd_entry.get().strip()
-        expected = step.get('expected', [])
-        ok = False
-        # check simulated responses first (ping/nslookup etc.)
-        sim = self.current_lab.get('simulated', {})
-        for pat,res in sim.items():
-            # support regex keys (prefix re:), otherwise exact/normalized match
-            if pat.startswith('re:'):
-                if re.search(pat[3:], entered, re.I):
-                    self.lab_output.insert(tk.END, f"{res}\n")
-            else:
-                if entered.lower() == pat.lower():
-                    self.lab_output.insert(tk.END, f"{res}\n")
-        # normalize and match expected patterns (support regex with re:)
-        def norm(s):
-            return re.sub(r'\s+', ' ', (s or '').strip().lower())
-        for e in expected:
-            if isinstance(e, str) and e.startswith('re:'):
-                try:
-                    if re.search(e[3:], entered, re.I):
-                        ok = True
-                        break
-                except re.error:
-                    pass
-            else:
-                if norm(e) == norm(entered) or norm(e) in norm(entered) or norm(entered) in norm(e):
-                    ok = True
-                    break
-        if ok:
+        result = self.current_matcher.match(self.lab_step, entered, self.lab_progress)
+        # every command runs on the active device; the lab's own simulated outputs (ping/nslookup etc.)
+        # take precedence over the device's generated output
+        echoes, generated = [], []
+        for command in split_commands(entered):
+            echoes.append(self.lab_sim.device.prompt() + command)
+            generated.extend(self.lab_sim.execute(command))
+        for line in echoes + (result.responses or generated):
+            self.lab_output.insert(tk.END, f"{line}\n")
+        if result.status == 'complete':
             out = step.get('success_output', 'Command accepted.')
             self.lab_output.insert(tk.END, out + '\n')
             self.lab_step += 1
+            self.lab_progress = {}
             self.after(300, self.show_lab_step)
+        elif result.status == 'partial':
+            self.lab_output.insert(tk.END, f"Accepted ({result.done}/{result.total} commands). Enter the next command.\n")
+            self.lab_cmd_entry.delete(0, tk.END)
         else:
-            # if no match, provide helpful hint showing normalized expected patterns
-            hints = [ (('re:' in e) and e) or re.sub(r'\s+', ' ', e.strip()) for e in expected ]
+            hints = self.current_matcher.hints(self.lab_step)
+            # IOS-style "% Ambiguous command" feedback when an abbreviation did not resolve
+            problems = [r.error for r in map(self.grammar.resolve, split_commands(entered)) if r.error and 'ambiguous' in r.error]
+            if problems:
+                self.lab_output.insert(tk.END, f"% {problems[0]}\n")
             self.lab_output.insert(tk.END, f"Incorrect command. Expected one of: {hints}\n")
 
+    def select_lab_device(self, event=None):
+        if hasattr(self, 'lab_sim') and self.lab_device_var.get() in self.lab_sim.devices:
+            self.lab_sim.active = self.lab_device_var.get()
+
+    def previous_lab_step(self):
+        if not hasattr(self, 'current_lab') or self.lab_step == 0:
+            return
+        self.lab_step = min(self.lab_step, len(self.lab_snapshots)) - 1
+        self._restore_lab_step()
+
+    def restart_lab(self):
+        if not hasattr(self, 'current_lab'):
+            return
+        self.lab_step = 0
+        self._restore_lab_step()
+
+    def _restore_lab_step(self):
+        # snapshots are copy-on-write, so going back is instant: nothing is replayed
+        self.lab_sim.restore(self.lab_snapshots[self.lab_step])
+        self.lab_device_var.set(self.lab_sim.active)
+        self.show_lab_step()
+
     def draw_lab_diagram(self, diagram):
         # simple renderer: draw nodes as rectangles with labels and straight links
         nodes = {n['id']: n for n in diagram.get('nodes', [])}
@@ -860,46 +893,33 @@ class CiscoAdminGame(tk.Tk):
             'total': total,
             'timestamp': datetime.utcnow().isoformat() + 'Z'
         }
-        data = []
         try:
-            if os.path.exists(SCORES_FILE):
-                with open(SCORES_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-        except Exception:
-            data = []
-        data.append(entry)
-        try:
-            with open(SCORES_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            messagebox.showinfo('Saved', 'Score saved to `scores.json`.')
+            STORE.add_score(entry)
+            messagebox.showinfo('Saved', 'Score saved.')
+            self.history_pager.reset()
         except Exception as e:
             messagebox.showerror('Error', f'Failed to save score: {e}')
 
+    def _format_score(self, e):
+        return f"{e.get('timestamp')} - {e.get('name')}: {e.get('score')}/{e.get('total')}"
+
     def view_scores(self):
-        if not os.path.exists(SCORES_FILE):
-            messagebox.showinfo('Scores', 'No scores saved yet.')
-            return
         try:
-            with open(SCORES_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            total = STORE.score_count()
         except Exception as e:
             messagebox.showerror('Error', f'Failed to read scores: {e}')
             return
-        text = ''
-        for e in data:
-            text += f"{e.get('timestamp')} - {e.get('name')}: {e.get('score')}/{e.get('total')}\n"
-        popup = tk.Toplevel(self)
-        popup.title('Scores')
-        txt = tk.Text(popup, wrap='word')
-        txt.pack(fill='both', expand=True)
-        txt.insert('1.0', text)
+        if not total:
+            messagebox.showinfo('Scores', 'No scores saved yet.')
+        # newest scores first, one page at a time
+        self.history_pager.reset()
 
     def clear_scores(self):
         if messagebox.askyesno('Clear', 'Clear all saved scores?'):
             try:
-                if os.path.exists(SCORES_FILE):
-                    os.remove(SCORES_FILE)
+                STORE.clear_scores()
                 messagebox.showinfo('Cleared', 'Scores cleared.')
+                self.history_pager.reset()
             except Exception as e:
                 messagebox.showerror('Error', f'Failed to clear scores: {e}')
 
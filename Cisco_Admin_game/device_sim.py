@@ -0,0 +1,582 @@
+"""Simulated IOS devices for the Cisco labs.
+
+Each router or switch in a lab's diagram becomes a Device holding its own
+running state: hostname, interfaces, VLANs, static routes and the other
+configuration sections (routing processes, DHCP pools, ACLs, lines).
+Configuration commands change that state; show and ping output is
+generated from it:
+
+    sim = LabSimulation(lab, grammar)
+    sim.execute('interface gi0/1')
+    sim.execute('ip address 10.0.10.1 255.255.255.0')
+    sim.execute('no shutdown')
+    print(sim.execute('show ip interface brief'))
+
+State is copy-on-write. snapshot() only marks the current sections as
+shared; the next command that changes a section copies that one section
+(interface records themselves are never changed in place, only replaced).
+restore() puts a snapshot back without replaying any commands, which is
+what stepping back or restarting a lab uses.
+
+The CLI is deliberately forgiving: configuration commands work without
+"configure terminal" first, a global command typed in a sub-mode leaves
+the sub-mode (as IOS does) and commands the model does not know are kept
+as plain configuration lines so they still show up in the running-config.
+"""
+import ipaddress
+import re
+from collections import namedtuple
+
+from ios_grammar import _unique_prefixes, interface_name, split_commands, tokens
+
+INTERFACE_DISPLAY = {
+    'ethernet': ('Ethernet', 'Et'), 'fastethernet': ('FastEthernet', 'Fa'),
+    'gigabitethernet': ('GigabitEthernet', 'Gi'), 'tengigabitethernet': ('TenGigabitEthernet', 'Te'),
+    'fortygigabitethernet': ('FortyGigabitEthernet', 'Fo'), 'hundredgige': ('HundredGigE', 'Hu'),
+    'serial': ('Serial', 'Se'), 'loopback': ('Loopback', 'Lo'), 'vlan': ('Vlan', 'Vl'),
+    'port-channel': ('Port-channel', 'Po'), 'tunnel': ('Tunnel', 'Tu'), 'null': ('Null', 'Nu'),
+}
+_IF_SPLIT_RE = re.compile(r'^([a-z-]+)(.*)$')
+_IPV4_IN_TEXT_RE = re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}\b')
+
+# commands run from exec mode; everything else is configuration
+EXEC_COMMANDS = {'show', 'ping', 'traceroute', 'copy', 'write', 'clear', 'debug', 'undebug', 'reload',
+                 'enable', 'disable', 'terminal', 'dir', 'more', 'verify', 'erase'}
+# exec commands that also have configuration forms with arguments ("enable secret ...");
+# outside exec mode those are configuration
+EXEC_CONFIG_FORMS = {'enable'}
+# mode commands are not always in the scanned inventory, so their abbreviations are resolved here
+_MODE_TABLE = _unique_prefixes(('configure', 'end', 'exit', 'enable', 'disable', 'do'), {'conf': 'configure', 'en': 'enable'})
+# sub-mode entered by a global command -> the first keywords that stay in it
+SUB_MODE_KEYWORDS = {
+    'if': {'ip', 'no', 'shutdown', 'description', 'switchport', 'encapsulation', 'channel-group', 'speed',
+           'duplex', 'spanning-tree', 'standby', 'vrrp', 'mtu', 'bandwidth', 'cdp', 'storm-control', 'nameif',
+           'security-level', 'service-policy', 'mpls', 'ipv6', 'tunnel', 'member', 'source-interface', 'vn-segment'},
+    'vlan': {'name', 'no', 'state', 'vn-segment'},
+    'router': {'network', 'redistribute', 'neighbor', 'router-id', 'passive-interface', 'default-information',
+               'area', 'no', 'auto-summary', 'address-family', 'bgp', 'maximum-paths', 'distance', 'timers'},
+    'pool': {'network', 'default-router', 'dns-server', 'option', 'lease', 'domain-name', 'no'},
+    'acl': {'permit', 'deny', 'remark', 'no'},
+    'line': {'login', 'password', 'transport', 'exec-timeout', 'logging', 'privilege', 'access-class', 'no'},
+    'section': {'match', 'set', 'class', 'police', 'priority', 'bandwidth', 'description', 'no'},
+}
+# "ip ..." commands that belong to an interface rather than the global config
+_INTERFACE_IP_COMMANDS = {'address', 'helper-address', 'access-group', 'ospf', 'nat', 'policy', 'dhcp',
+                          'proxy-arp', 'redirects', 'mtu', 'verify', 'igmp', 'pim'}
+
+Snapshot = namedtuple('Snapshot', 'data mode')
+LabSnapshot = namedtuple('LabSnapshot', 'devices active')
+
+
+def interface_display(name, short=False):
+    """'gigabitethernet0/1' -> 'GigabitEthernet0/1' (or 'Gi0/1' with short)."""
+    m = _IF_SPLIT_RE.match(name)
+    if not m or m.group(1) not in INTERFACE_DISPLAY:
+        return name
+    return INTERFACE_DISPLAY[m.group(1)][1 if short else 0] + m.group(2)
+
+
+def _interface_sort_key(name):
+    m = _IF_SPLIT_RE.match(name)
+    kind, rest = (m.group(1), m.group(2)) if m else (name, '')
+    return kind, [int(n) for n in re.findall(r'\d+', rest)]
+
+
+def _vlan_list(text):
+    out = []
+    for part in text.split(','):
+        lo, _, hi = part.partition('-')
+        if lo.isdigit() and (not hi or hi.isdigit()):
+            out.extend(range(int(lo), int(hi or lo) + 1))
+    return out
+
+
+_NEW_INTERFACE = {'description': '', 'address': None, 'shutdown': False, 'mode': None, 'access_vlan': None,
+                  'trunk_allowed': None, 'encapsulation': None, 'lines': ()}
+
+
+class Device:
+    """One router or switch: configuration state, CLI mode and output generation."""
+
+    SECTIONS = ('interfaces', 'vlans', 'routes', 'blocks', 'settings')
+
+    def __init__(self, name, kind='router', grammar=None):
+        self.kind = kind
+        self._canonical = grammar.canonical if grammar is not None else tokens
+        # interfaces: name -> record (replaced, never changed in place); vlans: id -> name;
+        # routes: (network, next hop) -> None; blocks: header -> tuple of lines (router, pool, acl ...);
+        # settings: 'hostname' and global lines
+        self._data = {
+            'interfaces': {}, 'vlans': {1: 'default'} if kind == 'switch' else {}, 'routes': {}, 'blocks': {},
+            'settings': {'hostname': name, 'lines': ()},
+        }
+        self._shared = set()
+        self.mode = ('exec',)       # ('config',), ('if', names), ('vlan', id), ('router'|'pool'|..., header)
+
+    # --- copy-on-write state ---------------------------------------------------
+
+    def _read(self, section):
+        return self._data[section]
+
+    def _write(self, section):
+        if section in self._shared:
+            self._data[section] = dict(self._data[section])
+            self._shared.discard(section)
+        return self._data[section]
+
+    def snapshot(self):
+        """Current state; later changes copy the sections they touch instead of altering this."""
+        self._shared = set(self.SECTIONS)
+        return Snapshot(dict(self._data), self.mode)
+
+    def restore(self, snapshot):
+        self._data = dict(snapshot.data)
+        self._shared = set(self.SECTIONS)
+        self.mode = snapshot.mode
+
+    # --- state helpers -------------------------------------------------------------
+
+    @property
+    def hostname(self):
+        return self._read('settings')['hostname']
+
+    def interfaces(self):
+        return self._read('interfaces')
+
+    def vlans(self):
+        return self._read('vlans')
+
+    def _update_interface(self, name, **changes):
+        section = self._write('interfaces')
+        record = dict(section.get(name) or _NEW_INTERFACE)
+        record.update(changes)
+        section[name] = record
+
+    def _add_line(self, section_name, key, line):
+        section = self._write(section_name)
+        if line not in section.get(key, ()):
+            section[key] = section.get(key, ()) + (line,)
+
+    def _remove_line(self, section_name, key, line):
+        section = self._write(section_name)
+        section[key] = tuple(l for l in section.get(key, ()) if l.lower() != line.lower())
+
+    def addresses(self):
+        """(interface, ip_interface) for every addressed interface."""
+        return [(name, rec['address']) for name, rec in self.interfaces().items() if rec['address'] is not None]
+
+    def interface_up(self, name):
+        rec = self.interfaces().get(name)
+        return rec is not None and not rec['shutdown']
+
+    def routes(self):
+        """(code, network, next hop or None, interface or None) sorted by network; connected,
+        local and static routes."""
+        out = []
+        for name, addr in self.addresses():
+            if self.interface_up(name):
+                out.append(('C', addr.network, None, name))
+                out.append(('L', ipaddress.ip_network(f'{addr.ip}/32'), None, name))
+        for network, hop in self._read('routes'):
+            out.append(('S', ipaddress.ip_network(network), hop, None))
+        out.sort(key=lambda r: (int(r[1].network_address), r[1].prefixlen))
+        return out
+
+    def route_to(self, address):
+        """Longest-prefix-match route for address, or None."""
+        addr = ipaddress.ip_address(address)
+        best = None
+        for route in self.routes():
+            if addr in route[1] and (best is None or route[1].prefixlen > best[1].prefixlen):
+                best = route
+        return best
+
+    # --- CLI -------------------------------------------------------------------------
+
+    def prompt(self):
+        suffix = {'exec': '#', 'config': '(config)#', 'if': '(config-if)#', 'vlan': '(config-vlan)#',
+                  'router': '(config-router)#', 'pool': '(dhcp-config)#', 'acl': '(config-ext-nacl)#',
+                  'line': '(config-line)#', 'section': '(config-cmap)#'}[self.mode[0]]
+        return self.hostname + suffix
+
+    def _words(self, command):
+        """Canonical keywords, with the arguments as typed where the token count allows."""
+        typed = command.split()
+        canon = list(self._canonical(command))
+        if canon and canon[0] in _MODE_TABLE:
+            canon[0] = _MODE_TABLE[canon[0]]
+        if len(canon) == len(typed):
+            return [c if c != t.lower() else t for c, t in zip(canon, typed)], canon
+        return canon, canon
+
+    def execute(self, command):
+        """Run one command line; returns its output ('' for configuration commands)."""
+        words, low = self._words(command.strip())
+        if not words:
+            return ''
+        if low[0] == 'do' and len(low) > 1:
+            return self.execute(' '.join(words[1:]))
+        if low[0] in ('end', 'configure'):
+            self.mode = ('config',) if low[0] == 'configure' else ('exec',)
+            return ''
+        if low[0] == 'exit':
+            self.mode = ('exec',) if self.mode[0] in ('exec', 'config') else ('config',)
+            return ''
+        if low[0] in EXEC_COMMANDS and not (
+                low[0] in EXEC_CONFIG_FORMS and len(low) > 1 and self.mode != ('exec',)):
+            return self._exec(words, low)
+        if self.mode[0] in SUB_MODE_KEYWORDS and self._in_sub_mode(low):
+            return self._sub_command(words, low)
+        return self._global(words, low)
+
+    def _in_sub_mode(self, low):
+        keywords = SUB_MODE_KEYWORDS[self.mode[0]]
+        if low[0] not in keywords:
+            return False
+        if self.mode[0] == 'if' and low[0] == 'ip':
+            return len(low) > 1 and low[1] in _INTERFACE_IP_COMMANDS
+        if low[0] == 'no' and len(low) > 1:
+            return self._in_sub_mode(low[1:])
+        return True
+
+    # --- global configuration --------------------------------------------------------
+
+    def _global(self, words, low):
+        self.mode = ('config',)
+        negate = low[0] == 'no'
+        if negate:
+            words, low = words[1:], low[1:]
+            if not low:
+                return ''
+        head = low[0]
+        if head == 'hostname' and len(words) > 1 and not negate:
+            self._write('settings')['hostname'] = words[1]
+        elif head == 'interface' and len(low) > 1:
+            names = self._interface_names(low[1:])
+            if not names:
+                return f"% Invalid interface '{' '.join(words[1:])}'"
+            for name in names:
+                if name not in self.interfaces():
+                    self._update_interface(name)
+            self.mode = ('if', tuple(names))
+        elif head == 'vlan' and len(low) > 1:
+            ids = _vlan_list(low[1])
+            vlans = self._write('vlans')
+            for vid in ids:
+                if negate:
+                    vlans.pop(vid, None)
+                else:
+                    vlans.setdefault(vid, f'VLAN{vid:04d}')
+            if ids and not negate:
+                self.mode = ('vlan', ids[0])
+        elif head == 'ip' and len(low) >= 4 and low[1] == 'route':
+            try:
+                network = str(ipaddress.ip_network(f'{low[2]}/{low[3]}', strict=False))
+            except ValueError:
+                return '% Invalid input detected'
+            hop = words[4] if len(words) > 4 else None
+            routes = self._write('routes')
+            if negate:
+                for key in [k for k in routes if k[0] == network and (hop is None or k[1] == hop)]:
+                    del routes[key]
+            else:
+                routes[(network, hop)] = None
+        elif head in ('router', 'line', 'class-map', 'policy-map', 'route-map') or low[:2] in (
+                ['ip', 'access-list'], ['ip', 'dhcp']) and (low[1] == 'access-list' or low[2:3] == ['pool']):
+            header = ' '.join(words)
+            blocks = self._write('blocks')
+            if negate:
+                blocks.pop(header, None)
+                return ''
+            blocks.setdefault(header, ())
+            kind = {'router': 'router', 'line': 'line', 'ip': 'acl' if low[1] == 'access-list' else 'pool'}
+            self.mode = (kind.get(head, 'section'), header)
+        else:
+            line = ' '.join(words)
+            if negate:
+                self._remove_line('settings', 'lines', line)
+            else:
+                self._add_line('settings', 'lines', line)
+        return ''
+
+    def _interface_names(self, low):
+        text = ' '.join(low)
+        if low[0] == 'range':
+            text = ' '.join(low[1:])
+            m = re.match(r'^(\S+?)(\d+)\s*-\s*(?:\S*?)(\d+)$', text)
+            if m:
+                first = interface_name(m.group(1) + m.group(2))
+                if first:
+                    base = first[:len(first) - len(m.group(2))]
+                    return [f'{base}{n}' for n in range(int(m.group(2)), int(m.group(3)) + 1)]
+            return [n for n in (interface_name(part) for part in re.split(r'\s*,\s*', text)) if n]
+        name = interface_name(text.replace(' ', ''))
+        return [name] if name else []
+
+    # --- sub-mode configuration ------------------------------------------------------
+
+    def _sub_command(self, words, low):
+        mode = self.mode[0]
+        if mode == 'if':
+            for name in self.mode[1]:
+                self._interface_command(name, words, low)
+        elif mode == 'vlan':
+            if low[0] == 'name' and len(words) > 1:
+                self._write('vlans')[self.mode[1]] = words[1]
+        else:
+            line = ' '.join(words)
+            if low[0] == 'no':
+                self._remove_line('blocks', self.mode[1], ' '.join(words[1:]))
+            else:
+                self._add_line('blocks', self.mode[1], line)
+        return ''
+
+    def _interface_command(self, name, words, low):
+        negate = low[0] == 'no'
+        if negate:
+            words, low = words[1:], low[1:]
+        rec = self.interfaces()[name]
+        if low == ['shutdown']:
+            self._update_interface(name, shutdown=not negate)
+        elif low[0] == 'description':
+            self._update_interface(name, description='' if negate else ' '.join(words[1:]))
+        elif low[:2] == ['ip', 'address']:
+            if negate or len(low) < 4:
+                self._update_interface(name, address=None)
+            else:
+                try:
+                    self._update_interface(name, address=ipaddress.ip_interface(f'{low[2]}/{low[3]}'))
+                except ValueError:
+                    pass
+        elif low[:2] == ['switchport', 'mode'] and len(low) > 2:
+            self._update_interface(name, mode=None if negate else low[2])
+        elif low[:3] == ['switchport', 'access', 'vlan'] and len(low) > 3:
+            vid = int(low[3]) if low[3].isdigit() and not negate else None
+            self._update_interface(name, access_vlan=vid)
+            if vid is not None and vid not in self.vlans():
+                self._write('vlans')[vid] = f'VLAN{vid:04d}'
+        elif low[:4] == ['switchport', 'trunk', 'allowed', 'vlan'] and len(low) > 4:
+            self._update_interface(name, trunk_allowed=None if negate else low[4])
+        elif low[0] == 'encapsulation' and len(low) > 2:
+            self._update_interface(name, encapsulation=None if negate else f'{low[1]} {low[2]}')
+        else:
+            line = ' '.join(words)
+            lines = tuple(l for l in rec['lines'] if l.lower() != line.lower())
+            self._update_interface(name, lines=lines if negate else lines + (line,))
+
+    # --- exec commands ------------------------------------------------------------------
+
+    def _exec(self, words, low):
+        if low[0] == 'show':
+            return self._show(words, low[1:])
+        if low[0] == 'ping' and len(low) > 1:
+            return None          # answered by the lab, which knows the other devices
+        if low[0] == 'write' or low[:3] == ['copy', 'running-config', 'startup-config']:
+            return 'Building configuration...\n[OK]'
+        return ''
+
+    def _show(self, words, args):
+        text, _, pipe = ' '.join(words[1:]).partition('|')
+        args = text.lower().split()
+        if args[:1] == ['running-config'] or args[:1] == ['startup-config']:
+            if args[1:2] == ['interface'] and len(args) > 2:
+                name = interface_name(''.join(args[2:]))
+                out = self.running_config(only_interface=name)
+            else:
+                out = self.running_config()
+        elif args[:3] == ['ip', 'interface', 'brief']:
+            out = self.show_ip_interface_brief()
+        elif args[:2] == ['ip', 'route']:
+            out = self.show_ip_route()
+        elif args[:2] == ['vlan', 'brief'] or args == ['vlan']:
+            out = self.show_vlan_brief()
+        elif args[:2] == ['interfaces', 'trunk']:
+            out = self.show_interfaces_trunk()
+        elif args[:2] == ['interfaces', 'status']:
+            out = self.show_interfaces_status()
+        else:
+            return None
+        pipe = pipe.strip().split(None, 1)
+        if len(pipe) == 2 and pipe[0].lower() in ('include', 'i', 'in', 'inc'):
+            out = '\n'.join(line for line in out.splitlines() if pipe[1].lower() in line.lower())
+        return out
+
+    def running_config(self, only_interface=None):
+        lines = []
+        interfaces = self.interfaces()
+        names = sorted(interfaces, key=_interface_sort_key)
+        if only_interface is not None:
+            names = [n for n in names if n == only_interface]
+        else:
+            lines += ['Building configuration...', '', '!', f'hostname {self.hostname}', '!']
+            for vid, vname in sorted(self.vlans().items()):
+                if vid != 1:
+                    lines += [f'vlan {vid}', f' name {vname}', '!']
+        for name in names:
+            rec = interfaces[name]
+            lines.append(f'interface {interface_display(name)}')
+            if rec['description']:
+                lines.append(f" description {rec['description']}")
+            if rec['encapsulation']:
+                lines.append(f" encapsulation {rec['encapsulation']}")
+            if rec['mode']:
+                lines.append(f" switchport mode {rec['mode']}")
+            if rec['access_vlan'] is not None:
+                lines.append(f" switchport access vlan {rec['access_vlan']}")
+            if rec['trunk_allowed']:
+                lines.append(f" switchport trunk allowed vlan {rec['trunk_allowed']}")
+            if rec['address'] is not None:
+                lines.append(f" ip address {rec['address'].ip} {rec['address'].netmask}")
+            lines += [f' {line}' for line in rec['lines']]
+            if rec['shutdown']:
+                lines.append(' shutdown')
+            lines.append('!')
+        if only_interface is not None:
+            return '\n'.join(lines)
+        for header, body in self._read('blocks').items():
+            lines += [header] + [f' {line}' for line in body] + ['!']
+        for network, hop in self._read('routes'):
+            net = ipaddress.ip_network(network)
+            lines.append(f'ip route {net.network_address} {net.netmask} {hop or ""}'.rstrip())
+        lines += list(self._read('settings')['lines'])
+        lines.append('end')
+        return '\n'.join(lines)
+
+    def show_ip_interface_brief(self):
+        lines = [f"{'Interface':<23}{'IP-Address':<16}OK? Method Status                Protocol"]
+        for name in sorted(self.interfaces(), key=_interface_sort_key):
+            rec = self.interfaces()[name]
+            ip = str(rec['address'].ip) if rec['address'] is not None else 'unassigned'
+            status, proto = ('administratively down', 'down') if rec['shutdown'] else ('up', 'up')
+            method = 'manual' if rec['address'] is not None else 'unset'
+            lines.append(f'{interface_display(name):<23}{ip:<16}YES {method:<7}{status:<22}{proto}')
+        return '\n'.join(lines)
+
+    def show_ip_route(self):
+        routes = self.routes()
+        default = next((r for r in routes if r[1].prefixlen == 0 and r[2]), None)
+        lines = ['Codes: L - local, C - connected, S - static', '',
+                 f'Gateway of last resort is {default[2]} to network 0.0.0.0' if default
+                 else 'Gateway of last resort is not set', '']
+        for code, network, hop, name in routes:
+            star = '*' if network.prefixlen == 0 else ' '
+            if hop:
+                lines.append(f'{code}{star}    {network} [1/0] via {hop}')
+            else:
+                lines.append(f'{code}{star}    {network} is directly connected, {interface_display(name)}')
+        return '\n'.join(lines)
+
+    def show_vlan_brief(self):
+        lines = [f"{'VLAN':<5}{'Name':<33}{'Status':<10}Ports",
+                 f"{'-' * 4} {'-' * 32} {'-' * 9} {'-' * 31}"]
+        members = {}
+        for name, rec in sorted(self.interfaces().items(), key=lambda item: _interface_sort_key(item[0])):
+            if rec['mode'] == 'trunk' or rec['address'] is not None or name.startswith(('vlan', 'port-channel')):
+                continue
+            members.setdefault(rec['access_vlan'] or 1, []).append(interface_display(name, short=True))
+        for vid, vname in sorted(self.vlans().items()):
+            lines.append(f"{vid:<5}{vname:<33}{'active':<10}{', '.join(members.get(vid, []))}".rstrip())
+        return '\n'.join(lines)
+
+    def show_interfaces_trunk(self):
+        lines = [f"{'Port':<12}{'Mode':<13}{'Encapsulation':<15}{'Status':<13}Native vlan"]
+        trunks = [(n, r) for n, r in sorted(self.interfaces().items(), key=lambda item: _interface_sort_key(item[0]))
+                  if r['mode'] == 'trunk']
+        for name, rec in trunks:
+            status = 'trunking' if not rec['shutdown'] else 'not-trunking'
+            lines.append(f"{interface_display(name, short=True):<12}{'on':<13}{'802.1q':<15}{status:<13}1")
+        lines += ['', f"{'Port':<12}Vlans allowed on trunk"]
+        for name, rec in trunks:
+            lines.append(f"{interface_display(name, short=True):<12}{rec['trunk_allowed'] or '1-4094'}")
+        return '\n'.join(lines)
+
+    def show_interfaces_status(self):
+        lines = [f"{'Port':<10}{'Name':<19}{'Status':<13}{'Vlan':<11}Duplex  Speed Type"]
+        for name in sorted(self.interfaces(), key=_interface_sort_key):
+            rec = self.interfaces()[name]
+            if name.startswith(('vlan', 'loopback', 'tunnel')):
+                continue
+            status = 'disabled' if rec['shutdown'] else 'connected'
+            vlan = 'trunk' if rec['mode'] == 'trunk' else 'routed' if rec['address'] is not None \
+                else str(rec['access_vlan'] or 1)
+            lines.append(f"{interface_display(name, short=True):<10}{rec['description'][:18]:<19}{status:<13}"
+                         f"{vlan:<11}a-full  auto  10/100/1000BaseTX")
+        return '\n'.join(lines)
+
+
+class LabSimulation:
+    """The devices of one lab; commands go to the active device.
+
+    Routers and switches come from the lab diagram (nodes whose label
+    names a router or switch); other nodes with an IPv4 address in their
+    label are hosts that answer pings. A lab without a diagram gets one
+    router.
+    """
+
+    def __init__(self, lab, grammar=None):
+        self.devices = {}
+        self.hosts = set()
+        for node in (lab.get('diagram') or {}).get('nodes', []):
+            label = node.get('label', node.get('id', '')).replace('\\n', '\n')
+            first = label.split('\n')[0].strip()
+            kind = 'router' if 'router' in first.lower() else 'switch' if 'switch' in first.lower() else None
+            if kind:
+                self.devices[first] = Device(first.replace(' ', '-'), kind, grammar)
+            else:
+                self.hosts.update(_IPV4_IN_TEXT_RE.findall(label))
+        if not self.devices:
+            self.devices['Router'] = Device('Router', 'router', grammar)
+        self.active = next(iter(self.devices))
+
+    @property
+    def device(self):
+        return self.devices[self.active]
+
+    def snapshot(self):
+        return LabSnapshot({name: d.snapshot() for name, d in self.devices.items()}, self.active)
+
+    def restore(self, snapshot):
+        for name, state in snapshot.devices.items():
+            self.devices[name].restore(state)
+        self.active = snapshot.active
+
+    def execute(self, text):
+        """Run the "\\n"-separated commands in text on the active device; returns the output lines."""
+        out = []
+        for command in split_commands(text):
+            result = self.device.execute(command)
+            if result is None and tokens(command)[:1] == ('ping',):
+                result = self.ping(command.split()[-1])
+            if result:
+                out.append(result)
+        return out
+
+    def owner(self, address):
+        """(device, interface) that has address configured, or (None, None)."""
+        for device in self.devices.values():
+            for name, addr in device.addresses():
+                if str(addr.ip) == address:
+                    return device, name
+        return None, None
+
+    def ping(self, address):
+        """IOS-style ping output from the active device, using the simulated routing state."""
+        try:
+            ipaddress.ip_address(address)
+        except ValueError:
+            return '% Unrecognized host or address, or protocol not running.'
+        source = self.device
+        owner, owner_if = self.owner(address)
+        ok = source.route_to(address) is not None
+        if owner is source:
+            ok = source.interface_up(owner_if)
+        elif owner is not None:
+            ok = ok and owner.interface_up(owner_if) and any(
+                owner.route_to(str(addr.ip)) is not None for name, addr in source.addresses()
+                if source.interface_up(name))
+        else:
+            ok = ok and address in self.hosts
+        marks, rate = ('!!!!!', '100 percent (5/5)') if ok else ('.....', '0 percent (0/5)')
+        return ('Type escape sequence to abort.\n'
+                f'Sending 5, 100-byte ICMP Echos to {address}, timeout is 2 seconds:\n'
+                f'{marks}\nSuccess rate is {rate}')
@@ -0,0 +1,327 @@
+"""IOS command grammar with abbreviation resolution for the quiz and labs.
+
+The grammar is a prefix trie of command tokens. Each node has keyword
+children ("show", "ip", "interface") and argument children, one per kind
+of value: ipv4 address, number, interface name or any word. It is built
+from the command inventory files scanned out of the game's content
+(scanned_commands_inventory.txt, missing_commands_sample.txt), plus the
+commands the labs and CLI questions expect.
+
+After building, every node gets a table that maps each keyword, and each
+prefix of a keyword that no sibling shares, to the full keyword. Resolving
+"sh ip int br" is then one dict lookup per token:
+
+    grammar = load_grammar()
+    grammar.canonical('sh ip int br')        # ('show', 'ip', 'interface', 'brief')
+    grammar.canonical('int g0/1')            # ('interface', 'gigabitethernet0/1')
+
+Commands are kept per mode: lines indented in the source (interface,
+VLAN, pool sub-commands) go to the 'sub' grammar and the rest to 'top',
+so "sh" means show at the top level even though "shutdown" exists under
+an interface. A command is resolved against 'top' first, then 'sub'.
+"""
+import json
+import os
+import re
+from collections import namedtuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INVENTORY_FILES = (
+    os.path.join(BASE_DIR, 'scanned_commands_inventory.txt'),
+    os.path.join(BASE_DIR, 'missing_commands_sample.txt'),
+)
+
+# "\n" as typed in labs.json and in the hints, or a real line break
+COMMAND_SEPARATOR = re.compile(r'\\n|\n')
+
+INTERFACE_TYPES = (
+    'ethernet', 'fastethernet', 'gigabitethernet', 'tengigabitethernet', 'fortygigabitethernet',
+    'hundredgige', 'serial', 'loopback', 'vlan', 'port-channel', 'tunnel', 'null',
+)
+# abbreviations IOS users rely on that would otherwise be ambiguous here, because
+# the scanned content does not always say which mode a command belongs to
+PREFERRED = {'sh': 'show', 'int': 'interface', 'conf': 'configure', 'ena': 'enable', 'wr': 'write'}
+# keywords after which "GigabitEthernet 0/1" is read as one interface name
+INTERFACE_CONTEXTS = {('interface',), ('interface', 'range')}
+
+ARG_KINDS = ('ipv4', 'number', 'interface', 'word')    # tried in this order
+_IPV4_RE = re.compile(r'^\d{1,3}(?:\.\d{1,3}){3}$')
+_NUMBER_RE = re.compile(r'^\d+$')
+_INTERFACE_RE = re.compile(r'^([a-z][a-z-]*?)(\d+(?:/\d+)*(?:\.\d+)?(?:-\d+)?)$')
+_INTERFACE_NUMBER_RE = re.compile(r'^\d+(?:/\d+)*(?:\.\d+)?$')
+_KEYWORD_RE = re.compile(r'^[a-z][a-z0-9-]*$')
+# <ip>, <vlan>, <name> ... placeholders in the notes
+_PLACEHOLDER_KINDS = {'ip': 'ipv4', 'next-hop': 'ipv4', 'address': 'ipv4',
+                      'id': 'number', 'num': 'number', 'vlan': 'number', 'level': 'word'}
+# JSON fields of the scanned content whose values are commands
+_COMMAND_FIELDS = {'answer', 'accepted_answers', 'expected', 'full_config_snippet'}
+_QUOTED_RE = re.compile(r'^"((?:[^"\\]|\\.)*)"\s*(?::\s*(.*?))?\s*,?\s*$')
+_BACKTICK_RE = re.compile(r'`([^`]+)`')
+
+Resolution = namedtuple('Resolution', 'tokens complete error')
+Resolution.__doc__ = """tokens are canonical up to the first token that did not resolve
+and lowercase as typed after it; error says why resolving stopped ('' when
+complete)."""
+
+
+def split_commands(text):
+    """Non-empty commands in text, split at "\\n" separators."""
+    return [part.strip() for part in COMMAND_SEPARATOR.split(text or '') if part.strip()]
+
+
+def tokens(command):
+    """Lowercase whitespace-separated tokens of command, as a tuple."""
+    return tuple((command or '').lower().split())
+
+
+def _unique_prefixes(words, preferred=None):
+    """{prefix: word} for every word and every prefix of it no other word shares,
+    plus the preferred expansions whose word is present."""
+    counts = {}
+    for word in words:
+        for end in range(1, len(word) + 1):
+            counts[word[:end]] = counts.get(word[:end], 0) + 1
+    table = {}
+    for word in words:
+        for end in range(1, len(word) + 1):
+            if counts[word[:end]] == 1:
+                table[word[:end]] = word
+    for prefix, word in (preferred or {}).items():
+        if word in words and prefix not in words:
+            table[prefix] = word
+    for word in words:
+        table[word] = word
+    return table
+
+
+_INTERFACE_TABLE = _unique_prefixes(INTERFACE_TYPES)
+
+
+def interface_name(token):
+    """Canonical lowercase interface name for token ('Gi0/1' -> 'gigabitethernet0/1'), or None."""
+    m = _INTERFACE_RE.match(token.lower())
+    if not m:
+        return None
+    kind = _INTERFACE_TABLE.get(m.group(1))
+    return kind + m.group(2) if kind else None
+
+
+def _arg_kind(token):
+    """Kind of argument an inventory token is, or None for a keyword."""
+    if token.startswith('<') and token.endswith('>'):
+        return _PLACEHOLDER_KINDS.get(token[1:-1].lower(), 'word')
+    if _IPV4_RE.match(token):
+        return 'ipv4'
+    if _NUMBER_RE.match(token):
+        return 'number'
+    if interface_name(token):
+        return 'interface'
+    if token != token.lower() or not _KEYWORD_RE.match(token):
+        return 'word'
+    return None
+
+
+def _accepts(kind, token):
+    if kind == 'ipv4':
+        return bool(_IPV4_RE.match(token))
+    if kind == 'number':
+        return bool(_NUMBER_RE.match(token))
+    if kind == 'interface':
+        return interface_name(token) is not None
+    return True
+
+
+class _Node:
+    __slots__ = ('keywords', 'args', 'terminal', 'table')
+
+    def __init__(self):
+        self.keywords = {}      # keyword -> _Node
+        self.args = {}          # argument kind -> _Node
+        self.terminal = False
+        self.table = None       # keyword or unambiguous prefix -> keyword, set by finalize()
+
+
+class Grammar:
+    """Command tries per mode ('top', 'sub') with abbreviation lookup."""
+
+    MODES = ('top', 'sub')
+
+    def __init__(self):
+        self.roots = {mode: _Node() for mode in self.MODES}
+        self.size = 0
+
+    def add(self, command, mode='top'):
+        """Add one command line; tokens are classified as keywords or arguments."""
+        toks = command.split()
+        if not toks:
+            return
+        node = self.roots[mode]
+        path = ()
+        i = 0
+        while i < len(toks):
+            tok = toks[i]
+            low = tok.lower()
+            if path in INTERFACE_CONTEXTS and i + 1 < len(toks) and low in _INTERFACE_TABLE \
+                    and _INTERFACE_NUMBER_RE.match(toks[i + 1]):
+                tok = low = low + toks[i + 1]
+                i += 1
+            i += 1
+            if low in node.keywords:
+                node, path = node.keywords[low], path + (low,)
+                continue
+            # an argument slot that already accepts the token (e.g. a lowercase copy of a name)
+            existing = next((kind for kind in ARG_KINDS if kind in node.args and _accepts(kind, low)), None)
+            # the first token is always the command word ("hostA IN A ..." zone records in the labs)
+            kind = _arg_kind(tok) if path else None
+            if kind is None and existing is None:
+                node = node.keywords.setdefault(low, _Node())
+                path = path + (low,)
+                node.table = None
+                continue
+            kind = existing or kind
+            node = node.args.setdefault(kind, _Node())
+            path = path + (kind,)
+        if not node.terminal:
+            node.terminal = True
+            self.size += 1
+
+    def finalize(self):
+        """Build the unambiguous-prefix tables; call after the last add()."""
+        for root in self.roots.values():
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                node.table = _unique_prefixes(node.keywords, PREFERRED)
+                stack.extend(node.keywords.values())
+                stack.extend(node.args.values())
+        return self
+
+    def _resolve(self, root, toks):
+        node = root
+        out = []
+        path = ()
+        i = 0
+        while i < len(toks):
+            tok = toks[i]
+            if path in INTERFACE_CONTEXTS and i + 1 < len(toks) and tok in _INTERFACE_TABLE \
+                    and tok not in node.table and _INTERFACE_NUMBER_RE.match(toks[i + 1]):
+                tok = tok + toks[i + 1]
+                i += 1
+            keyword = node.table.get(tok)
+            if keyword is not None:
+                out.append(keyword)
+                node = node.keywords[keyword]
+                path = path + (keyword,)
+                i += 1
+                continue
+            for kind in ARG_KINDS:
+                child = node.args.get(kind)
+                if child is not None and _accepts(kind, tok):
+                    out.append(interface_name(tok) if kind == 'interface' else tok)
+                    node = child
+                    path = path + (kind,)
+                    break
+            else:
+                candidates = sorted(k for k in node.keywords if k.startswith(tok))
+                error = f'ambiguous command "{tok}": {", ".join(candidates)}' if candidates \
+                    else f'unrecognized command "{tok}"'
+                return Resolution(tuple(out) + tuple(toks[i:]), False, error)
+            i += 1
+        if not node.terminal:
+            return Resolution(tuple(out), False, 'incomplete command')
+        return Resolution(tuple(out), True, '')
+
+    def resolve(self, command):
+        """Resolution of one command line, trying the 'top' grammar and then 'sub'."""
+        toks = tokens(command)
+        first = None
+        for mode in self.MODES:
+            result = self._resolve(self.roots[mode], toks)
+            if result.complete:
+                return result
+            first = first or result
+        return first
+
+    def canonical(self, command):
+        """Tokens of command with abbreviations expanded (as typed where it does not resolve)."""
+        return self.resolve(command).tokens
+
+    def same_commands(self, entered, expected):
+        """True when entered is the command(s) of expected, abbreviations allowed;
+        several commands are separated by "\\n"."""
+        a, b = split_commands(entered), split_commands(expected)
+        return len(a) == len(b) and all(self.canonical(x) == self.canonical(y) for x, y in zip(a, b))
+
+
+def _inventory_commands(line):
+    """(command text, indented) pairs found in one line of an inventory file."""
+    line = line.rstrip('\n')
+    stripped = line.strip()
+    if not stripped:
+        return
+    texts = []
+    m = _QUOTED_RE.match(stripped)
+    if m:
+        key, value = m.group(1), m.group(2)
+        if value is None:
+            texts.append(key)
+        elif re.match(r'^[a-z_]+$', key):
+            if key in _COMMAND_FIELDS:
+                try:
+                    value = json.loads(value.rstrip(','))
+                except ValueError:
+                    return
+                texts.extend(value if isinstance(value, list) else [value])
+        else:
+            texts.append(key)          # "ping 10.0.0.10": "reply" (a simulated command)
+        decoded = []
+        for text in texts:
+            try:
+                decoded.append(json.loads(f'"{text}"') if '\\' in text else text)
+            except ValueError:
+                decoded.append(text)
+        texts = decoded
+    elif '`' in stripped:
+        texts = _BACKTICK_RE.findall(stripped)
+    else:
+        texts = [line.split('#', 1)[0].rstrip()]
+    for text in texts:
+        if not isinstance(text, str):
+            continue
+        for part in COMMAND_SEPARATOR.split(text):
+            command = part.strip()
+            if not command or command.startswith('!') or '; ' in command or ', ' in command:
+                continue
+            if not command[0].islower():
+                continue          # prose or show output ("VLAN Name Status", "Check ...")
+            words = command.split()
+            if len(words) > 8 and not any(ch.isdigit() for ch in command):
+                continue          # a lowercased sentence from the notes
+            yield command, part[:1].isspace()
+
+
+def inventory_commands(lines):
+    """(command, mode) for each command in an inventory file's lines."""
+    for line in lines:
+        for command, indented in _inventory_commands(line):
+            yield command, 'sub' if indented else 'top'
+
+
+def load_grammar(paths=INVENTORY_FILES, extra=()):
+    """Grammar from the inventory files (missing ones are skipped) and extra command texts.
+
+    extra holds expected answers as they appear in questions.json/labs.json,
+    possibly several "\\n"-separated commands each.
+    """
+    grammar = Grammar()
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for command, mode in inventory_commands(f):
+                    grammar.add(command, mode)
+        except OSError:
+            continue
+    for text in extra:
+        for command, mode in inventory_commands([json.dumps(text)]):
+            grammar.add(command, mode)
+    return grammar.finalize()
@@ -0,0 +1,165 @@
+"""Compiled command matching for the Cisco labs.
+
+LabMatcher(lab) compiles one lab from labs.json once, when the labs are
+loaded:
+
+* 're:' patterns (simulated outputs and expected commands) are compiled
+  with re.I; patterns that do not compile are dropped
+* literal simulated commands go into a dict keyed by their normalized
+  token tuple
+* each step's literal expected commands go into a token trie, so a
+  submission is tokenized once and walked through the trie once
+
+With an ios_grammar.Grammar, commands are normalized to their canonical
+tokens, so "int g0/1" matches "interface gigabitEthernet0/1" and
+"sh ip int br" gets the output simulated for "show ip interface brief".
+
+An expected entry can hold several commands separated by a literal "\\n"
+(for example "vlan 10\\nname DATA"); they have to be entered in that
+order, one per submission or several at once separated by "\\n". The
+step is complete when every command of any one entry has been entered.
+Whole commands only: a fragment of an expected command is not accepted.
+
+A LabMatcher is never changed after compiling, so one can be shared by
+any number of learners; the per-learner part is the progress dict that
+match() fills in.
+"""
+import re
+from collections import namedtuple
+
+from ios_grammar import split_commands, tokens
+
+StepResult = namedtuple('StepResult', 'status responses done total')
+StepResult.__doc__ = """status is 'complete', 'partial' (a command of a multi-command
+entry was accepted) or 'wrong'; responses are the simulated outputs for the
+submission; done/total count the commands of the entry furthest along."""
+
+
+def _compile_pattern(pattern):
+    try:
+        return re.compile(pattern, re.I)
+    except re.error:
+        return None
+
+
+class _TokenTrie:
+    """Token tuple -> values stored at that exact sequence."""
+
+    __slots__ = ('_root',)
+
+    def __init__(self):
+        self._root = {}
+
+    def add(self, key, value):
+        node = self._root
+        for tok in key:
+            node = node.setdefault(tok, {})
+        node.setdefault(None, []).append(value)
+
+    def get(self, key):
+        node = self._root
+        for tok in key:
+            node = node.get(tok)
+            if node is None:
+                return ()
+        return node.get(None, ())
+
+
+class _CompiledStep:
+    """Expected commands of one step: entries are lists of commands."""
+
+    __slots__ = ('entries', 'trie', 'patterns', 'hints')
+
+    def __init__(self, expected, normalize):
+        self.entries = []           # entry index -> number of commands in it
+        self.trie = _TokenTrie()    # tokens -> [(entry, position)]
+        self.patterns = []          # (entry, compiled regex) for single-command 're:' entries
+        self.hints = []
+        for e in expected:
+            if not isinstance(e, str):
+                continue
+            entry = len(self.entries)
+            if e.startswith('re:'):
+                pattern = _compile_pattern(e[3:])
+                if pattern is None:
+                    continue
+                self.patterns.append((entry, pattern))
+                self.entries.append(1)
+                self.hints.append(e)
+                continue
+            commands = split_commands(e)
+            if not commands:
+                continue
+            for position, command in enumerate(commands):
+                self.trie.add(normalize(command), (entry, position))
+            self.entries.append(len(commands))
+            self.hints.append(r'\n'.join(' '.join(command.split()) for command in commands))
+
+    def hits(self, command, toks):
+        """(entry, position) pairs that command matches."""
+        found = list(self.trie.get(toks))
+        for entry, pattern in self.patterns:
+            if pattern.search(command):
+                found.append((entry, 0))
+        return found
+
+
+class LabMatcher:
+    """Compiled simulated outputs and expected commands of one lab."""
+
+    def __init__(self, lab, grammar=None):
+        self.tokens = grammar.canonical if grammar is not None else tokens
+        self.simulated = {}         # tokens -> (order, output)
+        self.simulated_patterns = []  # (order, compiled regex, output)
+        for order, (pattern, output) in enumerate((lab.get('simulated') or {}).items()):
+            if pattern.startswith('re:'):
+                compiled = _compile_pattern(pattern[3:])
+                if compiled is not None:
+                    self.simulated_patterns.append((order, compiled, output))
+            else:
+                self.simulated.setdefault(self.tokens(pattern), (order, output))
+        self.steps = [_CompiledStep(step.get('expected', []), self.tokens) for step in lab.get('steps', [])]
+
+    def responses(self, command, toks=None):
+        """Simulated outputs for command, in labs.json order."""
+        found = [(order, output) for order, pattern, output in self.simulated_patterns if pattern.search(command)]
+        literal = self.simulated.get(self.tokens(command) if toks is None else toks)
+        if literal is not None:
+            found.append(literal)
+        found.sort(key=lambda item: item[0])
+        return [output for _, output in found]
+
+    def hints(self, step):
+        return list(self.steps[step].hints)
+
+    def match(self, step, text, progress):
+        """Grade a submission for step; progress maps entry -> commands entered so far
+        and is updated in place (start each step with an empty dict)."""
+        compiled = self.steps[step]
+        responses = []
+        accepted = False
+        for command in split_commands(text):
+            toks = self.tokens(command)
+            responses.extend(self.responses(command, toks))
+            positions = {}
+            for entry, position in compiled.hits(command, toks):
+                positions.setdefault(entry, set()).add(position)
+            advanced = False
+            for entry, found in positions.items():
+                done = progress.get(entry, 0)
+                if done in found:
+                    progress[entry] = done + 1
+                    advanced = True
+                elif 0 in found:
+                    # the entry's first command again: start that entry over
+                    progress[entry] = 1
+                    advanced = True
+            if not advanced:
+                accepted = False
+                break
+            accepted = True
+        best = max(progress, key=lambda entry: progress[entry] / compiled.entries[entry], default=None)
+        done, total = (progress[best], compiled.entries[best]) if best is not None else (0, 0)
+        if any(progress.get(entry, 0) >= size for entry, size in enumerate(compiled.entries)):
+            return StepResult('complete', responses, done, total)
+        return StepResult('partial' if accepted else 'wrong', responses, done, total)
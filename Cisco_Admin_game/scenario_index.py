@@ -0,0 +1,236 @@
+"""Inverted index over the scenarios and labs for the Scenario Lookup tab.
+
+The index maps every token of a scenario (title, summary, description,
+objectives, step titles, commands, notes, config snippet) or lab (title,
+step titles and descriptions, expected commands) to the documents that
+contain it, with a weight per field, so a title hit ranks above a hit in
+a config snippet. It is built once and saved to a cache file together
+with the size and mtime of the files it came from; the next start loads
+the cache unless one of those files changed.
+
+    index = load_index(scenarios, labs, [SCENARIOS_FILE, LABS_FILE], CACHE_FILE)
+    hits = index.search('ospf are', difficulty='intermediate')
+    [(kind, position) for kind, position, score in hits]
+
+Every query term must match (AND). A term matches a token exactly, or as
+a prefix when it is the last term (the one still being typed) or ends in
+'*'. Prefix expansions are memoized along with their vocabulary range,
+and a longer prefix only searches the range of the shorter one, so typing
+a word one character at a time costs little per keystroke.
+"""
+import heapq
+import json
+import os
+import re
+from bisect import bisect_left
+
+INDEX_VERSION = 1
+# weight of a hit per field; a document scores the sum over the query terms
+FIELD_WEIGHTS = {'title': 8, 'summary': 4, 'objective': 3, 'step': 3, 'command': 2, 'text': 1}
+# an exact token scores this much more than a longer token sharing the prefix
+EXACT_BONUS = 2
+# a last term shorter than this is still being typed and does not filter yet ('ospf a')
+PREFIX_MIN = 2
+_TOKEN_RE = re.compile(r'[a-z0-9]+(?:[./:-][a-z0-9]+)*')
+_PART_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Lowercase tokens of text; '10.0.0.1' and 'ip-helper' are kept whole and also split."""
+    out = []
+    for tok in _TOKEN_RE.findall((text or '').lower()):
+        out.append(tok)
+        if not tok.isalnum():
+            out.extend(_PART_RE.findall(tok))
+    return out
+
+
+def scenario_fields(s):
+    """(field, text) pairs of a scenario from scenarios.json."""
+    yield 'title', s.get('title', '')
+    yield 'summary', s.get('summary', '')
+    yield 'text', s.get('scenario_description', '')
+    for o in s.get('objectives', []) + s.get('prerequisites', []):
+        yield 'objective', str(o)
+    for st in s.get('steps', []):
+        yield 'step', st.get('title', '') or ''
+        for c in st.get('commands', []):
+            yield 'command', str(c)
+        yield 'text', st.get('notes', '') or ''
+    yield 'text', s.get('full_config_snippet', '').replace('\\n', '\n')
+
+
+def lab_fields(lab):
+    """(field, text) pairs of a lab from labs.json."""
+    yield 'title', lab.get('title', '')
+    yield 'summary', lab.get('description', '') or ''
+    for st in lab.get('steps', []):
+        yield 'step', st.get('title', '') or ''
+        yield 'text', st.get('description', '') or ''
+        for e in st.get('expected', []):
+            if isinstance(e, str) and not e.startswith('re:'):
+                yield 'command', e.replace('\\n', '\n')
+
+
+def _signature(paths):
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+        except OSError:
+            sig.append([os.path.basename(path), None, None])
+    return sig
+
+
+class ScenarioIndex:
+    """Token -> {document: weight} postings with difficulty facets and prefix lookup.
+
+    docs holds (kind, position, difficulty) per document, kind being
+    'scenario' or 'lab' and position the index into that list.
+    """
+
+    def __init__(self, docs, postings):
+        self.docs = docs
+        self.postings = postings
+        self.vocabulary = sorted(postings)
+        self.facets = {}            # difficulty -> set of documents
+        for doc, (_, _, difficulty) in enumerate(docs):
+            self.facets.setdefault(difficulty, set()).add(doc)
+        self._prefix_cache = {}     # prefix -> ((lo, hi) vocabulary range, {document: weight})
+
+    @classmethod
+    def build(cls, scenarios=(), labs=()):
+        docs = []
+        postings = {}
+        sources = [('scenario', s, scenario_fields) for s in scenarios] + [('lab', l, lab_fields) for l in labs]
+        counters = {'scenario': 0, 'lab': 0}
+        for kind, item, fields in sources:
+            doc = len(docs)
+            docs.append((kind, counters[kind], (item.get('difficulty') or '').lower()))
+            counters[kind] += 1
+            for field, text in fields(item):
+                weight = FIELD_WEIGHTS[field]
+                for tok in tokenize(text):
+                    hits = postings.setdefault(tok, {})
+                    # the best field counts, not how often a word repeats in a config snippet
+                    if hits.get(doc, 0) < weight:
+                        hits[doc] = weight
+        return cls(docs, postings)
+
+    def to_json(self):
+        return {'docs': [list(d) for d in self.docs],
+                'postings': {tok: [[doc, w] for doc, w in hits.items()] for tok, hits in self.postings.items()}}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls([tuple(d) for d in data['docs']],
+                   {tok: {doc: w for doc, w in hits} for tok, hits in data['postings'].items()})
+
+    def _prefix(self, prefix):
+        """{document: weight} over every token starting with prefix, exact hits scoring
+        EXACT_BONUS more (memoized)."""
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return cached[1]
+        vocab = self.vocabulary
+        # the tokens of a longer prefix lie inside the range of the shorter one typed before it
+        shorter = self._prefix_cache.get(prefix[:-1])
+        lo, hi = shorter[0] if shorter is not None else (0, len(vocab))
+        lo = i = bisect_left(vocab, prefix, lo, hi)
+        found = {}
+        while i < hi and vocab[i].startswith(prefix):
+            for doc, w in self.postings[vocab[i]].items():
+                if found.get(doc, 0) < w:
+                    found[doc] = w
+            i += 1
+        for doc, w in self.postings.get(prefix, {}).items():
+            if found[doc] < w + EXACT_BONUS:
+                found[doc] = w + EXACT_BONUS
+        self._prefix_cache[prefix] = ((lo, i), found)
+        return found
+
+    def _term(self, term, prefix):
+        """{document: weight} for one query term; shared with the caches, never modify it."""
+        return self._prefix(term) if prefix else self.postings.get(term, {})
+
+    def search(self, query, difficulty=None, limit=None):
+        """Ranked (kind, position, score) for query, best first.
+
+        An empty query returns every document (filtered by difficulty) in
+        file order; difficulty None or 'all' does not filter.
+        """
+        allowed = None if difficulty in (None, '', 'all') else self.facets.get(difficulty.lower(), set())
+        docs = self.matches(query)
+        if docs is None:
+            ranked = [(doc, 0) for doc in (range(len(self.docs)) if allowed is None else sorted(allowed))[:limit]]
+        else:
+            if allowed is not None:
+                docs = {doc: score for doc, score in docs.items() if doc in allowed}
+            order = lambda item: (-item[1], item[0])
+            ranked = sorted(docs.items(), key=order) if limit is None \
+                else heapq.nsmallest(limit, docs.items(), key=order)
+        return [(self.docs[doc][0], self.docs[doc][1], score) for doc, score in ranked]
+
+    def matches(self, query):
+        """{document: score} (read-only) of the documents matching every term, or None for an
+        empty query."""
+        terms = query.lower().split()
+        scores = None
+        for n, raw in enumerate(terms):
+            explicit = raw.endswith('*')
+            parts = tokenize(raw.rstrip('*'))
+            if not parts:
+                continue
+            # '10.0.0.1' tokenizes to itself plus its parts; the whole token is the term
+            term = parts[0]
+            prefix = explicit or n == len(terms) - 1
+            if prefix and not explicit and len(term) < PREFIX_MIN:
+                continue
+            hits = self._term(term, prefix)
+            if scores is None:
+                scores = hits
+            else:
+                small, large = (scores, hits) if len(scores) <= len(hits) else (hits, scores)
+                scores = {doc: score + large[doc] for doc, score in small.items() if doc in large}
+            if not scores:
+                return {}
+        return scores
+
+    def facet_counts(self, query):
+        """{difficulty: number of matching documents} for query, ignoring the difficulty filter."""
+        docs = self.matches(query)
+        if docs is None:
+            return {d: len(members) for d, members in self.facets.items()}
+        counts = {}
+        for doc in docs:
+            d = self.docs[doc][2]
+            counts[d] = counts.get(d, 0) + 1
+        return counts
+
+
+def load_index(scenarios, labs, sources, cache_path=None):
+    """Index from cache_path when it was built from the current sources, else built and saved there.
+
+    A cache that cannot be read or written is ignored; the index is then
+    just built in memory.
+    """
+    sig = _signature(sources)
+    if cache_path:
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION and data.get('sources') == sig:
+                return ScenarioIndex.from_json(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    index = ScenarioIndex.build(scenarios, labs)
+    if cache_path:
+        try:
+            tmp = f'{cache_path}.tmp.{os.getpid()}'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(dict(index.to_json(), version=INDEX_VERSION, sources=sig), f, separators=(',', ':'))
+            os.replace(tmp, cache_path)
+        except OSError:
+            pass
+    return index
@@ -0,0 +1,132 @@
+"""Unit tests for device_sim (run with pytest)."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from device_sim import Device, LabSimulation
+from ios_grammar import load_grammar
+
+LABS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'labs.json')
+
+LAB = {
+    'diagram': {'nodes': [
+        {'id': 'r1', 'label': 'Router-1'},
+        {'id': 'r2', 'label': 'Router-2'},
+        {'id': 'pc', 'label': 'PC-A\\n192.168.1.10'},
+    ]},
+    'steps': [],
+}
+
+
+def configure(sim, *commands):
+    for command in commands:
+        sim.execute(command)
+
+
+def test_interface_state_drives_show_output():
+    sim = LabSimulation(LAB, load_grammar())
+    assert list(sim.devices) == ['Router-1', 'Router-2'] and sim.hosts == {'192.168.1.10'}
+    configure(sim, 'conf t', 'int g0/0', 'ip add 192.168.1.1 255.255.255.0', 'no shut')
+    assert sim.device.prompt() == 'Router-1(config-if)#'
+    brief = sim.execute('sh ip int br')[0]
+    assert 'GigabitEthernet0/0' in brief and '192.168.1.1' in brief and 'administratively' not in brief
+    assert 'C     192.168.1.0/24 is directly connected, GigabitEthernet0/0' in sim.execute('show ip route')[0]
+    assert '!!!!!' in sim.execute('ping 192.168.1.10')[0]
+    assert '.....' in sim.execute('ping 192.168.2.10')[0]
+
+    configure(sim, 'int g0/0', 'shutdown', 'end')
+    assert sim.device.prompt() == 'Router-1#'
+    assert 'administratively down' in sim.execute('show ip interface brief')[0]
+    assert '.....' in sim.execute('ping 192.168.1.10')[0]
+
+
+def test_ping_between_devices_needs_routes_both_ways():
+    sim = LabSimulation(LAB)
+    configure(sim, 'interface serial0/0/0', 'ip address 10.0.0.1 255.255.255.252')
+    sim.active = 'Router-2'
+    configure(sim, 'interface serial0/0/0', 'ip address 10.0.0.2 255.255.255.252',
+              'interface loopback0', 'ip address 2.2.2.2 255.255.255.255')
+    sim.active = 'Router-1'
+    assert '!!!!!' in sim.execute('ping 10.0.0.2')[0]
+    assert '.....' in sim.execute('ping 2.2.2.2')[0]
+    configure(sim, 'ip route 2.2.2.2 255.255.255.255 10.0.0.2')
+    assert '!!!!!' in sim.execute('ping 2.2.2.2')[0]
+    assert 'S     2.2.2.2/32 [1/0] via 10.0.0.2' in sim.execute('show ip route')[0]
+
+
+def test_vlans_and_running_config():
+    device = Device('SW1', 'switch')
+    for command in ['vlan 10', 'name DATA', 'interface fastethernet0/1', 'switchport mode access',
+                    'switchport access vlan 10', 'interface gigabitethernet0/1', 'switchport mode trunk',
+                    'ip domain-name lab.local', 'router ospf 1', 'network 10.0.0.0 0.0.0.255 area 0']:
+        device.execute(command)
+    vlans = device.execute('show vlan brief')
+    assert '10   DATA' in vlans and 'Fa0/1' in vlans
+    assert 'Gi0/1' in device.execute('show interfaces trunk')
+    config = device.execute('show running-config')
+    assert 'hostname SW1' in config and ' switchport access vlan 10' in config
+    assert 'router ospf 1\n network 10.0.0.0 0.0.0.255 area 0' in config
+    assert 'ip domain-name lab.local' in config
+    assert device.execute('show running-config | include ospf') == 'router ospf 1'
+    device.execute('no vlan 10')
+    assert '10   DATA' not in device.execute('show vlan brief')
+
+
+def test_snapshots_restore_without_replay():
+    device = Device('R1')
+    device.execute('interface gi0/0')
+    device.execute('ip address 10.1.1.1 255.255.255.0')
+    before = device.snapshot()
+    shared = device.interfaces()
+    device.execute('no shutdown')
+    device.execute('hostname EDGE')
+    device.execute('interface gi0/1')
+    assert device.interfaces() is not shared and 'gigabitethernet0/1' not in shared
+    assert device.prompt() == 'EDGE(config-if)#'
+    later = device.snapshot()
+
+    device.restore(before)
+    assert device.prompt() == 'R1(config-if)#'
+    assert list(device.interfaces()) == ['gigabitethernet0/0']
+    device.restore(later)
+    assert device.hostname == 'EDGE' and len(device.interfaces()) == 2
+    # restoring twice from the same snapshot still starts from its state
+    device.restore(before)
+    device.execute('interface gi0/2')
+    device.restore(before)
+    assert list(device.interfaces()) == ['gigabitethernet0/0']
+
+
+def test_every_shipped_lab_runs_on_the_simulation():
+    with open(LABS_FILE, 'r', encoding='utf-8') as f:
+        labs = json.load(f)
+    labs = labs if isinstance(labs, list) else labs.get('labs', [])
+    grammar = load_grammar()
+    for lab in labs:
+        sim = LabSimulation(lab, grammar)
+        start = sim.snapshot()
+        for step in lab.get('steps', []):
+            for expected in step.get('expected', []):
+                if not expected.startswith('re:'):
+                    sim.execute(expected)
+                    break
+        sim.execute('show running-config')
+        sim.restore(start)
+        assert sim.device.mode == ('exec',)
+
+
+def test_enable_secret_in_config_mode_is_configuration():
+    with open(LABS_FILE, 'r', encoding='utf-8') as f:
+        labs = json.load(f)
+    labs = labs if isinstance(labs, list) else labs.get('labs', [])
+    lab = next(lab for lab in labs if lab['title'] == 'Basic Router Initial Setup')
+    sim = LabSimulation(lab, load_grammar())
+    for step in lab['steps'][:2]:
+        for expected in step['expected']:
+            sim.execute(expected)
+    assert 'enable secret cisco123' in sim.execute('show running-config')[0]
+    # in exec mode "enable" still just enters privileged mode
+    sim.execute('end')
+    assert sim.execute('enable') == [] and sim.device.mode == ('exec',)
@@ -0,0 +1,89 @@
+"""Unit tests for ios_grammar (run with pytest)."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from ios_grammar import Grammar, inventory_commands, interface_name, load_grammar
+from lab_matcher import LabMatcher
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.fixture(scope='module')
+def grammar():
+    return load_grammar()
+
+
+@pytest.mark.parametrize('typed, full', [
+    ('sh ip int br', 'show ip interface brief'),
+    ('int g0/1', 'interface GigabitEthernet0/1'),
+    ('int gi 0/1', 'interface gigabitEthernet0/1'),
+    ('sh vl br', 'show vlan brief'),
+    ('sw mo tr', 'switchport mode trunk'),
+    ('ip add 10.0.10.1 255.255.255.0', 'ip address 10.0.10.1 255.255.255.0'),
+    ('sh run', 'show running-config'),
+])
+def test_abbreviations_resolve_to_the_full_command(grammar, typed, full):
+    result = grammar.resolve(typed)
+    assert result.complete, result.error
+    assert result.tokens == grammar.canonical(full)
+
+
+def test_ambiguous_and_unknown_commands(grammar):
+    assert 'ambiguous' in grammar.resolve('s').error
+    assert not grammar.resolve('sh ip').complete
+    result = grammar.resolve('frobnicate now')
+    assert not result.complete and result.tokens == ('frobnicate', 'now')
+    assert not grammar.same_commands('sh ip int', 'show ip interface brief')
+
+
+def test_prefix_table_and_arguments():
+    g = Grammar()
+    for command in ('show ip route', 'show ip rip', 'show interfaces', 'vlan 10', 'hostname AGG-SW'):
+        g.add(command)
+    g.finalize()
+    assert g.canonical('sh ip rou') == ('show', 'ip', 'route')
+    assert not g.resolve('sh ip r').complete
+    assert g.canonical('vlan 30') == ('vlan', '30')
+    assert g.canonical('host core-1') == ('hostname', 'core-1')
+    assert not g.resolve('vlan ten').complete
+    assert interface_name('Po10') == 'port-channel10'
+    assert interface_name('md5') is None
+
+
+def test_inventory_lines_are_parsed():
+    lines = [
+        '"answer": "interface vlan 10\\n ip address 10.0.10.1 255.255.255.0",\n',
+        '"expected": ["vlan 10\\\\n name DATA", "vlan 20"],\n',
+        '"ping 10.0.0.10": "reply",\n',
+        '"title": "Create VLANs",\n',
+        '- Saving config: `copy running-config startup-config` or `write memory`.\n',
+        'switchport trunk native 999   # optional\n',
+        '"Check show ip bgp summary and show ip bgp neighbors; inspect TCP resets",\n',
+    ]
+    assert list(inventory_commands(lines)) == [
+        ('interface vlan 10', 'top'), ('ip address 10.0.10.1 255.255.255.0', 'sub'),
+        ('vlan 10', 'top'), ('name DATA', 'sub'), ('vlan 20', 'top'),
+        ('ping 10.0.0.10', 'top'),
+        ('copy running-config startup-config', 'top'), ('write memory', 'top'),
+        ('switchport trunk native 999', 'top'),
+    ]
+
+
+def test_lab_steps_and_cli_answers_accept_abbreviations():
+    with open(os.path.join(BASE_DIR, 'labs.json'), encoding='utf-8') as f:
+        labs = json.load(f)['labs']
+    extra = [e for lab in labs for step in lab['steps'] for e in step['expected']]
+    g = load_grammar(extra=extra)
+    lab = next(lab for lab in labs if lab['title'] == 'Basic Access Switch Configuration')
+    matcher = LabMatcher(lab, g)
+    progress = {}
+    assert matcher.match(2, 'int g0/1', progress).status == 'partial'
+    assert matcher.match(2, 'sw mo acc', progress).status == 'partial'
+    assert matcher.match(2, 'sw acc vl 10', progress).status == 'complete'
+    assert g.same_commands('ip dhcp pool VOICE\\nnet 10.0.20.0 255.255.255.0',
+                           'ip dhcp pool VOICE\n network 10.0.20.0 255.255.255.0')
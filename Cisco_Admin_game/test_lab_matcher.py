@@ -0,0 +1,68 @@
+"""Unit tests for lab_matcher (run with pytest)."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from ios_grammar import load_grammar
+from lab_matcher import LabMatcher, split_commands
+
+LABS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'labs.json')
+
+LAB = {
+    'simulated': {
+        'ping 10.0.0.1': 'Success rate is 100 percent (5/5)',
+        're:^show ip int(erface)? br': 'Gi0/0  10.0.0.1  up  up',
+        're:([': 'never compiles',
+    },
+    'steps': [
+        {'expected': ['vlan 10\\nname DATA', 'vlan 20\\n name VOICE']},
+        {'expected': ['re:^router ospf \\d+$', 'show ip interface brief']},
+    ],
+}
+
+
+def test_multi_command_entry_is_entered_in_order():
+    matcher = LabMatcher(LAB)
+    progress = {}
+    assert matcher.match(0, 'name DATA', progress).status == 'wrong'
+    result = matcher.match(0, 'VLAN   10', progress)
+    assert (result.status, result.done, result.total) == ('partial', 1, 2)
+    assert matcher.match(0, 'name data', progress).status == 'complete'
+    assert matcher.match(0, 'vlan 20\\nname VOICE', {}).status == 'complete'
+
+
+def test_fragments_are_not_accepted():
+    matcher = LabMatcher(LAB)
+    assert matcher.match(1, 'show ip', {}).status == 'wrong'
+    assert matcher.match(1, 'show ip interface brief detail', {}).status == 'wrong'
+    assert matcher.match(0, 'vlan', {}).status == 'wrong'
+    assert matcher.match(1, 'router ospf 1', {}).status == 'complete'
+    assert matcher.match(1, 'router ospf one', {}).status == 'wrong'
+
+
+def test_simulated_outputs_and_hints():
+    matcher = LabMatcher(LAB)
+    result = matcher.match(1, 'show ip interface brief', {})
+    assert result.status == 'complete'
+    assert result.responses == ['Gi0/0  10.0.0.1  up  up']
+    assert matcher.match(1, ' ping  10.0.0.1', {}).responses == ['Success rate is 100 percent (5/5)']
+    assert matcher.hints(0) == ['vlan 10\\nname DATA', 'vlan 20\\nname VOICE']
+
+
+@pytest.mark.parametrize('with_grammar', [False, True])
+def test_every_shipped_lab_step_accepts_its_expected_commands(with_grammar):
+    with open(LABS_FILE, encoding='utf-8') as f:
+        labs = json.load(f)['labs']
+    grammar = load_grammar(extra=[e for lab in labs for step in lab['steps'] for e in step['expected']]) \
+        if with_grammar else None
+    for lab in labs:
+        matcher = LabMatcher(lab, grammar)
+        for index, step in enumerate(lab['steps']):
+            for expected in step['expected']:
+                progress = {}
+                results = [matcher.match(index, command, progress) for command in split_commands(expected)]
+                assert results[-1].status == 'complete', (lab['title'], expected)
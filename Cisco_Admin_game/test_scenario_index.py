@@ -0,0 +1,73 @@
+"""Unit tests for scenario_index (run with pytest)."""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from scenario_index import ScenarioIndex, load_index, tokenize
+
+SCENARIOS = [
+    {'title': 'Add VLANs to a Switch', 'difficulty': 'beginner', 'summary': 'Create VLANs and access ports.',
+     'steps': [{'title': 'Create VLANs', 'commands': ['vlan 10', ' name DATA']}]},
+    {'title': 'OSPF Multi-Area', 'difficulty': 'Advanced', 'summary': 'Areas and summarization.',
+     'steps': [{'title': 'Enable OSPF', 'commands': ['router ospf 1', ' network 10.0.0.0 0.0.0.255 area 0']}],
+     'full_config_snippet': 'interface vlan 10\\n ip address 10.0.10.1 255.255.255.0'},
+    {'title': 'Port Security', 'difficulty': 'beginner', 'summary': 'Limit MAC addresses on access ports.'},
+]
+LABS = [
+    {'title': 'DHCP Relay', 'difficulty': 'medium',
+     'steps': [{'title': 'Relay', 'description': 'Point the SVI at the server.',
+                'expected': ['interface vlan 10\\nip helper-address 10.0.0.10', 're:^ip dhcp']}]},
+]
+
+
+def titles(index, query, difficulty=None):
+    items = {'scenario': SCENARIOS, 'lab': LABS}
+    return [items[kind][pos]['title'] for kind, pos, _ in index.search(query, difficulty)]
+
+
+def test_tokens_keep_addresses_and_hyphenated_words_whole():
+    assert tokenize('ip helper-address 10.0.0.10') == ['ip', 'helper-address', 'helper', 'address',
+                                                       '10.0.0.10', '10', '0', '0', '10']
+
+
+def test_terms_prefixes_and_ranking():
+    index = ScenarioIndex.build(SCENARIOS, LABS)
+    # a title hit outranks a hit in a command, which outranks one in a config snippet
+    assert titles(index, 'vlan') == ['Add VLANs to a Switch', 'DHCP Relay', 'OSPF Multi-Area']
+    assert titles(index, 'vlan ospf') == ['OSPF Multi-Area']
+    # the last term is a prefix while typing; earlier ones must match whole tokens
+    assert titles(index, 'ospf netw') == ['OSPF Multi-Area']
+    assert titles(index, 'netw ospf') == []
+    assert titles(index, 'netw* ospf') == ['OSPF Multi-Area']
+    assert titles(index, 'helper 10.0.0.1') == ['DHCP Relay']
+    # a one-letter last term does not filter yet
+    assert titles(index, 'access p') == titles(index, 'access') == ['Add VLANs to a Switch', 'Port Security']
+    assert titles(index, 'nothing') == []
+    assert len(index.search('')) == 4
+
+
+def test_difficulty_facets():
+    index = ScenarioIndex.build(SCENARIOS, LABS)
+    assert titles(index, 'access', 'beginner') == ['Add VLANs to a Switch', 'Port Security']
+    assert titles(index, 'vlan', 'ADVANCED') == ['OSPF Multi-Area']
+    assert titles(index, '', 'medium') == ['DHCP Relay']
+    assert titles(index, 'vlan', 'expert') == []
+    assert index.facet_counts('vlan') == {'beginner': 1, 'advanced': 1, 'medium': 1}
+    assert index.facet_counts('') == {'beginner': 2, 'advanced': 1, 'medium': 1}
+
+
+def test_cache_is_used_until_a_source_changes(tmp_path):
+    source = tmp_path / 'scenarios.json'
+    source.write_text(json.dumps({'scenarios': SCENARIOS}))
+    cache = tmp_path / 'index.json'
+    built = load_index(SCENARIOS, LABS, [str(source)], str(cache))
+    assert cache.exists()
+    # the cache answers as long as the source is unchanged, whatever is passed in
+    loaded = load_index([], [], [str(source)], str(cache))
+    assert loaded.search('vlan ospf') == built.search('vlan ospf')
+    source.write_text(json.dumps({'scenarios': SCENARIOS[:1]}))
+    assert load_index(SCENARIOS[:1], [], [str(source)], str(cache)).search('ospf') == []
+    cache.write_text('not json')
+    assert len(load_index(SCENARIOS, [], [str(source)], str(cache)).docs) == 3
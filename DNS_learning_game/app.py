@@ -6,6 +6,7 @@ import os
 from datetime import datetime
 import platform
 import math
+import sys
 
 # Try to use winsound on Windows for very small sounds; otherwise pygame mixer fallback
 USE_WINSOUND = platform.system() == 'Windows'
@@ -22,6 +23,12 @@ else:
         pygame = None
 
 BASE_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..")))
+from learning_common.question_bank import get_bank
+from learning_common.storage import open_store
+from learning_common.tk_history import HistoryPager
+from learning_common.tk_study_search import StudySearchBar
+
 QUESTIONS_FILE = os.path.join(BASE_DIR, "questions.json")
 STUDY_FILE = os.path.join(BASE_DIR, "study_content.md")
 
@@ -73,33 +80,27 @@ def update_and_draw_confetti(canvas):
         except Exception:
             pass
 
-# Load questions
-with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
-    QUESTIONS = json.load(f)
+# Load questions (indexed by difficulty inside the shared bank)
+BANK = get_bank(QUESTIONS_FILE)
+QUESTIONS = BANK.questions
 
-# Organize by difficulty
 DIFFICULTIES = ["easy", "medium", "hard"]
-QUESTIONS_BY_DIFF = {d: [q for q in QUESTIONS if q.get("difficulty") == d] for d in DIFFICULTIES}
 
-# Scores history
-SCORES_FILE = os.path.join(BASE_DIR, "scores.json")
-def load_scores():
+# Scores history goes through the configured store (journal files or SQLite)
+SCORES_KEEP = 20
+HISTORY_PAGE_SIZE = 20
+STORE = open_store(BASE_DIR, "dns", scores_keep=SCORES_KEEP)
+
+def load_scores(limit=SCORES_KEEP, offset=0):
+    """Return one page of score records, newest first."""
     try:
-        if os.path.exists(SCORES_FILE):
-            with open(SCORES_FILE, "r", encoding="utf-8") as sf:
-                return json.load(sf)
+        return STORE.scores(limit, offset)
     except Exception:
-        pass
-    return []
+        return []
 
 def save_score_record(record):
-    scores = load_scores()
-    scores.insert(0, record)
-    # keep only last 20
-    scores = scores[:20]
     try:
-        with open(SCORES_FILE, "w", encoding="utf-8") as sf:
-            json.dump(scores, sf, indent=2)
+        STORE.add_score(record)
     except Exception:
         pass
 
@@ -172,6 +173,8 @@ class DNSLearnApp(tk.Tk):
         lbl.pack(pady=8)
 
         self.study_text = scrolledtext.ScrolledText(self.study_frame, wrap=tk.WORD)
+        self.study_search = StudySearchBar(self.study_frame, self.study_text, label="Search:")
+        self.study_search.pack(fill=tk.X, padx=10)
         self.study_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
         # Load study content
         try:
@@ -181,6 +184,7 @@ class DNSLearnApp(tk.Tk):
             content = "Study content not found."
         self.study_text.insert(tk.END, content)
         self.study_text.configure(state=tk.DISABLED)
+        self.study_search.load(content)
 
     def _build_quiz_tab(self):
         top_frame = ttk.Frame(self.quiz_frame)
@@ -253,29 +257,29 @@ class DNSLearnApp(tk.Tk):
         self.score = 0
 
     def _build_history_tab(self):
-        lbl = ttk.Label(self.history_frame, text="Score History (last 20)", font=(None, 14))
+        lbl = ttk.Label(self.history_frame, text="Score History", font=(None, 14))
         lbl.pack(pady=8)
-        self.history_list = tk.Listbox(self.history_frame, height=15)
-        self.history_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        self.history_pager = HistoryPager(self.history_frame, load_scores, STORE.score_count, self._format_score,
+                                          page_size=HISTORY_PAGE_SIZE, height=15)
+        self.history_pager.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        self.history_list = self.history_pager.listbox
         btn_frame = ttk.Frame(self.history_frame)
         btn_frame.pack(fill=tk.X, pady=6)
         ttk.Button(btn_frame, text="Clear History", command=self.clear_history).pack(side=tk.RIGHT, padx=6)
         self.update_history_view()
 
+    def _format_score(self, rec):
+        t = rec.get("time", "")
+        s = rec.get("score", 0)
+        d = rec.get("difficulty", "")
+        return f"{t} | {d} | {s}"
+
     def update_history_view(self):
-        self.history_list.delete(0, tk.END)
-        scores = load_scores()
-        for rec in scores:
-            t = rec.get("time", "")
-            s = rec.get("score", 0)
-            d = rec.get("difficulty", "")
-            pretty = f"{t} | {d} | {s}"
-            self.history_list.insert(tk.END, pretty)
+        self.history_pager.reset()
 
     def clear_history(self):
         try:
-            if os.path.exists(SCORES_FILE):
-                os.remove(SCORES_FILE)
+            STORE.clear_scores()
         except Exception:
             pass
         self.update_history_view()
@@ -300,11 +304,11 @@ class DNSLearnApp(tk.Tk):
 
     def start_quiz(self):
         diff = self.diff_var.get()
-        pool = QUESTIONS_BY_DIFF.get(diff, [])
-        if len(pool) < 20:
-            messagebox.showwarning("Not enough questions", f"Only {len(pool)} questions available for {diff}")
+        available = BANK.count(diff)
+        if available < 20:
+            messagebox.showwarning("Not enough questions", f"Only {available} questions available for {diff}")
             return
-        self.current_questions = random.sample(pool, 20)
+        self.current_questions = BANK.sample(20, difficulty=diff)
         self.current_index = 0
         self.score = 0
         self.score_var.set(self.score)
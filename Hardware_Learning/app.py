@@ -1,172 +1,225 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
+import copy
 import os
-import json
-from xml.etree import ElementTree as ET
-from werkzeug.utils import secure_filename
+import sys
+from datetime import datetime
 
 BASE_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, '..')))
+from learning_common.file_cache import CacheEntry, CachedBuild, CachedFile, load_json, load_text
+from learning_common.question_bank import get_bank
+from learning_common.storage import open_store
+from connector_index import build_connector_index
+from image_uploads import UploadError, UploadStore
+from svg_connectors import SvgCache, find_svg, refresh_components
+from svg_sprite import build_sprite
+
 COMPONENTS_FILE = os.path.join(BASE_DIR, 'components.json')
 QUESTIONS_FILE = os.path.join(BASE_DIR, 'questions.json')
 STUDY_FILE = os.path.join(BASE_DIR, 'study_content.md')
-REVIEW_FILE = os.path.join(BASE_DIR, 'review_list.json')
-WIRING_ATTEMPTS_FILE = os.path.join(BASE_DIR, 'wiring_attempts.json')
 IMAGES_DIR = os.path.join(BASE_DIR, 'static', 'images')
+SVG_CACHE_FILE = os.path.join(BASE_DIR, 'svg_cache.json')
 REAL_IMAGES_DIR = os.path.join(IMAGES_DIR, 'real')
 
 os.makedirs(REAL_IMAGES_DIR, exist_ok=True)
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
+# static files linked with a ?v=<mtime> version (see static_url) never change under
+# that URL, so browsers may keep them for a year; unversioned ones (diagram images
+# requested by app.js) are kept for a day and then revalidated
+STATIC_MAX_AGE_VERSIONED = 365 * 24 * 3600
+STATIC_MAX_AGE = 24 * 3600
+
+# wiring attempts and the review list go through the configured store
+# (wiring_attempts.jsonl + review_list.json by default, SQLite with LEARNING_STORAGE=sqlite)
+STORE = open_store(BASE_DIR, 'hardware', attempts_name='wiring_attempts')
+REVIEW_PAGE_SIZE = 100
+MAX_ATTEMPT_BATCH = 500
+# question ids are short ('q3', 'q_<hash>'); longer ones are dropped like malformed ones
+MAX_QUESTION_ID_LENGTH = 128
+
+# uploads are limited to HARDWARE_MAX_UPLOAD_MB (the request itself may be a little
+# larger for the multipart framing); minifying and thumbnails run on a background pool
+MAX_UPLOAD_BYTES = int(float(os.environ.get('HARDWARE_MAX_UPLOAD_MB', 8)) * 1024 * 1024)
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + 64 * 1024
+UPLOADS = UploadStore(REAL_IMAGES_DIR, MAX_UPLOAD_BYTES,
+                      workers=int(os.environ.get('HARDWARE_UPLOAD_WORKERS', 2)))
+
+# parsed data files are cached per process and re-read only when the file changes;
+# the GET endpoints send the cached, already-serialized JSON bodies
+COMPONENTS = CachedFile(COMPONENTS_FILE, load_json, default=[])
+QUESTIONS = CachedFile(QUESTIONS_FILE, lambda path: get_bank(path).questions, default=[])
+STUDY = CachedFile(STUDY_FILE, load_text, default='')
+
 
 def load_components():
+    """Cached component list; copy it before making changes."""
+    return COMPONENTS.get()
+
+
+def save_components(comps):
+    COMPONENTS.store(comps)
+
+
+def connector_index():
+    """Grid index of connector positions, rebuilt when components.json changes."""
+    return COMPONENTS.derived('connector_index', build_connector_index).data
+
+
+def components_with_index(comps):
+    return {'components': comps, 'connector_index': build_connector_index(comps)}
+
+
+def _sprite_sources():
+    paths = [COMPONENTS_FILE]
+    for c in load_components():
+        path = find_svg(IMAGES_DIR, c.get('image'))
+        if path:
+            paths.append(path)
+    return paths
+
+
+def _read_image(name):
+    path = find_svg(IMAGES_DIR, name)
+    if not path:
+        return None
     try:
-        with open(COMPONENTS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _build_sprite():
+    # read components.json directly so the sprite never lags behind the file it was keyed on
+    try:
+        comps = load_json(COMPONENTS_FILE)
     except Exception:
-        return []
+        comps = []
+    body, placed = build_sprite(comps, _read_image)
+    return CacheEntry(placed, body=body)
+
+
+# one minified sprite with a <symbol> per component image, rebuilt only when
+# components.json or one of the images changes
+SPRITE = CachedBuild(_build_sprite, _sprite_sources)
 
 
 def load_study():
+    return STUDY.get()
+
+
+def cached_response(entry, mimetype='application/json'):
+    """Serve a cache entry's body with a strong ETag, 304 revalidation and gzip/br."""
+    accepted = {enc for enc, q in request.accept_encodings if q > 0}
+    encoding, payload = entry.encoded(accepted)
+    etag = entry.etag(encoding)
+    if request.if_none_match.contains(etag):
+        resp = Response(status=304)
+    else:
+        resp = Response(payload, mimetype=mimetype)
+        if encoding:
+            resp.headers['Content-Encoding'] = encoding
+    resp.set_etag(etag)
+    resp.headers['Vary'] = 'Accept-Encoding'
+    # browsers keep the copy but revalidate it on every load
+    resp.headers['Cache-Control'] = 'no-cache'
+    return resp
+
+
+def load_review(limit=None, offset=0):
     try:
-        with open(STUDY_FILE, 'r', encoding='utf-8') as f:
-            return f.read()
+        return STORE.review_ids(limit=limit, offset=offset)
     except Exception:
-        return ''
+        return []
+
+
+def load_questions():
+    return QUESTIONS.get()
 
 
-def load_review():
+def add_review(name):
     try:
-        if os.path.exists(REVIEW_FILE):
-            with open(REVIEW_FILE, 'r', encoding='utf-8') as rf:
-                return json.load(rf)
+        STORE.add_review(name)
     except Exception:
         pass
-    return []
 
 
-def load_questions():
+def load_wiring_attempts(limit=50, offset=0, question_id=None):
+    """Recent wiring attempts, newest first."""
     try:
-        with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return STORE.attempts(limit=limit, offset=offset, question_id=question_id)
     except Exception:
         return []
 
 
-def parse_svg_and_get_connectors(svg_path):
-    """Parse an SVG file and return a dict of connectors with absolute positions in the SVG coordinate space.
-    Supports nested translate(x,y) group transforms.
-    Returns: { 'data-conn-id': { 'x':float, 'y':float } }
-    """
+def record_wiring_attempt(attempt):
+    """Store one attempt; returns the total attempt count."""
     try:
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
+        return STORE.record_attempt(attempt)
     except Exception:
-        return {}
-
-    ns = {'svg': 'http://www.w3.org/2000/svg'}
-
-    def parse_translate(t):
-        # very small parser for translate(tx,ty) or translate(tx)
-        if not t: return (0.0, 0.0)
-        t = t.strip()
-        if t.startswith('translate'):
-            inside = t[t.find('(')+1:t.find(')')]
-            parts = [p for p in inside.replace(',', ' ').split() if p]
-            try:
-                if len(parts) == 1:
-                    return (float(parts[0]), 0.0)
-                return (float(parts[0]), float(parts[1]))
-            except Exception:
-                return (0.0, 0.0)
-        return (0.0, 0.0)
-
-    connectors = {}
-
-    def walk(el, acc_tx=0.0, acc_ty=0.0):
-        # accumulate translate transforms only
-        tr = el.get('transform')
-        tx, ty = parse_translate(tr)
-        cur_tx = acc_tx + tx
-        cur_ty = acc_ty + ty
-
-        # check if element itself is a connector (has data-conn attribute)
-        data_conn = el.get('data-conn') or el.get('{http://www.w3.org/1999/xlink}data-conn')
-        if data_conn is None:
-            # also allow attribute without namespace
-            data_conn = el.get('data-conn')
-
-        if data_conn:
-            # try common position attributes: cx/cy, x/y
-            cx = el.get('cx')
-            cy = el.get('cy')
-            if cx is not None and cy is not None:
-                try:
-                    x = float(cx) + cur_tx
-                    y = float(cy) + cur_ty
-                    connectors[data_conn] = {'x': x, 'y': y}
-                except Exception:
-                    pass
-            else:
-                # rect center fallback
-                xattr = el.get('x'); yattr = el.get('y')
-                wattr = el.get('width'); hattr = el.get('height')
-                try:
-                    if xattr and yattr and wattr and hattr:
-                        x = float(xattr) + float(wattr)/2 + cur_tx
-                        y = float(yattr) + float(hattr)/2 + cur_ty
-                        connectors[data_conn] = {'x': x, 'y': y}
-                except Exception:
-                    pass
-
-        # recurse
-        for child in list(el):
-            walk(child, cur_tx, cur_ty)
-
-    walk(root, 0.0, 0.0)
-    return connectors
-
-
-def svg_viewbox_size(svg_path):
+        return None
+
+
+def record_wiring_attempts(attempts):
+    """Store a batch of attempts and review their wrong questions in one write; returns the total count."""
+    review = [a['question_id'] for a in attempts if not a['ok'] and a['question_id']]
     try:
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
-        vb = root.get('viewBox')
-        if vb:
-            parts = [float(p) for p in vb.strip().split()]
-            return (parts[2], parts[3])
-        w = root.get('width'); h = root.get('height')
-        if w and h:
-            try:
-                return (float(w), float(h))
-            except Exception:
-                pass
+        return STORE.record_attempts(attempts, review=review)
     except Exception:
-        pass
-    return (None, None)
+        return None
 
 
-def save_review(lst):
+def wiring_attempt_from(data):
+    # an id sent as a number is kept as its string; any other non-string id is dropped so a
+    # bad client record cannot fail the review-list write after the attempts were journaled
+    qid = data.get('question_id')
+    if isinstance(qid, int) and not isinstance(qid, bool):
+        qid = str(qid)
+    elif not isinstance(qid, str) or len(qid) > MAX_QUESTION_ID_LENGTH:
+        qid = None
+    # buffered clients send the time of the drag; single posts (and unparsable times) are
+    # stamped on arrival
+    t = data.get('time')
     try:
-        with open(REVIEW_FILE, 'w', encoding='utf-8') as rf:
-            json.dump(lst, rf, indent=2)
-    except Exception:
-        pass
+        t = datetime.fromisoformat(t).isoformat() if isinstance(t, str) else None
+    except ValueError:
+        t = None
+    return {
+        'question_id': qid,
+        'from': data.get('from'),
+        'to': data.get('to'),
+        'ok': bool(data.get('ok')),
+        'time': t or datetime.now().isoformat()
+    }
 
 
-def load_wiring_attempts():
+@app.template_global()
+def static_url(filename):
+    """URL of a static file with its modification time as a cache-busting version."""
     try:
-        if os.path.exists(WIRING_ATTEMPTS_FILE):
-            with open(WIRING_ATTEMPTS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-    except Exception:
-        pass
-    return []
+        version = format(os.stat(os.path.join(app.static_folder, filename)).st_mtime_ns, 'x')
+    except OSError:
+        return f'/static/{filename}'
+    return f'/static/{filename}?v={version}'
 
 
-def save_wiring_attempts(lst):
+@app.after_request
+def static_cache_headers(resp):
+    if request.path.startswith('/static/') and resp.status_code in (200, 304):
+        if 'v' in request.args:
+            resp.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE_VERSIONED}, immutable'
+        else:
+            resp.headers['Cache-Control'] = f'public, max-age={STATIC_MAX_AGE}'
+    return resp
+
+
+def flush_writes():
+    """Finish queued upload processing and close the journals; called on server shutdown."""
+    UPLOADS.shutdown()
     try:
-        with open(WIRING_ATTEMPTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(lst, f, indent=2)
+        STORE.close()
     except Exception:
         pass
 
@@ -175,59 +228,38 @@ def save_wiring_attempts(lst):
 def index():
     comps = load_components()
     study = load_study()
-    review = load_review()
     questions = load_questions()
-    return render_template('index.html', components=comps, study=study, review_count=len(review), questions=questions)
+    return render_template('index.html', components=comps, study=study, review_count=STORE.review_count(), questions=questions,
+                           connector_index=connector_index())
 
 
 @app.route('/api/components')
 def api_components():
-    return jsonify(load_components())
+    # ?index=1 wraps the list together with the connector grid used by the wiring UI
+    if request.args.get('index'):
+        return cached_response(COMPONENTS.derived('with_index', components_with_index))
+    return cached_response(COMPONENTS.entry())
+
+
+@app.route('/api/diagram.svg')
+def api_diagram_svg():
+    """All component images as one SVG sprite: <symbol>s placed with <use> at their boxes."""
+    return cached_response(SPRITE.entry(), 'image/svg+xml')
 
 
 @app.route('/api/components/refresh', methods=['POST'])
 def api_components_refresh():
     """Scan component images (SVG) and update connector coords in components.json by mapping SVG coords into the main diagram coordinate space."""
-    comps = load_components()
-    changed = 0
-    for c in comps:
-        img = c.get('image')
-        if not img or not img.lower().endswith('.svg'):
-            continue
-        svg_path = os.path.join(IMAGES_DIR, img)
-        if not os.path.exists(svg_path):
-            # try in real/ subdir
-            svg_path = os.path.join(REAL_IMAGES_DIR, img)
-            if not os.path.exists(svg_path):
-                continue
-
-        svg_w, svg_h = svg_viewbox_size(svg_path)
-        if not svg_w or not svg_h:
-            continue
-
-        conn_map = parse_svg_and_get_connectors(svg_path)
-        # map into main diagram coords using component svg box
-        box = c.get('svg') or {}
-        bx = box.get('x', 0); by = box.get('y', 0); bw = box.get('w', box.get('width', 0)); bh = box.get('h', box.get('height', 0))
-        new_connectors = []
-        for k, v in conn_map.items():
-            # data-conn formatted like 'component.connector' or full id
-            parts = k.split('.')
-            conn_id = parts[-1]
-            # scale
-            sx = bx + (v['x'] / svg_w) * bw
-            sy = by + (v['y'] / svg_h) * bh
-            new_connectors.append({'id': conn_id, 'x': round(sx,1), 'y': round(sy,1)})
-
-        if new_connectors:
-            c['connectors'] = new_connectors
-            changed += 1
+    comps = copy.deepcopy(load_components())
+    # each SVG is parsed once, and only when its content hash is not in the cache yet
+    cache = SvgCache(SVG_CACHE_FILE)
+    changed, _ = refresh_components(comps, IMAGES_DIR, cache)
+    cache.save()
 
     # save back
     if changed:
         try:
-            with open(COMPONENTS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(comps, f, indent=2)
+            save_components(comps)
         except Exception:
             pass
     return jsonify({'ok': True, 'updated_components': changed})
@@ -240,7 +272,7 @@ def api_components_save():
     connectors = data.get('connectors')
     if not comp_id or connectors is None:
         return jsonify({'ok': False, 'error': 'missing id or connectors'}), 400
-    comps = load_components()
+    comps = copy.deepcopy(load_components())
     found = False
     for c in comps:
         if c.get('id') == comp_id:
@@ -251,8 +283,7 @@ def api_components_save():
     if not found:
         return jsonify({'ok': False, 'error': 'component not found'}), 404
     try:
-        with open(COMPONENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(comps, f, indent=2)
+        save_components(comps)
     except Exception:
         return jsonify({'ok': False, 'error': 'save failed'}), 500
     return jsonify({'ok': True})
@@ -260,23 +291,36 @@ def api_components_save():
 
 @app.route('/api/upload_image', methods=['POST'])
 def api_upload_image():
+    """Store an uploaded image under static/images/real, deduplicated by content.
+
+    Returns as soon as the file is on disk; SVG minification and raster
+    thumbnails finish in the background.
+    """
     if 'file' not in request.files:
         return jsonify({'ok': False, 'error': 'no file'}), 400
     f = request.files['file']
     if f.filename == '':
         return jsonify({'ok': False, 'error': 'empty filename'}), 400
-    filename = secure_filename(f.filename)
-    save_path = os.path.join(REAL_IMAGES_DIR, filename)
     try:
-        f.save(save_path)
-        return jsonify({'ok': True, 'path': 'real/' + filename})
-    except Exception as e:
+        saved = UPLOADS.save(f.stream, f.filename)
+    except UploadError as e:
+        return jsonify({'ok': False, 'error': str(e)}), e.status
+    except OSError as e:
         return jsonify({'ok': False, 'error': str(e)}), 500
+    thumb = saved['thumbnail']
+    return jsonify({'ok': True, 'path': 'real/' + saved['path'], 'duplicate': saved['duplicate'],
+                    'size': saved['size'], 'digest': saved['digest'],
+                    'thumbnail': 'real/' + thumb if thumb else None})
+
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({'ok': False, 'error': f'upload is larger than {MAX_UPLOAD_BYTES} bytes'}), 413
 
 
 @app.route('/api/questions')
 def api_questions():
-    return jsonify(load_questions())
+    return cached_response(QUESTIONS.entry())
 
 
 @app.route('/api/review/add', methods=['POST'])
@@ -285,41 +329,55 @@ def api_review_add():
     name = data.get('name')
     if not name:
         return jsonify({'ok': False, 'error': 'missing name'}), 400
-    lst = load_review()
-    if name not in lst:
-        lst.append(name)
-        save_review(lst)
-    return jsonify({'ok': True, 'count': len(lst)})
+    add_review(name)
+    return jsonify({'ok': True, 'count': STORE.review_count()})
 
 
 @app.route('/api/review/list')
 def api_review_list():
-    return jsonify(load_review())
+    """Review entries in the order they were added; ?limit=&offset= select one page.
+
+    The response stays a plain JSON array; the total is sent in X-Total-Count.
+    """
+    limit = request.args.get('limit', type=int)
+    offset = max(0, request.args.get('offset', 0, type=int))
+    if limit is not None:
+        limit = max(0, min(limit, REVIEW_PAGE_SIZE))
+    resp = jsonify(load_review(limit, offset))
+    resp.headers['X-Total-Count'] = str(STORE.review_count())
+    return resp
 
 
 @app.route('/api/wiring_attempt', methods=['POST'])
 def api_wiring_attempt():
-    data = request.get_json() or {}
-    qid = data.get('question_id')
-    frm = data.get('from')
-    to = data.get('to')
-    ok = bool(data.get('ok'))
-    attempt = {
-        'question_id': qid,
-        'from': frm,
-        'to': to,
-        'ok': ok
-    }
-    lst = load_wiring_attempts()
-    lst.append(attempt)
-    save_wiring_attempts(lst)
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'ok': False, 'error': 'expected an attempt object'}), 400
+    attempt = wiring_attempt_from(data)
+    count = record_wiring_attempt(attempt)
     # if incorrect, add to review list (by question id)
-    if not ok and qid:
-        review = load_review()
-        if qid not in review:
-            review.append(qid)
-            save_review(review)
-    return jsonify({'ok': True, 'saved': True, 'count': len(lst)})
+    if not attempt['ok'] and attempt['question_id']:
+        add_review(attempt['question_id'])
+    return jsonify({'ok': True, 'saved': count is not None, 'count': count})
+
+
+@app.route('/api/wiring_attempts', methods=['POST'])
+def api_wiring_attempts():
+    """Batch form of /api/wiring_attempt: {"attempts": [...]} (or a bare array).
+
+    The whole batch, including review-list additions for wrong answers, is
+    written in one storage transaction.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('attempts') if isinstance(data, dict) else data
+    if not isinstance(items, list) or not all(isinstance(a, dict) for a in items):
+        return jsonify({'ok': False, 'error': 'expected a list of attempts'}), 400
+    if len(items) > MAX_ATTEMPT_BATCH:
+        return jsonify({'ok': False, 'error': f'at most {MAX_ATTEMPT_BATCH} attempts per batch'}), 413
+    if not items:
+        return jsonify({'ok': True, 'saved': 0, 'count': None})
+    count = record_wiring_attempts([wiring_attempt_from(a) for a in items])
+    return jsonify({'ok': True, 'saved': len(items) if count is not None else 0, 'count': count})
 
 
 if __name__ == '__main__':
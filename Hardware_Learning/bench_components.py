@@ -0,0 +1,79 @@
+"""Load test for GET /api/components on a running server.
+
+    python serve.py &
+    python bench_components.py --clients 32 --seconds 10
+
+Each client thread keeps one HTTP/1.1 connection open and requests the
+endpoint in a loop. Reports requests/sec and latency percentiles; with
+--gzip the requests accept gzip and with --etag they revalidate with
+If-None-Match (the common case for repeat page loads).
+"""
+import argparse
+import http.client
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def client_loop(host, port, path, headers, deadline, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status not in (200, 304):
+                errors.append(resp.status)
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(type(e).__name__)
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Load test GET /api/components.')
+    ap.add_argument('--url', default='http://127.0.0.1:8000/api/components')
+    ap.add_argument('--clients', type=int, default=32)
+    ap.add_argument('--seconds', type=float, default=10)
+    ap.add_argument('--gzip', action='store_true', help='send Accept-Encoding: gzip')
+    ap.add_argument('--etag', action='store_true', help='revalidate with If-None-Match')
+    args = ap.parse_args(argv)
+
+    parts = urlsplit(args.url)
+    host, port, path = parts.hostname, parts.port or 80, parts.path or '/'
+    headers = {'Accept-Encoding': 'gzip'} if args.gzip else {}
+    if args.etag:
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        conn.request('GET', path, headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        headers['If-None-Match'] = resp.getheader('ETag', '')
+        conn.close()
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=client_loop, args=(host, port, path, headers, deadline, latencies, errors))
+               for _ in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if not latencies:
+        print('no successful requests', errors[:5])
+        return 1
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f'{len(latencies)} requests in {args.seconds:.0f}s from {args.clients} clients: '
+          f'{len(latencies) / args.seconds:.0f} req/s, p50 {pct(0.5):.1f} ms, p99 {pct(0.99):.1f} ms, '
+          f'{len(errors)} errors')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""Concurrent write benchmark for /api/wiring_attempt and /api/review/add.
+
+Fires many POSTs at once and checks that no wiring attempt or review entry
+is lost. By default it runs the Flask app in-process against a scratch copy
+of the data files (threads stand in for browsers); with --url it targets a
+running server instead, and with --processes it also starts several
+in-process app copies sharing the same scratch files.
+
+    python bench_wiring_writes.py --requests 1000 --concurrency 200
+    python bench_wiring_writes.py --processes 4
+    python bench_wiring_writes.py --url http://127.0.0.1:8000 --requests 500
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, '..')))
+
+
+def attempt_body(worker, i):
+    # every tenth attempt is wrong, which also adds its question to the review list
+    return {'question_id': f'bench-{worker}-{i}', 'from': 'router.wan', 'to': 'switch.sw_port1', 'ok': i % 10 != 0}
+
+
+def in_process_client(data_dir):
+    # with LEARNING_STORAGE=sqlite keep the database in the scratch directory too
+    os.environ['LEARNING_DB'] = os.path.join(data_dir, 'learning.db')
+    import app
+    from learning_common.storage import open_store
+    app.STORE = open_store(data_dir, 'hardware', attempts_name='wiring_attempts')
+    client = app.app.test_client()
+
+    def post(path, body):
+        r = client.post(path, json=body)
+        return r.status_code, r.get_json()
+    return post
+
+
+def url_client(base):
+    def post(path, body):
+        req = urllib.request.Request(base.rstrip('/') + path, data=json.dumps(body).encode('utf-8'),
+                                     headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=30) as r:
+            return r.status, json.loads(r.read().decode())
+    return post
+
+
+def run(post, worker, requests, concurrency):
+    """POST `requests` wiring attempts plus one review add per attempt; returns (seconds, failures)."""
+    def one(i):
+        failures = 0
+        status, _ = post('/api/wiring_attempt', attempt_body(worker, i))
+        failures += status != 200
+        status, _ = post('/api/review/add', {'name': f'bench-name-{worker}-{i}'})
+        failures += status != 200
+        return failures
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        failures = sum(pool.map(one, range(requests)))
+    return time.perf_counter() - start, failures
+
+
+def _process_main(data_dir, worker, requests, concurrency, out):
+    out.put(run(in_process_client(data_dir), worker, requests, concurrency))
+
+
+def verify(data_dir, workers, requests):
+    from learning_common.storage import open_store
+    store = open_store(data_dir, 'hardware', attempts_name='wiring_attempts')
+    expected_ids = {f'bench-{w}-{i}' for w in workers for i in range(requests)}
+    # the SQLite store may also hold rows imported from the app folder; only count ours
+    seen = [a.get('question_id') for a in store.attempts(limit=store.attempt_count())]
+    seen = [qid for qid in seen if qid in expected_ids]
+    review = set(store.review_ids())
+    lost_attempts = len(expected_ids - set(seen))
+    duplicates = len(seen) - len(set(seen))
+    wrong = {f'bench-{w}-{i}' for w in workers for i in range(0, requests, 10)}
+    names = {f'bench-name-{w}-{i}' for w in workers for i in range(requests)}
+    lost_review = len((wrong | names) - review)
+    store.close()
+    return lost_attempts, duplicates, lost_review
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--requests', type=int, default=500, help='wiring attempts per worker process')
+    ap.add_argument('--concurrency', type=int, default=200, help='concurrent POSTs per worker process')
+    ap.add_argument('--processes', type=int, default=1, help='in-process app copies sharing the files')
+    ap.add_argument('--url', help='benchmark a running server instead of an in-process app')
+    args = ap.parse_args()
+
+    if args.url:
+        # attempts from a live server cannot be inspected directly; rely on status codes
+        secs, failures = run(url_client(args.url), 'url', args.requests, args.concurrency)
+        total = args.requests * 2
+        print(f'{total} POSTs in {secs:.2f}s ({total / secs:.0f}/s), {failures} failed')
+        return 1 if failures else 0
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        workers = list(range(args.processes))
+        start = time.perf_counter()
+        if args.processes == 1:
+            _, failures = run(in_process_client(data_dir), 0, args.requests, args.concurrency)
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            out = ctx.Queue()
+            procs = [ctx.Process(target=_process_main, args=(data_dir, w, args.requests, args.concurrency, out))
+                     for w in workers]
+            for p in procs:
+                p.start()
+            failures = sum(out.get()[1] for _ in procs)
+            for p in procs:
+                p.join()
+        secs = time.perf_counter() - start
+        lost_attempts, duplicates, lost_review = verify(data_dir, workers, args.requests)
+
+    total = args.requests * 2 * len(workers)
+    print(f'{total} POSTs from {len(workers)} process(es) x {args.concurrency} threads '
+          f'in {secs:.2f}s ({total / secs:.0f}/s)')
+    print(f'failed requests: {failures}, lost attempts: {lost_attempts}, '
+          f'duplicate attempts: {duplicates}, lost review entries: {lost_review}')
+    return 1 if failures or lost_attempts or duplicates or lost_review else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
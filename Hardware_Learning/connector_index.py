@@ -0,0 +1,52 @@
+"""Uniform-grid spatial index of connector positions for the wiring UI.
+
+The index is built once per components.json version and shipped to the
+browser, which looks up the nearest connector by checking only the grid
+cells around the pointer instead of every connector on the diagram.
+"""
+import math
+
+GRID_CELL = 32
+
+
+def build_connector_index(comps, cell=GRID_CELL):
+    """Bucket every connector into square cells of `cell` diagram units.
+
+    Returns {'cell': cell, 'count': n, 'cells': {'i,j': [[id, x, y], ...]}}
+    where id is 'component.connector' and i, j are floor(x / cell) and
+    floor(y / cell).
+    """
+    cells = {}
+    count = 0
+    for c in comps:
+        for co in c.get('connectors') or []:
+            try:
+                x = float(co['x']); y = float(co['y'])
+            except (KeyError, TypeError, ValueError):
+                continue
+            key = f'{math.floor(x / cell)},{math.floor(y / cell)}'
+            cells.setdefault(key, []).append([f"{c.get('id')}.{co.get('id')}", x, y])
+            count += 1
+    return {'cell': cell, 'count': count, 'cells': cells}
+
+
+def nearest_connector(index, x, y, max_dist, accept=None):
+    """Nearest connector within max_dist of (x, y) as (id, distance), or (None, inf).
+
+    Mirrors the lookup in static/js/app.js; accept optionally filters ids.
+    """
+    cell = index['cell']
+    r = max(1, math.ceil(max_dist / cell))
+    ci = math.floor(x / cell); cj = math.floor(y / cell)
+    best, best_d = None, math.inf
+    for i in range(ci - r, ci + r + 1):
+        for j in range(cj - r, cj + r + 1):
+            for cid, px, py in index['cells'].get(f'{i},{j}', ()):
+                if accept is not None and cid not in accept:
+                    continue
+                d = math.hypot(px - x, py - y)
+                if d < best_d:
+                    best, best_d = cid, d
+    if best_d > max_dist:
+        return None, math.inf
+    return best, best_d
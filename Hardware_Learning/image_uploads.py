@@ -0,0 +1,221 @@
+"""Image upload pipeline for the Hardware app.
+
+UploadStore.save() streams an upload to disk in chunks, hashing it as it
+goes and stopping once it passes max_bytes. Files are stored as
+<name>-<first 12 hex digits of sha256><ext>, so uploading the same content
+again (under any name) returns the existing file instead of a new copy.
+Stored files are indexed by digest once, when the store is created, so a
+duplicate is found with a dictionary lookup rather than a directory scan.
+
+The slower work runs afterwards on a small thread pool so the request can
+return straight away: SVGs are minified in place (svg_sprite.minify_svg),
+and raster images get a downscaled thumbnail in thumbs/ when Pillow is
+installed (pip install Pillow); without it rasters are stored unchanged.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree as ET
+
+from werkzeug.utils import secure_filename
+
+from svg_sprite import minify_svg
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+CHUNK_SIZE = 64 * 1024
+DIGEST_LEN = 12
+THUMB_SIZE = (256, 256)
+THUMBS_DIR = 'thumbs'
+
+# leading bytes of each accepted format; SVG is text so it is checked separately
+RASTER_MAGIC = {
+    '.png': (b'\x89PNG\r\n\x1a\n',),
+    '.jpg': (b'\xff\xd8\xff',),
+    '.jpeg': (b'\xff\xd8\xff',),
+    '.gif': (b'GIF87a', b'GIF89a'),
+    '.webp': (b'RIFF',),
+}
+ALLOWED_EXTENSIONS = set(RASTER_MAGIC) | {'.svg'}
+_STORED_RE = re.compile(r'-([0-9a-f]{%d})\.[^.]+$' % DIGEST_LEN)
+
+
+class UploadError(ValueError):
+    """Upload rejected; status is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _check_format(ext, head):
+    if ext == '.svg':
+        if b'<svg' not in head.lower():
+            raise UploadError('file is not an SVG image')
+        return
+    if not head.startswith(RASTER_MAGIC[ext]) or (ext == '.webp' and head[8:12] != b'WEBP'):
+        raise UploadError(f'file content does not match its {ext} extension')
+
+
+class UploadStore:
+    """Content-addressed image uploads under directory.
+
+    Paths returned by save() are relative to directory. workers bounds the
+    background pool; pending() lists files still being processed.
+    """
+
+    def __init__(self, directory, max_bytes, workers=2, thumb_size=THUMB_SIZE):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload')
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._by_digest = self._scan()
+
+    def _scan(self):
+        """{digest prefix: file name} of the files already stored."""
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return {}
+        found = {}
+        for name in names:
+            m = _STORED_RE.search(name)
+            if m:
+                found.setdefault(m.group(1), name)
+        return found
+
+    def _existing(self, key, target):
+        """Stored file with digest prefix key, or None; target is the name this upload would get."""
+        name = self._by_digest.get(key)
+        if name is not None and os.path.exists(os.path.join(self.directory, name)):
+            return name
+        # another process may have stored the same upload under the same name
+        if os.path.exists(os.path.join(self.directory, target)):
+            self._by_digest[key] = target
+            return target
+        return None
+
+    def save(self, stream, filename):
+        """Store one upload; returns {'path', 'digest', 'size', 'duplicate', 'thumbnail'}."""
+        name = secure_filename(filename or '')
+        stem, ext = os.path.splitext(name)
+        ext = ext.lower()
+        if ext not in ALLOWED_EXTENSIONS:
+            raise UploadError(f'unsupported file type {ext or "(none)"}', 415)
+        os.makedirs(self.directory, exist_ok=True)
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.upload-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if size == 0:
+                        _check_format(ext, chunk)
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadError(f'file is larger than {self.max_bytes} bytes', 413)
+                    sha.update(chunk)
+                    out.write(chunk)
+            if size == 0:
+                raise UploadError('empty file')
+            digest = sha.hexdigest()
+            key = digest[:DIGEST_LEN]
+            target = f'{stem or "image"}-{key}{ext}'
+            with self._lock:
+                existing = self._existing(key, target)
+                if existing is None:
+                    os.replace(tmp, os.path.join(self.directory, target))
+                    tmp = None
+                    self._by_digest[key] = target
+                    self._jobs[target] = self._pool.submit(self._process, target)
+        finally:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+        final = existing or target
+        return {
+            'path': final,
+            'digest': digest,
+            'size': size,
+            'duplicate': existing is not None,
+            'thumbnail': self.thumbnail_path(final),
+        }
+
+    def thumbnail_path(self, name):
+        """Relative path of name's thumbnail, or None if none is made for it."""
+        if Image is None or name.lower().endswith('.svg'):
+            return None
+        return f'{THUMBS_DIR}/{os.path.splitext(name)[0]}.png'
+
+    def _process(self, name):
+        try:
+            path = os.path.join(self.directory, name)
+            if name.lower().endswith('.svg'):
+                self._minify(path)
+            elif Image is not None:
+                self._thumbnail(path, os.path.join(self.directory, self.thumbnail_path(name)))
+        finally:
+            with self._lock:
+                self._jobs.pop(name, None)
+
+    def _minify(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            small = minify_svg(data)
+        except ET.ParseError:
+            return
+        if len(small) < len(data):
+            _write_atomic(path, small)
+
+    def _thumbnail(self, path, thumb):
+        os.makedirs(os.path.dirname(thumb), exist_ok=True)
+        with Image.open(path) as img:
+            img.thumbnail(self.thumb_size)
+            if img.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                img = img.convert('RGBA')
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(thumb), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as out:
+                img.save(out, 'PNG', optimize=True)
+        os.replace(tmp, thumb)
+
+    def pending(self):
+        with self._lock:
+            return sorted(self._jobs)
+
+    def wait(self, timeout=None):
+        """Block until the jobs queued so far have finished (used by tests and shutdown)."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.exception(timeout)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
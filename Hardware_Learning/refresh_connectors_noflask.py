@@ -1,128 +1,60 @@
+"""Refresh connector coordinates in components.json from the component SVGs.
+
+    python refresh_connectors_noflask.py [--jobs N] [--changed-only] [--verbose]
+
+SVGs are parsed in parallel over a process pool (--jobs, default: CPU
+count), each only when its content hash is not in svg_cache.json yet.
+--changed-only updates just the components whose SVG content changed since
+the last refresh. components.json is written once, atomically, at the end.
+"""
+import argparse
 import os, json
-from xml.etree import ElementTree as ET
+import sys
+import time
+
+from svg_connectors import SvgCache, refresh_components
+from learning_common.journal import write_json_atomic
 
 BASE = os.path.dirname(__file__)
 COMPONENTS_FILE = os.path.join(BASE, 'components.json')
 IMAGES_DIR = os.path.join(BASE, 'static', 'images')
-REAL_DIR = os.path.join(IMAGES_DIR, 'real')
-
-
-def parse_translate(t):
-    if not t: return (0.0, 0.0)
-    t = t.strip()
-    if t.startswith('translate'):
-        inside = t[t.find('(')+1:t.find(')')]
-        parts = [p for p in inside.replace(',', ' ').split() if p]
-        try:
-            if len(parts) == 1:
-                return (float(parts[0]), 0.0)
-            return (float(parts[0]), float(parts[1]))
-        except Exception:
-            return (0.0, 0.0)
-    return (0.0, 0.0)
-
+SVG_CACHE_FILE = os.path.join(BASE, 'svg_cache.json')
 
-def parse_svg_connectors(svg_path):
-    try:
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
-    except Exception as e:
-        print('Failed parse', svg_path, e)
-        return {}
 
-    connectors = {}
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Refresh connector coordinates from component SVGs.')
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help='parser processes')
+    ap.add_argument('--changed-only', action='store_true',
+                    help='only update components whose SVG changed since the last refresh')
+    ap.add_argument('--verbose', action='store_true', help='print timing for every file')
+    args = ap.parse_args(argv)
 
-    def walk(el, acc_tx=0.0, acc_ty=0.0):
-        tr = el.get('transform')
-        tx, ty = parse_translate(tr)
-        cur_tx = acc_tx + tx
-        cur_ty = acc_ty + ty
-        data_conn = el.get('data-conn') or el.get('data-conn')
-        if data_conn:
-            cx = el.get('cx')
-            cy = el.get('cy')
-            if cx is not None and cy is not None:
-                try:
-                    x = float(cx) + cur_tx
-                    y = float(cy) + cur_ty
-                    connectors[data_conn] = {'x': x, 'y': y}
-                except Exception:
-                    pass
-            else:
-                xattr = el.get('x'); yattr = el.get('y')
-                wattr = el.get('width'); hattr = el.get('height')
-                try:
-                    if xattr and yattr and wattr and hattr:
-                        x = float(xattr) + float(wattr)/2 + cur_tx
-                        y = float(yattr) + float(hattr)/2 + cur_ty
-                        connectors[data_conn] = {'x': x, 'y': y}
-                except Exception:
-                    pass
-        for child in list(el):
-            walk(child, cur_tx, cur_ty)
-
-    walk(root, 0.0, 0.0)
-    return connectors
-
-
-def svg_viewbox(svg_path):
-    try:
-        tree = ET.parse(svg_path)
-        root = tree.getroot()
-        vb = root.get('viewBox')
-        if vb:
-            parts = [float(p) for p in vb.strip().split()]
-            return (parts[2], parts[3])
-        w = root.get('width'); h = root.get('height')
-        if w and h:
-            try:
-                return (float(w), float(h))
-            except Exception:
-                pass
-    except Exception:
-        pass
-    return (None, None)
-
-
-def main():
+    start = time.perf_counter()
     with open(COMPONENTS_FILE, 'r', encoding='utf-8') as f:
         comps = json.load(f)
-    changed = 0
-    for c in comps:
-        img = c.get('image')
-        if not img or not img.lower().endswith('.svg'):
-            continue
-        svg_path = os.path.join(IMAGES_DIR, img)
-        if not os.path.exists(svg_path):
-            svg_path = os.path.join(REAL_DIR, img)
-            if not os.path.exists(svg_path):
-                print('SVG not found for', c.get('id'), img)
-                continue
-        svg_w, svg_h = svg_viewbox(svg_path)
-        if not svg_w or not svg_h:
-            print('No viewbox for', svg_path)
-            continue
-        conn_map = parse_svg_connectors(svg_path)
-        box = c.get('svg') or {}
-        bx = box.get('x', 0); by = box.get('y', 0); bw = box.get('w', box.get('width', 0)); bh = box.get('h', box.get('height', 0))
-        if not bw or not bh:
-            print('No box size for', c.get('id'))
-            continue
-        new_conns = []
-        for k, v in conn_map.items():
-            parts = k.split('.')
-            conn_id = parts[-1]
-            sx = bx + (v['x'] / svg_w) * bw
-            sy = by + (v['y'] / svg_h) * bh
-            new_conns.append({'id': conn_id, 'x': round(sx,1), 'y': round(sy,1)})
-        if new_conns:
-            c['connectors'] = new_conns
-            changed += 1
-            print('Updated', c.get('id'), 'connectors:', new_conns)
+    # parsed SVGs are cached by content hash, shared with the app's refresh endpoint
+    cache = SvgCache(SVG_CACHE_FILE)
+    changed, report = refresh_components(comps, IMAGES_DIR, cache, jobs=args.jobs,
+                                         changed_only=args.changed_only)
+    cache.save()
     if changed:
-        with open(COMPONENTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(comps, f, indent=2)
-    print('Refresh complete. Components updated:', changed)
+        write_json_atomic(COMPONENTS_FILE, comps)
+
+    counts = {}
+    for r in report:
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+        if args.verbose or r['status'] in ('missing', 'error'):
+            print(f"{r['status']:>9}  {r['seconds'] * 1000:8.1f} ms  {os.path.relpath(r['path'], BASE)}")
+    slowest = sorted((r for r in report if r['seconds']), key=lambda r: r['seconds'], reverse=True)[:5]
+    if slowest and not args.verbose:
+        print('Slowest files:')
+        for r in slowest:
+            print(f"  {r['seconds'] * 1000:8.1f} ms  {os.path.relpath(r['path'], BASE)}")
+    summary = ', '.join(f'{n} {status}' for status, n in sorted(counts.items()))
+    print(f'SVG files: {summary or "none"}')
+    print(f'Refresh complete in {time.perf_counter() - start:.2f}s. Components updated: {changed}')
+    return 0
+
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
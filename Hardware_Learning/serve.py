@@ -0,0 +1,71 @@
+"""Production server for the Hardware Learning app.
+
+    python serve.py [--host 0.0.0.0] [--port 8000] [--threads 8]
+
+Uses waitress when it is installed (pip install waitress) and otherwise
+Werkzeug's threaded server, in both cases without the debugger or reloader.
+Defaults can also come from HARDWARE_HOST, HARDWARE_PORT and
+HARDWARE_THREADS. On Linux/macOS the app can run with several worker
+processes under gunicorn instead; writes are file-locked, so workers can
+share the data files:
+
+    gunicorn -w 4 --threads 4 -b 0.0.0.0:8000 serve:application
+
+SIGINT and SIGTERM stop the server and flush pending journal writes.
+"""
+import argparse
+import os
+import signal
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from app import app as application, flush_writes
+
+try:
+    import waitress
+except ImportError:
+    waitress = None
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(host, port, threads):
+    if waitress is not None:
+        print(f'Serving on http://{host}:{port} with waitress ({threads} threads)')
+        waitress.serve(application, host=host, port=port, threads=threads)
+        return
+    from werkzeug.serving import make_server
+    server = make_server(host, port, application, threaded=True)
+    print(f'Serving on http://{host}:{port} with the Werkzeug threaded server '
+          '(install waitress for a bounded thread pool)')
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Run the Hardware Learning app for production use.')
+    ap.add_argument('--host', default=os.environ.get('HARDWARE_HOST', '127.0.0.1'))
+    ap.add_argument('--port', type=int, default=int(os.environ.get('HARDWARE_PORT', 8000)))
+    ap.add_argument('--threads', type=int, default=int(os.environ.get('HARDWARE_THREADS', 8)),
+                    help='worker threads (waitress)')
+    args = ap.parse_args(argv)
+
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        serve(args.host, args.port, args.threads)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        flush_writes()
+        print('Server stopped; pending writes flushed.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
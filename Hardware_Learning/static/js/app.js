@@ -19,9 +19,46 @@ document.addEventListener('DOMContentLoaded', function(){
   const tooltip = document.getElementById('tooltip');
 
   let components = COMPONENTS || [];
+  // grid index of connector positions built by the server (connector_index.py);
+  // nearest-connector lookups only visit the cells around the pointer
+  const connectorIndex = (typeof CONNECTOR_INDEX !== 'undefined' && CONNECTOR_INDEX && CONNECTOR_INDEX.cells) ? CONNECTOR_INDEX : null;
+  const SNAP_DIST = 15;
   let questions = QUESTIONS || [];
   let quizState = null; // {type:'find'|'mcq'|'wiring', question: {...}}
 
+  // Wiring attempts are buffered and posted in batches to /api/wiring_attempts:
+  // once the buffer fills, after a short idle period, and via sendBeacon when
+  // the page is hidden or unloaded.
+  const ATTEMPT_BATCH = 20, ATTEMPT_CHUNK = 100, ATTEMPT_IDLE_MS = 2000;
+  const attemptQueue = [];
+  let attemptTimer = null;
+
+  function scheduleAttemptFlush(){
+    if(attemptTimer) clearTimeout(attemptTimer);
+    attemptTimer = setTimeout(()=>flushAttempts(false), ATTEMPT_IDLE_MS);
+  }
+
+  function queueAttempt(attempt){
+    attemptQueue.push(attempt);
+    if(attemptQueue.length >= ATTEMPT_BATCH) flushAttempts(false);
+    else scheduleAttemptFlush();
+  }
+
+  function flushAttempts(leaving){
+    if(attemptTimer){ clearTimeout(attemptTimer); attemptTimer = null; }
+    while(attemptQueue.length){
+      const batch = attemptQueue.splice(0, ATTEMPT_CHUNK);
+      const body = JSON.stringify({attempts: batch});
+      if(leaving && navigator.sendBeacon && navigator.sendBeacon('/api/wiring_attempts', new Blob([body], {type:'application/json'}))) continue;
+      fetch('/api/wiring_attempts', {method:'POST', headers:{'content-type':'application/json'}, body, keepalive: true})
+        .then(r=>{ if(r.status >= 500) throw new Error('HTTP ' + r.status); })
+        .catch(()=>{ attemptQueue.unshift(...batch); scheduleAttemptFlush(); });
+    }
+  }
+
+  document.addEventListener('visibilitychange', ()=>{ if(document.visibilityState === 'hidden') flushAttempts(true); });
+  window.addEventListener('pagehide', ()=>flushAttempts(true));
+
   // viewport transform state
   let scale = 1, tx = 0, ty = 0;
 
@@ -443,6 +480,29 @@ document.addEventListener('DOMContentLoaded', function(){
     txt('Click any component for details  \u00b7  Shift+drag to pan  \u00b7  Scroll to zoom',{x:360,y:395,fill:'#2d3d4d','font-size':'9','text-anchor':'middle'},viewport);
   }
 
+  // all component SVGs arrive in one cached sprite (/api/diagram.svg), fetched on the
+  // first click so it does not weigh on the first paint; a component's <symbol> is
+  // then inlined instead of fetching its image separately
+  let spriteReady = null;
+  function loadSprite(){
+    if(!spriteReady){
+      spriteReady = fetch('/api/diagram.svg').then(r=>r.ok ? r.text() : Promise.reject(r.status))
+        .then(t=>new DOMParser().parseFromString(t, 'image/svg+xml'))
+        .catch(()=>null);
+    }
+    return spriteReady;
+  }
+
+  function componentSvgText(c, url){
+    return loadSprite().then(doc=>{
+      const use = doc && doc.querySelector('use[data-component="' + CSS.escape(c.id) + '"]');
+      const sym = use && doc.getElementById(use.getAttribute('href').slice(1));
+      if(!sym) return fetch(url).then(r=>r.text());
+      const vb = sym.getAttribute('viewBox');
+      return '<svg xmlns="http://www.w3.org/2000/svg"' + (vb ? ' viewBox="' + vb + '"' : '') + '>' + sym.innerHTML + '</svg>';
+    });
+  }
+
   function showTooltip(e, c){
     tooltip.style.display = 'block';
     tooltip.textContent = c.name || 'component';
@@ -458,7 +518,7 @@ document.addEventListener('DOMContentLoaded', function(){
       // inline SVG for richer interactivity when available
       const url = '/static/images/' + c.image;
       if(c.image.toLowerCase().endsWith('.svg')){
-        fetch(url).then(r=>r.text()).then(svgText=>{
+        componentSvgText(c, url).then(svgText=>{
           compImage.innerHTML = svgText;
           compImage.style.display = 'block';
           // attach listeners to any .conn elements in inlined svg
@@ -524,6 +584,25 @@ document.addEventListener('DOMContentLoaded', function(){
     }
   }
 
+  function indexedNearest(px, py, maxDist, accept){
+    const cell = connectorIndex.cell;
+    const r = Math.max(1, Math.ceil(maxDist / cell));
+    const ci = Math.floor(px / cell), cj = Math.floor(py / cell);
+    let best = null, bestDist = Infinity;
+    for(let i = ci - r; i <= ci + r; i++){
+      for(let j = cj - r; j <= cj + r; j++){
+        const bucket = connectorIndex.cells[i + ',' + j];
+        if(!bucket) continue;
+        for(const [id, cx, cy] of bucket){
+          if(accept && !accept.has(id)) continue;
+          const d = Math.hypot(px - cx, py - cy);
+          if(d < bestDist){ bestDist = d; best = {cx, cy, id, d}; }
+        }
+      }
+    }
+    return {best, bestDist};
+  }
+
   function setupWiring(q){
     // clear wiring svg
     while(wiringSvg.firstChild) wiringSvg.removeChild(wiringSvg.firstChild);
@@ -568,8 +647,10 @@ document.addEventListener('DOMContentLoaded', function(){
       wiringSvg.appendChild(path);
 
       const connectorEls = Array.from(wiringSvg.querySelectorAll('.w-connector'));
+      const drawnIds = new Set(connectorEls.map(el=>el.dataset.conn));
 
       function nearestConnector(px, py){
+        if(connectorIndex) return indexedNearest(px, py, SNAP_DIST, drawnIds);
         let best = null, bestDist = Infinity;
         connectorEls.forEach(el=>{
           const cx = parseFloat(el.getAttribute('cx'));
@@ -593,7 +674,7 @@ document.addEventListener('DOMContentLoaded', function(){
         const p = screenToSvg(e.clientX, e.clientY, wiringSvg);
         // snap to nearest connector within threshold (15px)
         const {best, bestDist} = nearestConnector(p.x, p.y);
-        if(best && bestDist < 15){
+        if(best && bestDist < SNAP_DIST){
           updatePath(best.cx, best.cy);
         } else {
           updatePath(p.x, p.y);
@@ -605,7 +686,7 @@ document.addEventListener('DOMContentLoaded', function(){
         window.removeEventListener('mouseup', up);
         const p = screenToSvg(ev.clientX, ev.clientY, wiringSvg);
         const {best, bestDist} = nearestConnector(p.x, p.y);
-        const toConn = (best && bestDist < 15) ? best.id : null;
+        const toConn = (best && bestDist < SNAP_DIST) ? best.id : null;
         // validate
         const ok = (q.pairs||[]).some(p=> p.from === fromConn && p.to === toConn);
 
@@ -615,9 +696,8 @@ document.addEventListener('DOMContentLoaded', function(){
         // keep the path to allow multiple wires
         wires.push({from: fromConn, to: toConn, ok, path});
 
-        // persist attempt to backend
-        fetch('/api/wiring_attempt', {method:'POST', headers:{'content-type':'application/json'}, body:JSON.stringify({question_id: q.id, from: fromConn, to: toConn, ok})})
-          .then(r=>r.json()).then(res=>{ /* optionally update UI */ });
+        // persist attempt to backend (buffered, sent in batches)
+        queueAttempt({question_id: q.id, from: fromConn, to: toConn, ok, time: new Date().toISOString()});
 
       }
 
@@ -667,7 +747,7 @@ function initEditor(){
     if(!file){ msg.textContent = 'Choose a file first'; return; }
     const fd = new FormData(); fd.append('file', file);
     fetch('/api/upload_image', {method:'POST', body: fd}).then(r=>r.json()).then(j=>{
-      if(j.ok){ msg.textContent = 'Uploaded to static/images/' + j.path; }
+      if(j.ok){ msg.textContent = (j.duplicate ? 'Already uploaded as static/images/' : 'Uploaded to static/images/') + j.path; }
       else msg.textContent = 'Upload error: ' + (j.error||'');
     });
   });
@@ -0,0 +1,372 @@
+"""Connector extraction from component SVGs, shared by app.py and the refresh scripts.
+
+parse_svg() streams an SVG once (iterparse) and returns its viewBox size
+together with the positions of every element carrying a data-conn attribute,
+with matrix/translate/scale/rotate/skewX/skewY transforms composed down the
+tree. SvgCache keeps those results on disk keyed by the SVG's content hash,
+so a refresh only re-parses images that actually changed.
+"""
+import hashlib
+import io
+import math
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from learning_common.journal import write_json_atomic
+from learning_common.file_cache import load_json
+
+CACHE_VERSION = 2
+
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+_TRANSFORM_RE = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+
+
+def multiply(m, n):
+    """Affine product m * n of (a, b, c, d, e, f) matrices (SVG order)."""
+    a1, b1, c1, d1, e1, f1 = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a1 * a2 + c1 * b2, b1 * a2 + d1 * b2,
+            a1 * c2 + c1 * d2, b1 * c2 + d1 * d2,
+            a1 * e2 + c1 * f2 + e1, b1 * e2 + d1 * f2 + f1)
+
+
+def apply(m, x, y):
+    a, b, c, d, e, f = m
+    return (a * x + c * y + e, b * x + d * y + f)
+
+
+def _transform_step(name, args):
+    if name == 'matrix' and len(args) == 6:
+        return tuple(args)
+    if name == 'translate' and args:
+        return (1.0, 0.0, 0.0, 1.0, args[0], args[1] if len(args) > 1 else 0.0)
+    if name == 'scale' and args:
+        return (args[0], 0.0, 0.0, args[1] if len(args) > 1 else args[0], 0.0, 0.0)
+    if name == 'rotate' and args:
+        r = math.radians(args[0])
+        rot = (math.cos(r), math.sin(r), -math.sin(r), math.cos(r), 0.0, 0.0)
+        if len(args) >= 3:
+            cx, cy = args[1], args[2]
+            return multiply(multiply((1.0, 0.0, 0.0, 1.0, cx, cy), rot), (1.0, 0.0, 0.0, 1.0, -cx, -cy))
+        return rot
+    if name == 'skewX' and args:
+        return (1.0, 0.0, math.tan(math.radians(args[0])), 1.0, 0.0, 0.0)
+    if name == 'skewY' and args:
+        return (1.0, math.tan(math.radians(args[0])), 0.0, 1.0, 0.0, 0.0)
+    return IDENTITY
+
+
+@lru_cache(maxsize=4096)
+def parse_transform(t):
+    """Matrix for an SVG transform attribute (a list of matrix/translate/scale/rotate/skewX/skewY).
+
+    Memoised, since exported drawings repeat the same transform strings.
+    """
+    m = IDENTITY
+    if not t:
+        return m
+    for name, raw in _TRANSFORM_RE.findall(t):
+        try:
+            args = [float(p) for p in raw.replace(',', ' ').split()]
+        except ValueError:
+            continue
+        m = multiply(m, _transform_step(name, args))
+    return m
+
+
+def _viewbox(root):
+    vb = root.get('viewBox')
+    if vb:
+        try:
+            parts = [float(p) for p in vb.replace(',', ' ').split()]
+            return (parts[2], parts[3])
+        except (ValueError, IndexError):
+            pass
+    w = root.get('width'); h = root.get('height')
+    if w and h:
+        try:
+            return (float(w), float(h))
+        except ValueError:
+            pass
+    return None
+
+
+def _connector_point(el):
+    # try common position attributes: cx/cy, then the centre of x/y/width/height
+    cx = el.get('cx'); cy = el.get('cy')
+    try:
+        if cx is not None and cy is not None:
+            return (float(cx), float(cy))
+        x = el.get('x'); y = el.get('y'); w = el.get('width'); h = el.get('height')
+        if x and y and w and h:
+            return (float(x) + float(w) / 2, float(y) + float(h) / 2)
+    except ValueError:
+        pass
+    return None
+
+
+def _ctm(stack):
+    """Current transform matrix for the innermost element on the stack.
+
+    Each stack entry is [transform attribute, composed matrix or None, element];
+    matrices are composed on demand, top-down from the nearest ancestor that
+    already has one, so subtrees without connectors never pay for it.
+    """
+    i = len(stack) - 1
+    while i >= 0 and stack[i][1] is None:
+        i -= 1
+    m = stack[i][1] if i >= 0 else IDENTITY
+    for entry in stack[i + 1:]:
+        if entry[0]:
+            m = multiply(m, parse_transform(entry[0]))
+        entry[1] = m
+    return m
+
+
+def parse_svg(data):
+    """Extract the viewBox size and connector positions from SVG bytes in one streaming pass.
+
+    Returns {'viewbox': [w, h] or None, 'connectors': {data-conn: {'x', 'y'}}}
+    with connector positions in the SVG's own coordinates, all ancestor and
+    own transforms applied. Elements are discarded as soon as they end, so
+    memory stays flat on large drawings.
+    """
+    connectors = {}
+    viewbox = None
+    stack = []
+    for event, el in ET.iterparse(io.BytesIO(data), events=('start', 'end')):
+        if event == 'start':
+            if not stack:
+                viewbox = _viewbox(el)
+            stack.append([el.get('transform'), None, el])
+            data_conn = el.get('data-conn')
+            if data_conn:
+                pt = _connector_point(el)
+                if pt is not None:
+                    x, y = apply(_ctm(stack), *pt)
+                    connectors[data_conn] = {'x': x, 'y': y}
+        else:
+            stack.pop()
+            el.clear()
+            # a finished element is always its parent's last child so far; drop it
+            if stack:
+                del stack[-1][2][-1]
+    return {'viewbox': list(viewbox) if viewbox else None, 'connectors': connectors}
+
+
+def find_svg(images_dir, img):
+    """Path of a component's SVG under images_dir or images_dir/real, or None."""
+    if not img or not img.lower().endswith('.svg'):
+        return None
+    for path in (os.path.join(images_dir, img), os.path.join(images_dir, 'real', img)):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def scaled_connectors(component, parsed):
+    """Map parsed connector positions into the main diagram through the component's svg box.
+
+    Returns the new connector list, or None when the SVG has no size, the
+    component has no box, or the SVG has no connectors.
+    """
+    if not parsed or not parsed.get('viewbox'):
+        return None
+    svg_w, svg_h = parsed['viewbox']
+    box = component.get('svg') or {}
+    bx = box.get('x', 0); by = box.get('y', 0); bw = box.get('w', box.get('width', 0)); bh = box.get('h', box.get('height', 0))
+    if not svg_w or not svg_h or not bw or not bh:
+        return None
+    out = []
+    for k, v in parsed['connectors'].items():
+        # data-conn formatted like 'component.connector' or full id
+        conn_id = k.split('.')[-1]
+        sx = bx + (v['x'] / svg_w) * bw
+        sy = by + (v['y'] / svg_h) * bh
+        out.append({'id': conn_id, 'x': round(sx, 1), 'y': round(sy, 1)})
+    return out or None
+
+
+class SvgCache:
+    """On-disk cache of parse_svg() results keyed by SVG content hash.
+
+    A (mtime, size) -> hash table per file avoids even re-hashing unchanged
+    files. Call save() after a refresh; entries for files that were not
+    looked up since loading are dropped then.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            data = load_json(path)
+        except Exception:
+            data = {}
+        if data.get('version') != CACHE_VERSION:
+            data = {}
+        self.entries = data.get('entries', {})
+        self.files = data.get('files', {})
+        self._used = set()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, svg_path):
+        return os.path.relpath(os.path.abspath(svg_path), os.path.dirname(os.path.abspath(self.path)))
+
+    def previous_digest(self, svg_path):
+        """Content hash recorded for svg_path by the last refresh, or None."""
+        known = self.files.get(self.key(svg_path))
+        return known[2] if known else None
+
+    def fresh(self, svg_path, st=None):
+        """Cached digest when svg_path's (mtime, size) is unchanged, else None."""
+        st = st or os.stat(svg_path)
+        known = self.files.get(self.key(svg_path))
+        if known and known[0] == st.st_mtime_ns and known[1] == st.st_size and known[2] in self.entries:
+            self._used.add(known[2])
+            return known[2]
+        return None
+
+    def record(self, svg_path, mtime_ns, size, digest, parsed=None, is_new=False):
+        """Remember svg_path's signature and hash; parsed is stored when is_new."""
+        self.files[self.key(svg_path)] = [mtime_ns, size, digest]
+        if is_new:
+            self.entries[digest] = parsed
+        self._used.add(digest)
+        self._dirty = True
+
+    def get(self, svg_path):
+        """parse_svg() result for svg_path, parsing only if its content is new. None if unparsable."""
+        st = os.stat(svg_path)
+        digest = self.fresh(svg_path, st)
+        if digest is None:
+            res = parse_file(svg_path, self.entries)
+            self.record(svg_path, res['mtime_ns'], res['size'], res['digest'], res['parsed'], res['parsed_now'])
+            digest = res['digest']
+            if res['parsed_now']:
+                self.misses += 1
+                return self.entries[digest]
+        self.hits += 1
+        return self.entries[digest]
+
+    def save(self):
+        stale = set(self.entries) - self._used
+        if stale:
+            for digest in stale:
+                del self.entries[digest]
+            self.files = {k: v for k, v in self.files.items() if v[2] in self.entries}
+            self._dirty = True
+        if not self._dirty:
+            return
+        try:
+            write_json_atomic(self.path, {'version': CACHE_VERSION, 'entries': self.entries, 'files': self.files},
+                              indent=None)
+        except OSError:
+            pass
+        self._dirty = False
+
+
+_known_digests = frozenset()
+
+
+def _init_worker(known):
+    global _known_digests
+    _known_digests = frozenset(known)
+
+
+def parse_file(svg_path, known=None):
+    """Read, hash and (unless the hash is in known) parse one SVG.
+
+    Returns a dict with path, mtime_ns, size, digest, parsed, parsed_now and
+    seconds. Used directly and as the process-pool task of refresh_components.
+    """
+    known = _known_digests if known is None else known
+    start = time.perf_counter()
+    st = os.stat(svg_path)
+    with open(svg_path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    parsed = None
+    parsed_now = digest not in known
+    if parsed_now:
+        try:
+            parsed = parse_svg(data)
+        except ET.ParseError:
+            parsed = None
+    return {'path': svg_path, 'mtime_ns': st.st_mtime_ns, 'size': st.st_size, 'digest': digest,
+            'parsed': parsed, 'parsed_now': parsed_now, 'seconds': time.perf_counter() - start}
+
+
+def refresh_components(comps, images_dir, cache, jobs=1, changed_only=False):
+    """Recompute connector positions for components with SVG images, in place.
+
+    SVGs whose (mtime, size) match the cache are not read at all; the rest
+    are hashed and, when the content is new, parsed -- over a process pool
+    when jobs > 1. With changed_only, components whose SVG content is the
+    same as at the last refresh are left untouched.
+
+    Returns (updated component count, per-file report list). Each report
+    has path, status ('unchanged', 'cached', 'parsed', 'missing' or
+    'error') and seconds.
+    """
+    paths = {}
+    report = []
+    for c in comps:
+        img = c.get('image')
+        if not img or not img.lower().endswith('.svg'):
+            continue
+        path = find_svg(images_dir, img)
+        if path is None:
+            report.append({'path': os.path.join(images_dir, img), 'status': 'missing', 'seconds': 0.0})
+            continue
+        paths.setdefault(path, []).append(c)
+
+    digests = {}
+    changed = set()
+    pending = []
+    for path in paths:
+        try:
+            digest = cache.fresh(path)
+        except OSError:
+            report.append({'path': path, 'status': 'error', 'seconds': 0.0})
+            continue
+        if digest is None:
+            pending.append(path)
+        else:
+            digests[path] = digest
+            report.append({'path': path, 'status': 'unchanged', 'seconds': 0.0})
+
+    if jobs > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(list(cache.entries),)) as pool:
+            results = list(pool.map(parse_file, pending, chunksize=max(1, len(pending) // (jobs * 4))))
+    else:
+        results = [parse_file(p, cache.entries) for p in pending]
+
+    for res in results:
+        path = res['path']
+        if cache.previous_digest(path) != res['digest']:
+            changed.add(path)
+        cache.record(path, res['mtime_ns'], res['size'], res['digest'], res['parsed'], res['parsed_now'])
+        digests[path] = res['digest']
+        report.append({'path': path, 'status': 'parsed' if res['parsed_now'] else 'cached',
+                       'seconds': res['seconds']})
+
+    updated = 0
+    for path, group in paths.items():
+        if path not in digests or (changed_only and path not in changed):
+            continue
+        parsed = cache.entries.get(digests[path])
+        for c in group:
+            new_connectors = scaled_connectors(c, parsed)
+            if new_connectors:
+                c['connectors'] = new_connectors
+                updated += 1
+    return updated, report
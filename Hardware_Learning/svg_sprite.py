@@ -0,0 +1,136 @@
+"""Minified SVG sprite of all component images.
+
+build_sprite() turns every component SVG into a <symbol> (one per distinct
+image content, so components sharing an image share the symbol) and places
+each component with a <use> at its svg box from components.json. The result
+is one request for the whole diagram instead of one per image.
+
+minify_svg() is the same clean-up applied to each symbol: comments,
+<metadata>, editor-only namespaces and insignificant whitespace are removed.
+"""
+import hashlib
+import re
+from xml.etree import ElementTree as ET
+
+SVG_NS = 'http://www.w3.org/2000/svg'
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+# elements and attributes from drawing tools that browsers ignore
+EDITOR_NAMESPACES = (
+    'http://www.inkscape.org/namespaces/inkscape',
+    'http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd',
+    'http://ns.adobe.com/AdobeIllustrator/10.0/',
+    'http://www.bohemiancoding.com/sketch/ns',
+    'http://purl.org/dc/elements/1.1/',
+    'http://creativecommons.org/ns#',
+    'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+)
+DROP_TAGS = {f'{{{SVG_NS}}}metadata'}
+
+ET.register_namespace('', SVG_NS)
+ET.register_namespace('xlink', XLINK_NS)
+
+_REF_RE = re.compile(r'url\(#([^)]+)\)')
+
+
+def _is_editor(name):
+    return name.startswith('{') and name[1:].split('}', 1)[0] in EDITOR_NAMESPACES
+
+
+def _clean(el):
+    for child in list(el):
+        if not isinstance(child.tag, str) or child.tag in DROP_TAGS or _is_editor(child.tag):
+            el.remove(child)
+            continue
+        _clean(child)
+    for name in [n for n in el.attrib if _is_editor(n)]:
+        del el.attrib[name]
+    # whitespace between elements is insignificant outside text content
+    if el.text is not None and not el.text.strip():
+        el.text = None
+    if el.tail is not None and not el.tail.strip():
+        el.tail = None
+
+
+def _parse(data):
+    parser = ET.XMLParser(target=ET.TreeBuilder(insert_comments=False))
+    root = ET.fromstring(data, parser=parser)
+    _clean(root)
+    return root
+
+
+def _serialize(root):
+    # markup characters in text are escaped, so ' />' can only be a tag end
+    return ET.tostring(root, encoding='utf-8', xml_declaration=False).replace(b' />', b'/>')
+
+
+def minify_svg(data):
+    """Minified SVG bytes with comments, metadata, editor namespaces and whitespace stripped."""
+    return _serialize(_parse(data))
+
+
+def _prefix_ids(root, prefix):
+    """Make element ids unique inside the sprite and update url(#id)/href references."""
+    ids = {el.get('id') for el in root.iter() if el.get('id')}
+    if not ids:
+        return
+
+    def ref(m):
+        return f'url(#{prefix}{m.group(1)})' if m.group(1) in ids else m.group(0)
+
+    for el in root.iter():
+        for name, value in list(el.attrib.items()):
+            if name == 'id' and value in ids:
+                el.set(name, prefix + value)
+            elif name in ('href', f'{{{XLINK_NS}}}href') and value.startswith('#') and value[1:] in ids:
+                el.set(name, '#' + prefix + value[1:])
+            elif 'url(#' in value:
+                el.set(name, _REF_RE.sub(ref, value))
+
+
+def symbol_id(data):
+    return 'sym-' + hashlib.sha1(data).hexdigest()[:10]
+
+
+def build_sprite(comps, read_image, width=720, height=400):
+    """Compose the diagram sprite.
+
+    read_image(name) returns an image's bytes or None; components without a
+    readable SVG are left out. Returns (svg bytes, {component id: symbol id}).
+    """
+    root = ET.Element(f'{{{SVG_NS}}}svg', {'viewBox': f'0 0 {width} {height}'})
+    defs = ET.SubElement(root, f'{{{SVG_NS}}}defs')
+    symbols = {}
+    placed = {}
+    for c in comps:
+        img = c.get('image')
+        if not img or not img.lower().endswith('.svg'):
+            continue
+        data = read_image(img)
+        if not data:
+            continue
+        sid = symbol_id(data)
+        if sid not in symbols:
+            try:
+                svg = _parse(data)
+            except ET.ParseError:
+                continue
+            _prefix_ids(svg, sid + '-')
+            attrs = {'id': sid}
+            vb = svg.get('viewBox')
+            if not vb and svg.get('width') and svg.get('height'):
+                vb = f"0 0 {svg.get('width')} {svg.get('height')}"
+            if vb:
+                attrs['viewBox'] = vb
+            sym = ET.SubElement(defs, f'{{{SVG_NS}}}symbol', attrs)
+            sym.extend(list(svg))
+            symbols[sid] = sym
+        box = c.get('svg') or {}
+        use = {'href': '#' + sid, 'data-component': str(c.get('id'))}
+        for attr, keys in (('x', ('x',)), ('y', ('y',)), ('width', ('w', 'width')), ('height', ('h', 'height'))):
+            for k in keys:
+                if box.get(k) is not None:
+                    use[attr] = str(box[k])
+                    break
+        ET.SubElement(root, f'{{{SVG_NS}}}use', use)
+        placed[c.get('id')] = sid
+    return _serialize(root), placed
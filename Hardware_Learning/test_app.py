@@ -0,0 +1,164 @@
+"""Flask test_client tests for the Hardware Learning API (run with pytest; no server needed)."""
+import gzip
+import importlib.util
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+import pytest
+
+pytest.importorskip('flask')
+
+
+def load_app():
+    # loaded under its own name: other apps' tests import their own app.py as "app"
+    spec = importlib.util.spec_from_file_location('hardware_app', os.path.join(BASE_DIR, 'app.py'))
+    module = sys.modules['hardware_app'] = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+hardware_app = load_app()
+from learning_common.file_cache import CachedFile, brotli, load_json
+from learning_common.storage import open_store
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.delenv('LEARNING_STORAGE', raising=False)
+    store = open_store(str(tmp_path), 'hardware', attempts_name='wiring_attempts')
+    monkeypatch.setattr(hardware_app, 'STORE', store)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def client(store):
+    return hardware_app.app.test_client()
+
+
+def attempt(**fields):
+    body = {'question_id': 'q3', 'from': 'router.wan', 'to': 'switch.sw_port1', 'ok': True}
+    body.update(fields)
+    return body
+
+
+def test_single_attempt_is_saved_and_wrong_ones_reviewed(client, store):
+    r = client.post('/api/wiring_attempt', json=attempt())
+    assert r.status_code == 200 and r.get_json() == {'ok': True, 'saved': True, 'count': 1}
+    client.post('/api/wiring_attempt', json=attempt(question_id='q2', ok=False))
+    assert store.review_ids() == ['q2']
+    assert [a['question_id'] for a in store.attempts()] == ['q2', 'q3']
+
+
+def test_batch_is_saved_in_one_request(client, store):
+    items = [attempt(time='2026-01-02T03:04:05'), attempt(question_id='q1', ok=False)]
+    r = client.post('/api/wiring_attempts', json={'attempts': items})
+    assert r.get_json() == {'ok': True, 'saved': 2, 'count': 2}
+    assert store.review_ids() == ['q1']
+    # a bare array works too
+    assert client.post('/api/wiring_attempts', json=[attempt()]).get_json()['saved'] == 1
+    assert store.attempts()[-1]['time'] == '2026-01-02T03:04:05'
+
+
+def test_malformed_question_ids_are_saved_without_one(client, store):
+    items = [attempt(question_id={'id': 'q1'}, ok=False), attempt(question_id='q' * 10000, ok=False),
+             attempt(question_id=7, ok=False), attempt(question_id=True, ok=False)]
+    r = client.post('/api/wiring_attempts', json=items)
+    assert r.get_json()['saved'] == 4
+    assert [a['question_id'] for a in store.attempts()] == [None, '7', None, None]
+    assert store.review_ids() == ['7']
+    r = client.post('/api/wiring_attempt', json=attempt(question_id=['q1'], ok=False))
+    assert r.get_json()['saved'] is True and store.review_ids() == ['7']
+
+
+def test_unparsable_times_are_stamped_on_arrival(client, store):
+    client.post('/api/wiring_attempts', json=[attempt(time='yesterday'), attempt(time=1767225600)])
+    client.post('/api/wiring_attempt', json=attempt(time='2026-13-45'))
+    times = [a['time'] for a in store.attempts()]
+    assert len(times) == 3 and all(t.startswith('20') and 'T' in t for t in times)
+    assert not {'yesterday', '2026-13-45'} & set(times)
+
+
+def test_bad_bodies_are_rejected_before_anything_is_written(client, store):
+    assert client.post('/api/wiring_attempts', json=[]).get_json() == {'ok': True, 'saved': 0, 'count': None}
+    for body in ({'attempts': 'q1'}, {'attempts': [1, 2]}, 'q1', None):
+        assert client.post('/api/wiring_attempts', json=body).status_code == 400
+    assert client.post('/api/wiring_attempts', data='not json', content_type='application/json').status_code == 400
+    too_many = [attempt()] * (hardware_app.MAX_ATTEMPT_BATCH + 1)
+    assert client.post('/api/wiring_attempts', json=too_many).status_code == 413
+    for body in ([attempt()], 'q1'):
+        assert client.post('/api/wiring_attempt', json=body).status_code == 400
+    assert client.post('/api/wiring_attempt', data='', content_type='application/json').status_code == 400
+    assert store.attempts() == [] and store.review_ids() == []
+
+
+COMPONENTS = [{'id': f'part{i}', 'name': f'Part {i}', 'desc': 'A component with a repetitive description.',
+               'svg': {'x': i, 'y': i, 'w': 10, 'h': 10}} for i in range(40)]
+
+
+@pytest.fixture
+def components(tmp_path, monkeypatch):
+    path = tmp_path / 'components.json'
+    path.write_text(json.dumps(COMPONENTS), encoding='utf-8')
+    monkeypatch.setattr(hardware_app, 'COMPONENTS', CachedFile(str(path), load_json, default=[], check_interval=0))
+    return path
+
+
+def test_components_have_a_strong_etag_and_revalidate(client, components):
+    r = client.get('/api/components')
+    etag = r.headers['ETag']
+    assert r.status_code == 200 and r.get_json() == COMPONENTS
+    assert etag.startswith('"') and not etag.startswith('W/')
+    assert r.headers['Cache-Control'] == 'no-cache' and r.headers['Vary'] == 'Accept-Encoding'
+    r = client.get('/api/components', headers={'If-None-Match': etag})
+    assert r.status_code == 304 and r.data == b'' and r.headers['ETag'] == etag
+    assert client.get('/api/components', headers={'If-None-Match': '"other"'}).status_code == 200
+
+
+def test_compressed_bodies_have_their_own_etag(client, components):
+    plain = client.get('/api/components').headers['ETag']
+    r = client.get('/api/components', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert r.headers['Content-Encoding'] == 'gzip' and r.headers['Vary'] == 'Accept-Encoding'
+    assert json.loads(gzip.decompress(r.data)) == COMPONENTS
+    assert r.headers['ETag'] != plain
+    r = client.get('/api/components', headers={'Accept-Encoding': 'gzip', 'If-None-Match': r.headers['ETag']})
+    assert r.status_code == 304
+    r = client.get('/api/components', headers={'Accept-Encoding': 'br, gzip'})
+    assert r.headers['Content-Encoding'] == ('br' if brotli is not None else 'gzip')
+    assert 'Content-Encoding' not in client.get('/api/components', headers={'Accept-Encoding': 'gzip;q=0'}).headers
+
+
+def test_etag_changes_with_the_file(client, components):
+    etag = client.get('/api/components').headers['ETag']
+    # same size, new content and mtime
+    changed = [dict(COMPONENTS[0], name='Part X')] + COMPONENTS[1:]
+    components.write_text(json.dumps(changed), encoding='utf-8')
+    os.utime(components, ns=(1, 1))
+    r = client.get('/api/components', headers={'If-None-Match': etag})
+    assert r.status_code == 200 and r.get_json()[0]['name'] == 'Part X'
+    etag = r.headers['ETag']
+    # new size
+    components.write_text(json.dumps(changed[:5]), encoding='utf-8')
+    r = client.get('/api/components', headers={'If-None-Match': etag})
+    assert r.status_code == 200 and len(r.get_json()) == 5
+    etag = r.headers['ETag']
+    # a new mtime with the same content keeps the ETag: it is derived from the body
+    os.utime(components, ns=(2, 2))
+    assert client.get('/api/components', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_questions_are_served_the_same_way(client, tmp_path, monkeypatch):
+    path = tmp_path / 'questions.json'
+    path.write_text(json.dumps([{'id': 'q1', 'prompt': 'Which connector?', 'difficulty': 'easy'}]), encoding='utf-8')
+    monkeypatch.setattr(hardware_app, 'QUESTIONS', CachedFile(
+        str(path), lambda p: hardware_app.get_bank(p).questions, default=[], check_interval=0))
+    r = client.get('/api/questions')
+    assert r.status_code == 200 and r.get_json()[0]['id'] == 'q1'
+    assert client.get('/api/questions', headers={'If-None-Match': r.headers['ETag']}).status_code == 304
+    path.write_text(json.dumps([{'id': 'q2', 'prompt': 'Which port?', 'difficulty': 'easy'}]), encoding='utf-8')
+    r = client.get('/api/questions', headers={'If-None-Match': r.headers['ETag']})
+    assert r.status_code == 200 and r.get_json()[0]['id'] == 'q2'
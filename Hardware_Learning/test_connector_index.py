@@ -0,0 +1,27 @@
+"""Unit tests for connector_index (run with pytest; no server needed)."""
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from connector_index import build_connector_index, nearest_connector
+
+
+def test_connector_index_nearest_matches_scan():
+    rng = random.Random(7)
+    comps = [{'id': f'sw{k}', 'connectors': [{'id': f'p{i}', 'x': rng.uniform(0, 720), 'y': rng.uniform(0, 400)}
+                                             for i in range(200)]} for k in range(5)]
+    index = build_connector_index(comps)
+    assert index['count'] == 1000
+    points = [(f"{c['id']}.{co['id']}", co['x'], co['y']) for c in comps for co in c['connectors']]
+    for _ in range(200):
+        x, y = rng.uniform(0, 720), rng.uniform(0, 400)
+        cid, d = nearest_connector(index, x, y, 15)
+        best = min(points, key=lambda p: math.hypot(p[1] - x, p[2] - y))
+        best_d = math.hypot(best[1] - x, best[2] - y)
+        if best_d <= 15:
+            assert (cid, round(d, 9)) == (best[0], round(best_d, 9))
+        else:
+            assert cid is None
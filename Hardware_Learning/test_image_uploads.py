@@ -0,0 +1,76 @@
+"""Unit tests for image_uploads (run with pytest; no server needed)."""
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from image_uploads import UploadError, UploadStore
+
+SVG = b'''<?xml version="1.0"?>
+<!-- exported -->
+<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10">
+  <metadata>tool data</metadata>
+  <rect x="0" y="0" width="10" height="10"/>
+</svg>'''
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    store = UploadStore(str(tmp_path), max_bytes=4096, workers=1)
+    yield store
+    store.shutdown()
+
+
+def test_same_content_is_stored_once_and_svg_minified(uploads, tmp_path):
+    first = uploads.save(io.BytesIO(SVG), 'switch.svg')
+    again = uploads.save(io.BytesIO(SVG), 'other name.svg')
+    assert not first['duplicate'] and again['duplicate']
+    assert again['path'] == first['path'] and first['path'].startswith('switch-')
+    uploads.wait()
+    assert uploads.pending() == []
+    stored = (tmp_path / first['path']).read_bytes()
+    assert b'metadata' not in stored and b'exported' not in stored and b'<rect' in stored
+    assert sorted(os.listdir(tmp_path)) == [first['path']]
+
+
+def test_rejects_oversize_wrong_type_and_mismatched_content(uploads, tmp_path):
+    with pytest.raises(UploadError) as err:
+        uploads.save(io.BytesIO(b'\x89PNG\r\n\x1a\n' + b'0' * 5000), 'big.png')
+    assert err.value.status == 413
+    with pytest.raises(UploadError) as err:
+        uploads.save(io.BytesIO(b'MZ'), 'tool.exe')
+    assert err.value.status == 415
+    with pytest.raises(UploadError):
+        uploads.save(io.BytesIO(b'<html></html>'), 'fake.png')
+    assert os.listdir(tmp_path) == []
+
+
+def test_duplicates_are_found_without_listing_the_directory(tmp_path, monkeypatch):
+    first = UploadStore(str(tmp_path), max_bytes=4096, workers=1)
+    stored = first.save(io.BytesIO(SVG), 'switch.svg')
+    first.shutdown()
+    # a new store indexes the existing files once, then never lists the directory again
+    uploads = UploadStore(str(tmp_path), max_bytes=4096, workers=1)
+    monkeypatch.setattr(os, 'listdir', lambda path: pytest.fail('directory listed on upload'))
+    try:
+        again = uploads.save(io.BytesIO(SVG), 'renamed.svg')
+        assert again['duplicate'] and again['path'] == stored['path']
+        # a stored file removed behind the store's back is written again
+        os.remove(tmp_path / stored['path'])
+        restored = uploads.save(io.BytesIO(SVG), 'router.svg')
+        assert not restored['duplicate'] and (tmp_path / restored['path']).exists()
+    finally:
+        uploads.shutdown()
+
+
+def test_concurrent_uploads_of_the_same_content_store_one_file(uploads, tmp_path):
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda i: uploads.save(io.BytesIO(SVG), f'copy{i}.svg'), range(16)))
+    uploads.wait()
+    assert len({r['path'] for r in results}) == 1
+    assert sum(not r['duplicate'] for r in results) == 1
+    assert os.listdir(tmp_path) == [results[0]['path']]
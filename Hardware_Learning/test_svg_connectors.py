@@ -0,0 +1,83 @@
+"""Unit tests for svg_connectors (run with pytest; no server needed)."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from svg_connectors import SvgCache, parse_svg, scaled_connectors
+
+SVG = b'''<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 200 100">
+  <g transform="translate(10,20)">
+    <circle data-conn="router.wan" cx="5" cy="5" r="2"/>
+    <g transform="translate(100)"><rect data-conn="router.lan1" x="0" y="0" width="10" height="4"/></g>
+  </g>
+</svg>'''
+
+
+def test_parse_svg_returns_viewbox_and_connectors():
+    parsed = parse_svg(SVG)
+    assert parsed['viewbox'] == [200.0, 100.0]
+    assert parsed['connectors'] == {'router.wan': {'x': 15.0, 'y': 25.0},
+                                    'router.lan1': {'x': 115.0, 'y': 22.0}}
+
+
+def test_scaled_connectors_maps_into_component_box():
+    comp = {'svg': {'x': 100, 'y': 50, 'w': 400, 'h': 200}}
+    conns = scaled_connectors(comp, parse_svg(SVG))
+    assert conns[0] == {'id': 'wan', 'x': 130.0, 'y': 100.0}
+    assert scaled_connectors({'svg': {}}, parse_svg(SVG)) is None
+
+
+def test_cache_parses_each_content_once(tmp_path):
+    svg = tmp_path / 'router.svg'
+    svg.write_bytes(SVG)
+    copy = tmp_path / 'router_copy.svg'
+    copy.write_bytes(SVG)
+    cache_file = str(tmp_path / 'svg_cache.json')
+    cache = SvgCache(cache_file)
+    cache.get(str(svg))
+    cache.get(str(copy))
+    cache.save()
+    assert (cache.misses, cache.hits) == (1, 1)
+
+    again = SvgCache(cache_file)
+    assert again.get(str(svg))['viewbox'] == [200.0, 100.0]
+    assert again.misses == 0
+
+    svg.write_bytes(SVG.replace(b'cx="5"', b'cx="17"'))
+    assert again.get(str(svg))['connectors']['router.wan']['x'] == 27.0
+    assert again.misses == 1
+
+
+def test_full_transform_support():
+    svg = b'''<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50">
+      <g transform="matrix(2 0 0 2 10 10)">
+        <g transform="rotate(90)"><circle data-conn="a" cx="5" cy="0"/></g>
+        <g transform="scale(3, 1) translate(1)"><circle data-conn="b" cx="1" cy="1"/></g>
+        <g transform="skewX(45)"><rect data-conn="c" x="0" y="1" width="0" height="2"/></g>
+        <g transform="rotate(180 5 5)"><circle data-conn="d" cx="5" cy="0"/></g>
+      </g>
+    </svg>'''
+    parsed = parse_svg(svg)
+    assert parsed['viewbox'] == [100.0, 50.0]
+    got = {k: (round(v['x'], 6), round(v['y'], 6)) for k, v in parsed['connectors'].items()}
+    assert got == {'a': (10.0, 20.0), 'b': (22.0, 12.0), 'c': (14.0, 14.0), 'd': (20.0, 30.0)}
+
+
+def test_refresh_components_changed_only(tmp_path):
+    from svg_connectors import refresh_components
+    (tmp_path / 'a.svg').write_bytes(SVG)
+    (tmp_path / 'b.svg').write_bytes(SVG.replace(b'cx="5"', b'cx="6"'))
+    comps = [{'id': n, 'image': f'{n}.svg', 'svg': {'x': 0, 'y': 0, 'w': 200, 'h': 100}} for n in ('a', 'b')]
+    comps.append({'id': 'gone', 'image': 'gone.svg'})
+    cache = SvgCache(str(tmp_path / 'svg_cache.json'))
+    updated, report = refresh_components(comps, str(tmp_path), cache, jobs=2)
+    assert updated == 2
+    assert sorted(r['status'] for r in report) == ['missing', 'parsed', 'parsed']
+
+    (tmp_path / 'b.svg').write_bytes(SVG.replace(b'cx="5"', b'cx="15"'))
+    for c in comps:
+        c.pop('connectors', None)
+    updated, _ = refresh_components(comps, str(tmp_path), cache, changed_only=True)
+    assert updated == 1
+    assert 'connectors' not in comps[0] and comps[1]['connectors'][0]['x'] == 25.0
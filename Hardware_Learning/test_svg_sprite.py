@@ -0,0 +1,43 @@
+"""Unit tests for svg_sprite (run with pytest; no server needed)."""
+import os
+import sys
+from xml.etree import ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from svg_sprite import SVG_NS, build_sprite, minify_svg
+
+ICON = b'''<?xml version="1.0"?>
+<!-- exported -->
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+     viewBox="0 0 50 20" inkscape:version="1.2">
+  <metadata><rdf xmlns="http://www.w3.org/1999/02/22-rdf-syntax-ns#"/></metadata>
+  <defs><linearGradient id="g"/></defs>
+  <rect x="0" y="0" width="50" height="20" fill="url(#g)" inkscape:label="body"/>
+  <circle data-conn="sw.p1" cx="5" cy="5" r="2"/>
+  <text x="1" y="1">Port  1</text>
+</svg>'''
+
+
+def test_minify_strips_editor_data_and_whitespace():
+    out = minify_svg(ICON)
+    assert b'inkscape' not in out and b'metadata' not in out and b'exported' not in out
+    assert b'\n' not in out
+    assert b'Port  1' in out and b'data-conn="sw.p1"' in out
+
+
+def test_sprite_shares_symbols_and_prefixes_ids():
+    comps = [
+        {'id': 'a', 'image': 'sw.svg', 'svg': {'x': 10, 'y': 20, 'w': 100, 'h': 40}},
+        {'id': 'b', 'image': 'sw.svg', 'svg': {'x': 10, 'y': 80, 'w': 100, 'h': 40}},
+        {'id': 'c', 'image': 'missing.svg'},
+    ]
+    body, placed = build_sprite(comps, lambda name: ICON if name == 'sw.svg' else None)
+    root = ET.fromstring(body)
+    symbols = root.findall(f'{{{SVG_NS}}}defs/{{{SVG_NS}}}symbol')
+    uses = root.findall(f'{{{SVG_NS}}}use')
+    assert len(symbols) == 1 and len(uses) == 2
+    assert placed == {'a': symbols[0].get('id'), 'b': symbols[0].get('id')}
+    assert uses[1].get('y') == '80' and uses[1].get('height') == '40'
+    sid = symbols[0].get('id')
+    assert f'id="{sid}-g"'.encode() in body and f'url(#{sid}-g)'.encode() in body
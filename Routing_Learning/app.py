@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog
 import json
 import random
 import os
@@ -7,6 +7,10 @@ import ipaddress
 from datetime import datetime
 import platform
 import math
+import sys
+import heapq
+import threading
+import time
 
 USE_WINSOUND = platform.system() == 'Windows'
 if USE_WINSOUND:
@@ -22,11 +26,20 @@ else:
         pygame = None
 
 BASE_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, "..")))
+from learning_common.question_bank import QuestionBank, get_bank
+from learning_common.storage import open_store
+from learning_common.tk_history import HistoryPager
+from learning_common.tk_study_search import StudySearchBar
+from canvas_scene import CanvasScene
+from ospf_sim import BACKBONE, generate as generate_ospf, is_lan, layout as ospf_layout
+from route_batch import BatchMatcher, load_destinations, random_destinations
+from route_import import load_routes
+from route_table import RouteTable
+
 QUESTIONS_FILE = os.path.join(BASE_DIR, "questions.json")
 STUDY_FILE = os.path.join(BASE_DIR, "study_content.md")
 SETTINGS_FILE = os.path.join(BASE_DIR, "learn_settings.json")
-SCORES_FILE = os.path.join(BASE_DIR, "scores.json")
-REVIEW_FILE = os.path.join(BASE_DIR, "review_list.json")
 
 QUESTION_COUNT_CHOICES = [10, 15, 20, 25]
 DEFAULT_QUESTION_COUNT = 20
@@ -78,19 +91,15 @@ def update_and_draw_confetti(canvas):
 def load_questions():
     """Load the merged routing question bank."""
     try:
-        with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return [q for q in data if isinstance(q, dict)]
+        return get_bank(QUESTIONS_FILE)
     except Exception:
-        pass
-    return []
+        return QuestionBank([])
 
 
-QUESTIONS = load_questions()
+BANK = load_questions()
+QUESTIONS = BANK.questions
 
 DIFFICULTIES = ["easy", "medium", "hard"]
-QUESTIONS_BY_DIFF = {d: [q for q in QUESTIONS if q.get("difficulty") == d] for d in DIFFICULTIES}
 
 ROUTE_LAB_ROUTES = [
     {
@@ -145,6 +154,35 @@ ROUTE_LAB_ROUTES = [
     },
 ]
 
+ROUTE_LAB_TABLE = RouteTable.from_routes(ROUTE_LAB_ROUTES)
+
+
+def route_lab_matches(table, dest_ip):
+    """(destination, matching route dicts best first, error text) for dest_ip in table."""
+    try:
+        dest = ipaddress.ip_address(dest_ip)
+    except ValueError:
+        return None, [], "Invalid destination IP address."
+
+    matches = [table.route(rid) for rid in table.matches(dest)]
+    if not matches:
+        return dest, [], "No matching route found. The packet would be dropped unless a suitable default route exists."
+    return dest, matches, ""
+
+
+def route_lab_summary(winner):
+    """One-line description of the winning route; imported routes may lack a next hop or interface."""
+    text = f"Best match: {winner['prefix']} via {winner['protocol']}"
+    if winner.get("next_hop"):
+        text += f" from {winner['next_hop']}"
+    if winner.get("interface"):
+        text += f" on {winner['interface']}"
+    return text + "."
+
+# batch mode: destinations generated by default and how many routes the hit histogram lists
+BATCH_DEFAULT_COUNT = 1000000
+BATCH_TOP_ROUTES = 200
+
 ROUTE_LAB_NODES = {
     "Edge": (155, 175),
     "R1": (315, 95),
@@ -173,6 +211,13 @@ ROUTE_LAB_SCENARIOS = {
     },
 }
 
+# generated OSPF topologies: default size and how many routes the lab table lists
+OSPF_GEN_ROUTERS = 40
+OSPF_GEN_AREAS = 4
+OSPF_TABLE_ROWS = 300
+OSPF_STATIC_COLUMNS = (("lsa", "LSA/Role", 70), ("area", "Area", 50), ("source", "Source", 70), ("meaning", "Meaning", 120))
+OSPF_ROUTE_COLUMNS = (("lsa", "Type", 45), ("area", "Prefix", 110), ("source", "Next Hop", 75), ("meaning", "Cost", 50))
+
 OSPF_LAB_NODES = {
     "R1": (85, 120),
     "R2 ABR": (215, 120),
@@ -235,63 +280,37 @@ OSPF_LAB_SCENARIOS = {
 }
 
 
-def load_scores():
-    try:
-        if os.path.exists(SCORES_FILE):
-            with open(SCORES_FILE, "r", encoding="utf-8") as sf:
-                return json.load(sf)
-    except Exception:
-        pass
-    return []
-
-
-def save_score_record(record):
-    scores = load_scores()
-    scores.insert(0, record)
-    scores = scores[:20]
-    try:
-        with open(SCORES_FILE, "w", encoding="utf-8") as sf:
-            json.dump(scores, sf, indent=2)
-    except Exception:
-        pass
+# scores, the review list and attempts go through the configured store (journal files or SQLite)
+SCORES_KEEP = 20
+HISTORY_PAGE_SIZE = 20
+STORE = open_store(BASE_DIR, "routing", bank=BANK, scores_keep=SCORES_KEEP)
 
 
-def load_review_list():
+def load_scores(limit=SCORES_KEEP, offset=0):
+    """Return one page of score records, newest first."""
     try:
-        if os.path.exists(REVIEW_FILE):
-            with open(REVIEW_FILE, 'r', encoding='utf-8') as rf:
-                return json.load(rf)
+        return STORE.scores(limit, offset)
     except Exception:
-        pass
-    return []
+        return []
 
 
-def save_review_list(lst):
+def save_score_record(record):
     try:
-        with open(REVIEW_FILE, 'w', encoding='utf-8') as rf:
-            json.dump(lst, rf, indent=2)
+        STORE.add_score(record)
     except Exception:
         pass
 
 
 def add_question_to_review(q):
-    # store minimal identifying info so questions can be matched later
+    # review entries are stable question IDs
     try:
-        lst = load_review_list()
-        key = {'difficulty': q.get('difficulty'), 'question': q.get('question')}
-        if key not in lst:
-            lst.append(key)
-            save_review_list(lst)
+        STORE.add_review(q)
     except Exception:
         pass
 
 
 def clear_review_list():
-    try:
-        if os.path.exists(REVIEW_FILE):
-            os.remove(REVIEW_FILE)
-    except Exception:
-        pass
+    STORE.clear_review()
 
 
 def play_sound(kind="correct"):
@@ -358,6 +377,7 @@ class RoutingLearnApp(tk.Tk):
         self.nb.add(self.study_frame, text="Study")
         self._build_study_tab()
 
+        self.route_table = ROUTE_LAB_TABLE
         self.lab_frame = ttk.Frame(self.nb)
         self.nb.add(self.lab_frame, text="Route Lab")
         self._build_route_lab_tab()
@@ -379,6 +399,8 @@ class RoutingLearnApp(tk.Tk):
         lbl.pack(pady=8)
 
         self.study_text = scrolledtext.ScrolledText(self.study_frame, wrap=tk.WORD)
+        self.study_search = StudySearchBar(self.study_frame, self.study_text, label="Search:")
+        self.study_search.pack(fill=tk.X, padx=10)
         self.study_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
         try:
             with open(STUDY_FILE, "r", encoding="utf-8") as sf:
@@ -387,6 +409,7 @@ class RoutingLearnApp(tk.Tk):
             content = "Study content not found."
         self.study_text.insert(tk.END, content)
         self.study_text.configure(state=tk.DISABLED)
+        self.study_search.load(content)
 
     def _build_route_lab_tab(self):
         title = ttk.Label(self.lab_frame, text="Route Lab: Longest Prefix Match and Path Selection", font=(None, 15))
@@ -415,6 +438,21 @@ class RoutingLearnApp(tk.Tk):
         ttk.Button(controls, text="Load Scenario", command=self.load_route_lab_scenario).pack(side=tk.LEFT, padx=(0, 6))
         ttk.Button(controls, text="Analyze Route", command=self.analyze_route_lab).pack(side=tk.LEFT, padx=(0, 6))
 
+        batch = ttk.Frame(self.lab_frame)
+        batch.pack(fill=tk.X, padx=10, pady=(0, 8))
+        ttk.Label(batch, text="Batch destinations:").pack(side=tk.LEFT, padx=(0, 6))
+        self.lab_batch_count_var = tk.StringVar(value=str(BATCH_DEFAULT_COUNT))
+        ttk.Entry(batch, textvariable=self.lab_batch_count_var, width=10).pack(side=tk.LEFT, padx=(0, 8))
+        ttk.Button(batch, text="Random Batch", command=self.run_route_lab_batch).pack(side=tk.LEFT, padx=(0, 6))
+        ttk.Button(batch, text="Batch From File...", command=self.run_route_lab_batch_file).pack(side=tk.LEFT, padx=(0, 6))
+        ttk.Button(batch, text="Import Table...", command=self.import_route_lab_table).pack(side=tk.LEFT, padx=(6, 6))
+        ttk.Button(batch, text="Lab Table", command=self.reset_route_lab_table).pack(side=tk.LEFT, padx=(0, 6))
+        self.lab_batch_status_var = tk.StringVar(value="")
+        ttk.Label(batch, textvariable=self.lab_batch_status_var, wraplength=200).pack(side=tk.LEFT, padx=(6, 0))
+        self._lab_job = None
+        self._lab_job_result = None
+        self._batch_matcher = None
+
         main = ttk.Frame(self.lab_frame)
         main.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
@@ -423,6 +461,7 @@ class RoutingLearnApp(tk.Tk):
 
         self.lab_canvas = tk.Canvas(left, width=520, height=360, bg="#101420", highlightthickness=0)
         self.lab_canvas.pack(fill=tk.BOTH, expand=True)
+        self.lab_scene = CanvasScene(self.lab_canvas, layers=("background", "links", "nodes", "overlay"))
 
         right = ttk.Frame(main)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -465,6 +504,25 @@ class RoutingLearnApp(tk.Tk):
 
         ttk.Button(controls, text="Analyze OSPF", command=self.analyze_ospf_lab).pack(side=tk.LEFT, padx=(0, 6))
 
+        gen = ttk.Frame(self.ospf_frame)
+        gen.pack(fill=tk.X, padx=10, pady=(0, 8))
+        ttk.Label(gen, text="Routers:").pack(side=tk.LEFT, padx=(0, 4))
+        self.ospf_gen_routers_var = tk.StringVar(value=str(OSPF_GEN_ROUTERS))
+        ttk.Entry(gen, textvariable=self.ospf_gen_routers_var, width=6).pack(side=tk.LEFT, padx=(0, 6))
+        ttk.Label(gen, text="Areas:").pack(side=tk.LEFT, padx=(0, 4))
+        self.ospf_gen_areas_var = tk.StringVar(value=str(OSPF_GEN_AREAS))
+        ttk.Entry(gen, textvariable=self.ospf_gen_areas_var, width=4).pack(side=tk.LEFT, padx=(0, 6))
+        ttk.Button(gen, text="Generate", command=self.generate_ospf_lab).pack(side=tk.LEFT, padx=(0, 6))
+        ttk.Label(gen, text="Router:").pack(side=tk.LEFT, padx=(6, 4))
+        self.ospf_router_var = tk.StringVar(value="")
+        self.ospf_router_box = ttk.Combobox(gen, textvariable=self.ospf_router_var, width=8, state="readonly")
+        self.ospf_router_box.pack(side=tk.LEFT, padx=(0, 6))
+        self.ospf_router_box.bind("<<ComboboxSelected>>", lambda _event: self.analyze_generated_ospf())
+        ttk.Button(gen, text="Change a Link Cost", command=self.change_ospf_link_cost).pack(side=tk.LEFT, padx=(0, 6))
+        self.ospf_domain = None
+        self.ospf_layout = None
+        self._ospf_highlight = None     # (router, highlighted link keys) while the generated domain is drawn
+
         main = ttk.Frame(self.ospf_frame)
         main.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
 
@@ -473,6 +531,7 @@ class RoutingLearnApp(tk.Tk):
 
         self.ospf_canvas = tk.Canvas(left, width=520, height=360, bg="#101420", highlightthickness=0)
         self.ospf_canvas.pack(fill=tk.BOTH, expand=True)
+        self.ospf_scene = CanvasScene(self.ospf_canvas, layers=("background", "areas", "links", "nodes", "labels"))
 
         right = ttk.Frame(main)
         right.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -482,9 +541,7 @@ class RoutingLearnApp(tk.Tk):
         ttk.Label(right, textvariable=self.ospf_summary_var, wraplength=250, justify="left").pack(anchor="w", pady=(0, 8))
 
         self.ospf_tree = ttk.Treeview(right, columns=("lsa", "area", "source", "meaning"), show="headings", height=9)
-        for col, label, width in (("lsa", "LSA/Role", 70), ("area", "Area", 50), ("source", "Source", 70), ("meaning", "Meaning", 120)):
-            self.ospf_tree.heading(col, text=label)
-            self.ospf_tree.column(col, width=width, anchor="w")
+        self._set_ospf_columns(OSPF_STATIC_COLUMNS)
         self.ospf_tree.pack(fill=tk.BOTH, expand=True, pady=(0, 8))
 
         self.ospf_detail_var = tk.StringVar(value="OSPF details will appear here.")
@@ -577,10 +634,12 @@ class RoutingLearnApp(tk.Tk):
         self.correct_count = 0
 
     def _build_history_tab(self):
-        lbl = ttk.Label(self.history_frame, text="Score History (last 20)", font=(None, 14))
+        lbl = ttk.Label(self.history_frame, text="Score History", font=(None, 14))
         lbl.pack(pady=8)
-        self.history_list = tk.Listbox(self.history_frame, height=15)
-        self.history_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        self.history_pager = HistoryPager(self.history_frame, load_scores, STORE.score_count, self._format_score,
+                                          page_size=HISTORY_PAGE_SIZE, height=15)
+        self.history_pager.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        self.history_list = self.history_pager.listbox
         btn_frame = ttk.Frame(self.history_frame)
         btn_frame.pack(fill=tk.X, pady=6)
         ttk.Button(btn_frame, text="Clear History", command=self.clear_history).pack(side=tk.RIGHT, padx=6)
@@ -594,52 +653,155 @@ class RoutingLearnApp(tk.Tk):
         self.lab_dest_var.set(scenario.get("destination", ""))
         self.analyze_route_lab()
 
-    def _route_lab_matches(self, dest_ip):
+    def run_route_lab_batch(self):
         try:
-            dest = ipaddress.ip_address(dest_ip)
+            count = int(self.lab_batch_count_var.get().replace(",", "").replace("_", ""))
         except ValueError:
-            return None, [], "Invalid destination IP address."
-
-        matches = []
-        for route in ROUTE_LAB_ROUTES:
-            try:
-                network = ipaddress.ip_network(route["prefix"], strict=False)
-            except ValueError:
-                continue
-            if dest in network:
-                item = dict(route)
-                item["network"] = network
-                item["prefixlen"] = network.prefixlen
-                matches.append(item)
-
-        if not matches:
-            return dest, [], "No matching route found. The packet would be dropped unless a suitable default route exists."
+            count = 0
+        if count <= 0:
+            messagebox.showerror("Batch", "Enter how many destinations to generate.")
+            return
+        table = self.route_table
+        self._start_route_lab_batch(lambda: (random_destinations(count, table=table), 0),
+                                    f"{count:,} random destinations")
+
+    def run_route_lab_batch_file(self):
+        path = filedialog.askopenfilename(
+            title="Destination IPs (one per line)",
+            filetypes=[("Text files", "*.txt *.csv"), ("All files", "*.*")],
+        )
+        if path:
+            self._start_route_lab_batch(lambda: load_destinations(path), os.path.basename(path))
 
-        matches.sort(key=lambda r: (-r["prefixlen"], r["ad"], r["metric"]))
-        return dest, matches, ""
+    def _run_lab_job(self, work, done, status):
+        """Run work() on a worker thread, then done(result) on the Tk thread."""
+        if self._lab_job is not None and self._lab_job.is_alive():
+            return
 
-    def _draw_node(self, canvas, x, y, label, fill="#1e2633", outline="#7aa2f7", radius=20, text_fill="#f5f7ff"):
-        canvas.create_oval(x - radius, y - radius, x + radius, y + radius, fill=fill, outline=outline, width=2)
-        canvas.create_text(x, y, text=label, fill=text_fill, font=(None, 9, "bold"))
+        def run():
+            try:
+                self._lab_job_result = (True, work())
+            except Exception as e:
+                self._lab_job_result = (False, e)
+
+        self._lab_job_result = None
+        self.lab_batch_status_var.set(status)
+        self._lab_job = threading.Thread(target=run, daemon=True)
+        self._lab_job.start()
+        self.after(100, lambda: self._poll_lab_job(done))
+
+    def _poll_lab_job(self, done):
+        if self._lab_job.is_alive():
+            self.after(100, lambda: self._poll_lab_job(done))
+            return
+        ok, result = self._lab_job_result
+        if not ok:
+            self.lab_batch_status_var.set("Failed.")
+            messagebox.showerror("Route Lab", str(result))
+            return
+        done(result)
+
+    def _start_route_lab_batch(self, source, label):
+        """Resolve destinations from source() in the background and show the hit histogram."""
+        if self._batch_matcher is None or self._batch_matcher.table is not self.route_table:
+            self._batch_matcher = BatchMatcher(self.route_table)
+        matcher = self._batch_matcher
+
+        def work():
+            addrs, skipped = source()
+            start = time.perf_counter()
+            counts, unmatched = matcher.histogram(addrs)
+            return len(addrs), skipped, counts, unmatched, time.perf_counter() - start
+
+        def done(result):
+            total, skipped, counts, unmatched, elapsed = result
+            mode = "NumPy" if matcher.vectorized else "trie"
+            rate = total / elapsed / 1e6 if elapsed > 0 else 0
+            self.lab_batch_status_var.set(f"{total:,} lookups in {elapsed:.2f}s ({rate:.2f} M/s, {mode})")
+            self.show_route_lab_histogram(label, total, skipped, counts, unmatched)
+
+        self._run_lab_job(work, done, f"Resolving {label}...")
+
+    def import_route_lab_table(self):
+        path = filedialog.askopenfilename(
+            title="Routing table (show ip route, CSV or MRT dump)",
+            filetypes=[("Routing tables", "*.txt *.log *.csv *.mrt *.gz *.bz2"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        name = os.path.basename(path)
+
+        def work():
+            start = time.perf_counter()
+            table, added = load_routes(path)
+            return table, added, time.perf_counter() - start
+
+        def done(result):
+            table, added, elapsed = result
+            if not added:
+                self.lab_batch_status_var.set(f"No routes found in {name}.")
+                return
+            self.route_table = table
+            self.lab_batch_status_var.set(f"{name}: {added:,} routes loaded in {elapsed:.1f}s")
+            self.analyze_route_lab()
+
+        self._run_lab_job(work, done, f"Loading {name}...")
+
+    def reset_route_lab_table(self):
+        self.route_table = ROUTE_LAB_TABLE
+        self.lab_batch_status_var.set("Using the lab topology table.")
+        self.analyze_route_lab()
 
-    def _draw_link(self, canvas, start, end, nodes_map, color="#51627a", width=3, dash=None):
+    def show_route_lab_histogram(self, label, total, skipped, counts, unmatched):
+        popup = tk.Toplevel(self)
+        popup.title("Route Lab: Traffic Distribution")
+        popup.geometry("560x420")
+        used = sum(1 for c in counts if c)
+        summary = f"{label}: {total:,} destinations, {used:,} of {len(counts):,} routes used, {unmatched:,} dropped (no route)"
+        if skipped:
+            summary += f", {skipped:,} unreadable lines skipped"
+        ttk.Label(popup, text=summary, wraplength=530, justify="left").pack(anchor="w", padx=10, pady=8)
+
+        tree = ttk.Treeview(popup, columns=("prefix", "next_hop", "hits", "share"), show="headings")
+        for col, text, width in (("prefix", "Prefix", 150), ("next_hop", "Next Hop", 100), ("hits", "Hits", 90), ("share", "Share", 190)):
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor="w")
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        table = self.route_table
+        top = heapq.nlargest(BATCH_TOP_ROUTES, ((c, rid) for rid, c in enumerate(counts) if c))
+        for hits, rid in top:
+            route = table.route(rid)
+            share = hits / total if total else 0
+            tree.insert("", tk.END, values=(route["prefix"], route["next_hop"], f"{hits:,}",
+                                            f"{share:6.1%} " + "#" * round(share * 30)))
+
+    def _draw_node(self, scene, x, y, label, fill="#1e2633", outline="#7aa2f7", radius=20, text_fill="#f5f7ff"):
+        scene.item(("node", label), "oval", (x - radius, y - radius, x + radius, y + radius),
+                   layer="nodes", fill=fill, outline=outline, width=2)
+        scene.item(("node label", label), "text", (x, y), layer="nodes", text=label, fill=text_fill, font=(None, 9, "bold"))
+
+    def _draw_link(self, scene, key, start, end, nodes_map, color="#51627a", width=3, dash=None, layer="links"):
         x1, y1 = nodes_map[start]
         x2, y2 = nodes_map[end]
-        canvas.create_line(x1, y1, x2, y2, fill=color, width=width, dash=dash)
+        scene.item(key, "line", (x1, y1, x2, y2), layer=layer, fill=color, width=width, dash=dash)
 
     def render_route_lab(self, dest_ip, matches, focus_prefixes=None):
         focus_prefixes = focus_prefixes or []
-        self.lab_canvas.delete("all")
-        self.lab_canvas.create_rectangle(0, 0, 520, 360, fill="#101420", outline="")
-        self.lab_canvas.create_text(16, 14, anchor="nw", text=f"Destination: {dest_ip}", fill="#d7e3ff", font=(None, 11, "bold"))
+        scene = self.lab_scene
+        scene.begin()
+        scene.item("background", "rectangle", (0, 0, 520, 360), layer="background", fill="#101420", outline="")
+        scene.item("title", "text", (16, 14), layer="overlay", anchor="nw", text=f"Destination: {dest_ip}",
+                   fill="#d7e3ff", font=(None, 11, "bold"))
 
-        for route in ROUTE_LAB_ROUTES:
+        for index, route in enumerate(ROUTE_LAB_ROUTES):
             path = route["path"]
             active = route["prefix"] in focus_prefixes
             line_color = route["color"] if active else "#39485f"
             line_width = 5 if active else 2
             for start, end in zip(path, path[1:]):
-                self._draw_link(self.lab_canvas, start, end, ROUTE_LAB_NODES, color=line_color, width=line_width)
+                self._draw_link(scene, ("route", index, start, end), start, end, ROUTE_LAB_NODES,
+                                color=line_color, width=line_width)
 
         for name, (x, y) in ROUTE_LAB_NODES.items():
             fill = "#233044"
@@ -650,23 +812,27 @@ class RoutingLearnApp(tk.Tk):
             if name in {"LAN-A", "LAN-B", "LAN-C", "Internet"}:
                 fill = "#2a1d35" if name != "Internet" else "#293f2e"
                 outline = "#9fa8da" if name != "Internet" else "#81c784"
-            self._draw_node(self.lab_canvas, x, y, name, fill=fill, outline=outline, radius=22 if name == "Edge" else 19)
+            self._draw_node(scene, x, y, name, fill=fill, outline=outline, radius=22 if name == "Edge" else 19)
 
         if matches:
             winner = matches[0]
-            self.lab_canvas.create_rectangle(10, 38, 510, 95, fill="#162033", outline="#57b6ff")
-            self.lab_canvas.create_text(
-                18,
-                46,
+            scene.item("winner box", "rectangle", (10, 38, 510, 95), layer="overlay", fill="#162033", outline="#57b6ff")
+            scene.item(
+                "winner",
+                "text",
+                (18, 46),
+                layer="overlay",
                 anchor="nw",
                 text=f"Winning route: {winner['prefix']} via {winner['protocol']}  |  AD {winner['ad']}  |  Metric {winner['metric']}",
                 fill="#eff6ff",
                 font=(None, 10, "bold"),
                 width=480,
             )
-            self.lab_canvas.create_text(
-                18,
-                66,
+            scene.item(
+                "reason",
+                "text",
+                (18, 66),
+                layer="overlay",
                 anchor="nw",
                 text=f"Reason: longest prefix match wins first, then lower administrative distance and metric decide ties.",
                 fill="#cfe3ff",
@@ -674,17 +840,20 @@ class RoutingLearnApp(tk.Tk):
                 width=480,
             )
 
-            for route in matches[:3]:
-                path = route["path"]
+            # imported routes have no place on the lab topology
+            for rank, route in enumerate(matches[:3]):
+                path = route.get("path", [])
                 for start, end in zip(path, path[1:]):
-                    self._draw_link(self.lab_canvas, start, end, ROUTE_LAB_NODES, color=route["color"], width=5)
+                    self._draw_link(scene, ("match", rank, start, end), start, end, ROUTE_LAB_NODES,
+                                    color=route["color"], width=5, layer="overlay")
+        scene.end()
 
     def analyze_route_lab(self):
         dest_ip = self.lab_dest_var.get().strip()
         scenario_name = self.lab_scenario_var.get()
         scenario = ROUTE_LAB_SCENARIOS.get(scenario_name, {})
         focus_prefixes = scenario.get("focus", [])
-        dest, matches, error_text = self._route_lab_matches(dest_ip)
+        dest, matches, error_text = route_lab_matches(self.route_table, dest_ip)
 
         for item in self.lab_tree.get_children():
             self.lab_tree.delete(item)
@@ -702,9 +871,7 @@ class RoutingLearnApp(tk.Tk):
             return
 
         winner = matches[0]
-        self.lab_summary_var.set(
-            f"Best match: {winner['prefix']} via {winner['protocol']} from {winner['next_hop']} on {winner['interface']}."
-        )
+        self.lab_summary_var.set(route_lab_summary(winner))
         self.lab_detail_var.set(
             f"Why it wins: it is the longest matching prefix. If two routes tie on prefix length, lower AD wins; if AD ties, lower metric wins."
         )
@@ -714,12 +881,19 @@ class RoutingLearnApp(tk.Tk):
 
         self.render_route_lab(dest_ip, matches, focus_prefixes)
 
+    def _set_ospf_columns(self, columns):
+        for col, label, width in columns:
+            self.ospf_tree.heading(col, text=label)
+            self.ospf_tree.column(col, width=width, anchor="w")
+
     def analyze_ospf_lab(self):
         scenario_name = self.ospf_scenario_var.get()
         scenario = OSPF_LAB_SCENARIOS.get(scenario_name)
         if not scenario:
             return
 
+        self.ospf_domain = None
+        self._set_ospf_columns(OSPF_STATIC_COLUMNS)
         for item in self.ospf_tree.get_children():
             self.ospf_tree.delete(item)
 
@@ -732,20 +906,190 @@ class RoutingLearnApp(tk.Tk):
 
         self.render_ospf_lab(scenario_name)
 
+    def generate_ospf_lab(self):
+        try:
+            routers = int(self.ospf_gen_routers_var.get())
+            areas = int(self.ospf_gen_areas_var.get())
+        except ValueError:
+            messagebox.showerror("OSPF Lab", "Routers and areas must be whole numbers.")
+            return
+        if routers < 4 or not 1 <= areas <= 50:
+            messagebox.showerror("OSPF Lab", "Use at least 4 routers and 1-50 areas.")
+            return
+        start = time.perf_counter()
+        domain = generate_ospf(routers=routers, areas=areas, stub_areas=1 if areas > 2 else 0,
+                               externals=max(2, routers // 20), lans=max(1, routers // (areas * 15)))
+        self.ospf_domain = domain
+        self.ospf_layout = ospf_layout(domain, 520, 360)
+        self.ospf_scene.reset()
+        self._ospf_highlight = None
+        names = sorted(domain.routers, key=lambda r: domain.routers[r]["router_id"])
+        self.ospf_router_box.configure(values=names)
+        self.ospf_router_var.set(names[-1])
+        self._ospf_status = f"Generated {len(names)} routers, {len(domain.links)} links and {len(domain.lans)} LANs in {time.perf_counter() - start:.2f}s."
+        self.analyze_generated_ospf()
+
+    def analyze_generated_ospf(self):
+        domain = self.ospf_domain
+        router = self.ospf_router_var.get()
+        if domain is None or router not in domain.routers:
+            return
+        start = time.perf_counter()
+        routes = domain.routing_table(router)
+        elapsed = time.perf_counter() - start
+
+        self._set_ospf_columns(OSPF_ROUTE_COLUMNS)
+        for item in self.ospf_tree.get_children():
+            self.ospf_tree.delete(item)
+        for route in routes[:OSPF_TABLE_ROWS]:
+            hops = ", ".join(route.next_hops) if route.next_hops else "connected"
+            self.ospf_tree.insert("", tk.END, values=(route.kind, route.prefix, hops, route.cost))
+
+        areas = sorted(domain.areas_of(router))
+        kinds = {}
+        for route in routes:
+            kinds[route.kind] = kinds.get(route.kind, 0) + 1
+        lsa_counts = {}
+        for lsa in domain.lsdb(areas[0]):
+            lsa_counts[lsa.type] = lsa_counts.get(lsa.type, 0) + 1
+        area_text = ", ".join(f"{a}{' (stub)' if a in domain.stub_areas else ''}" for a in areas)
+        self.ospf_summary_var.set(
+            f"{router} ({' / '.join(domain.roles(router))}) in area {area_text}: {len(routes)} routes ("
+            + ", ".join(f"{k} {n}" for k, n in sorted(kinds.items())) + f"), computed in {elapsed * 1000:.0f} ms."
+        )
+        self.ospf_detail_var.set(
+            f"Area {areas[0]} LSDB: " + ", ".join(f"{t} x{n}" for t, n in sorted(lsa_counts.items()))
+            + ". " + getattr(self, "_ospf_status", "")
+        )
+        self.render_generated_ospf(router)
+
+    def change_ospf_link_cost(self):
+        """Change one random link cost in the selected router's area and repair SPF incrementally."""
+        domain = self.ospf_domain
+        router = self.ospf_router_var.get()
+        if domain is None or router not in domain.routers:
+            messagebox.showinfo("OSPF Lab", "Generate a topology first.")
+            return
+        areas = domain.areas_of(router)
+        links = [key for key, link in domain.links.items() if link["area"] in areas]
+        if not links:
+            return
+        a, b = random.choice(links)
+        old = domain.links[(a, b)]["cost"][a]
+        new = random.choice([c for c in (1, 5, 10, 64, 100, 500) if c != old])
+        area = domain.links[(a, b)]["area"]
+        start = time.perf_counter()
+        repaired, touched = domain.set_cost(a, b, new)
+        elapsed = time.perf_counter() - start
+        size = len(domain.graph(area))
+        self._ospf_status = (f"Link {a}-{b} cost {old} -> {new}: incremental SPF repaired {repaired} trees, "
+                             f"settling {touched} vertices (area has {size}) in {elapsed * 1000:.1f} ms.")
+        self.analyze_generated_ospf()
+
+    def _ospf_tree_links(self, router):
+        """Scene keys of the generated links on router's SPF trees (every area it is in)."""
+        domain = self.ospf_domain
+        keys = set()
+        for area in domain.areas_of(router):
+            for v, parents in domain.spf(area, router).parents.items():
+                for p in parents:
+                    if is_lan(p):
+                        keys.add(("gen", "link", p, v))
+                    elif is_lan(v):
+                        keys.add(("gen", "link", v, p))
+                    else:
+                        keys.add(("gen", "link") + tuple(sorted((p, v))))
+        return keys
+
+    def _generated_router_item(self, router, selected, radius):
+        x, y = self.ospf_layout[0][router]
+        r = radius + 4 if router == selected else radius
+        return (x - r, y - r, x + r, y + r), "#ff8a80" if router == selected else "#7aa2f7"
+
+    def render_generated_ospf(self, router):
+        """Draw the generated domain with router's SPF tree highlighted.
+
+        The first pass after generate_ospf_lab() (or after a static scenario
+        was shown) creates every item. After that only the links entering or
+        leaving the SPF tree, the two selected router nodes and the labels are
+        updated, so re-highlighting thousands of routers stays in milliseconds.
+        """
+        domain = self.ospf_domain
+        pos, boxes = self.ospf_layout
+        scene = self.ospf_scene
+        on_tree = self._ospf_tree_links(router)
+        radius = max(2, min(9, int(110 / max(1, len(domain.routers)) ** 0.5)))
+        title = f"Generated domain - SPF tree of {router}"
+        x, y = pos.get(router, (0, 0))
+
+        if self._ospf_highlight is not None:
+            previous, previous_tree = self._ospf_highlight
+            for key in previous_tree ^ on_tree:
+                active = key in on_tree
+                scene.update(key, fill="#ffd54f" if active else "#2c3a4f", width=2 if active else 1)
+            for v in {previous, router}:
+                if v in pos:
+                    coords, outline = self._generated_router_item(v, router, radius)
+                    scene.update(("gen", "node", v), coords, outline=outline)
+            scene.update(("gen", "title"), text=title)
+            scene.update(("gen", "router"), (x, y - radius - 12), text=router)
+            self._ospf_highlight = (router, on_tree)
+            return
+
+        scene.begin()
+        scene.item("background", "rectangle", (0, 0, 520, 360), layer="background", fill="#101420", outline="")
+        scene.item(("gen", "title"), "text", (16, 14), layer="labels", anchor="nw", text=title,
+                   fill="#d7e3ff", font=(None, 11, "bold"))
+        for area, (x0, y0, x1, y1) in boxes.items():
+            color = "#4dd0e1" if area == BACKBONE else "#81c784" if area in domain.stub_areas else "#ab47bc"
+            scene.item(("gen", "area", area), "rectangle", (x0, y0, x1, y1), layer="areas", outline=color, dash=(4, 2))
+            scene.item(("gen", "area label", area), "text", (x0 + 4, y0 + 3), layer="areas", anchor="nw",
+                       text=f"Area {area}", fill=color, font=(None, 8, "bold"))
+
+        for (a, b), link in domain.links.items():
+            if a in pos and b in pos:
+                active = ("gen", "link", a, b) in on_tree
+                scene.item(("gen", "link", a, b), "line", (*pos[a], *pos[b]), layer="links",
+                           fill="#ffd54f" if active else "#2c3a4f", width=2 if active else 1)
+        for name, lan in domain.lans.items():
+            v = ("LAN", name)
+            for r in lan["members"]:
+                if v in pos and r in pos:
+                    active = ("gen", "link", v, r) in on_tree
+                    scene.item(("gen", "link", v, r), "line", (*pos[v], *pos[r]), layer="links",
+                               fill="#ffd54f" if active else "#2c3a4f", width=2 if active else 1)
+
+        for v, (vx, vy) in pos.items():
+            if is_lan(v):
+                scene.item(("gen", "node", v), "rectangle", (vx - radius, vy - radius, vx + radius, vy + radius),
+                           layer="nodes", fill="#173b2e", outline="#81c784")
+                continue
+            fill = "#0f5b78" if domain.is_abr(v) else "#4d2b1f" if domain.is_asbr(v) else "#233044"
+            coords, outline = self._generated_router_item(v, router, radius)
+            scene.item(("gen", "node", v), "oval", coords, layer="nodes", fill=fill, outline=outline)
+        scene.item(("gen", "router"), "text", (x, y - radius - 12), layer="labels", text=router,
+                   fill="#ffcc80", font=(None, 9, "bold"))
+        scene.end()
+        self._ospf_highlight = (router, on_tree)
+
     def render_ospf_lab(self, scenario_name):
         scenario = OSPF_LAB_SCENARIOS.get(scenario_name, {})
         highlight = set(scenario.get("highlight", []))
         roles = scenario.get("roles", {})
 
-        canvas = self.ospf_canvas
-        canvas.delete("all")
-        canvas.create_rectangle(0, 0, 520, 360, fill="#101420", outline="")
-        canvas.create_text(16, 14, anchor="nw", text=f"Scenario: {scenario_name}", fill="#d7e3ff", font=(None, 11, "bold"))
+        self._ospf_highlight = None
+        scene = self.ospf_scene
+        scene.begin()
+        scene.item("background", "rectangle", (0, 0, 520, 360), layer="background", fill="#101420", outline="")
+        scene.item("title", "text", (16, 14), layer="labels", anchor="nw", text=f"Scenario: {scenario_name}",
+                   fill="#d7e3ff", font=(None, 11, "bold"))
 
-        canvas.create_rectangle(25, 35, 250, 320, outline="#4dd0e1", width=2, dash=(4, 2))
-        canvas.create_text(36, 42, anchor="nw", text="Area 0", fill="#4dd0e1", font=(None, 10, "bold"))
-        canvas.create_rectangle(265, 35, 500, 320, outline="#ab47bc", width=2, dash=(4, 2))
-        canvas.create_text(276, 42, anchor="nw", text="Area 1", fill="#ab47bc", font=(None, 10, "bold"))
+        scene.item(("area", 0), "rectangle", (25, 35, 250, 320), layer="areas", outline="#4dd0e1", width=2, dash=(4, 2))
+        scene.item(("area label", 0), "text", (36, 42), layer="areas", anchor="nw", text="Area 0",
+                   fill="#4dd0e1", font=(None, 10, "bold"))
+        scene.item(("area", 1), "rectangle", (265, 35, 500, 320), layer="areas", outline="#ab47bc", width=2, dash=(4, 2))
+        scene.item(("area label", 1), "text", (276, 42), layer="areas", anchor="nw", text="Area 1",
+                   fill="#ab47bc", font=(None, 10, "bold"))
 
         link_sets = {
             "Backbone and ABR": [("LAN0", "R1"), ("LAN0", "R2 ABR"), ("LAN0", "R3"), ("R2 ABR", "LAN1"), ("LAN1", "R4"), ("LAN1", "R5"), ("R5", "ASBR")],
@@ -757,7 +1101,7 @@ class RoutingLearnApp(tk.Tk):
             active = start in highlight or end in highlight
             color = "#ffd54f" if active else "#44546a"
             width = 4 if active else 2
-            self._draw_link(canvas, start, end, OSPF_LAB_NODES, color=color, width=width)
+            self._draw_link(scene, ("link", start, end), start, end, OSPF_LAB_NODES, color=color, width=width)
 
         node_fill_defaults = {
             "R1": ("#233044", "#7aa2f7"),
@@ -780,36 +1124,40 @@ class RoutingLearnApp(tk.Tk):
                 fill, outline = "#0f5b78", "#4dd0e1"
             if name not in highlight and name not in {"LAN0", "LAN1", "ASBR"}:
                 outline = "#607d8b"
-            self._draw_node(canvas, x, y, name, fill=fill, outline=outline, radius=21 if "LAN" not in name else 18)
+            self._draw_node(scene, x, y, name, fill=fill, outline=outline, radius=21 if "LAN" not in name else 18)
             if name in roles:
-                canvas.create_text(x, y + 30, text=roles[name], fill="#d7e3ff", font=(None, 8), width=90)
+                scene.item(("role", name), "text", (x, y + 30), layer="labels", text=roles[name],
+                           fill="#d7e3ff", font=(None, 8), width=90)
 
         if scenario_name == "DR election":
-            canvas.create_rectangle(18, 270, 250, 340, fill="#162033", outline="#ffb74d")
-            canvas.create_text(28, 278, anchor="nw", text="Election order", fill="#ffcc80", font=(None, 9, "bold"))
-            canvas.create_text(28, 297, anchor="nw", text="1) Highest priority = DR\n2) Next highest = BDR\n3) Others = DROTHER", fill="#e8f0ff", font=(None, 9))
+            scene.item(("note", "dr"), "rectangle", (18, 270, 250, 340), layer="labels", fill="#162033", outline="#ffb74d")
+            scene.item(("note title", "dr"), "text", (28, 278), layer="labels", anchor="nw", text="Election order",
+                       fill="#ffcc80", font=(None, 9, "bold"))
+            scene.item(("note text", "dr"), "text", (28, 297), layer="labels", anchor="nw",
+                       text="1) Highest priority = DR\n2) Next highest = BDR\n3) Others = DROTHER", fill="#e8f0ff", font=(None, 9))
 
         if scenario_name == "Stub area":
-            canvas.create_rectangle(260, 270, 505, 340, fill="#162033", outline="#81c784")
-            canvas.create_text(270, 278, anchor="nw", text="Stub reminder", fill="#a5d6a7", font=(None, 9, "bold"))
-            canvas.create_text(270, 297, anchor="nw", text="Type 5 LSAs are blocked. The ABR injects a default route instead.", fill="#e8f0ff", font=(None, 9), width=220)
+            scene.item(("note", "stub"), "rectangle", (260, 270, 505, 340), layer="labels", fill="#162033", outline="#81c784")
+            scene.item(("note title", "stub"), "text", (270, 278), layer="labels", anchor="nw", text="Stub reminder",
+                       fill="#a5d6a7", font=(None, 9, "bold"))
+            scene.item(("note text", "stub"), "text", (270, 297), layer="labels", anchor="nw",
+                       text="Type 5 LSAs are blocked. The ABR injects a default route instead.", fill="#e8f0ff", font=(None, 9), width=220)
+        scene.end()
+
+    def _format_score(self, rec):
+        t = rec.get("time", "")
+        s = rec.get("score", 0)
+        d = rec.get("difficulty", "")
+        pct = rec.get("percentage")
+        pct_text = f" ({pct:.0f}%)" if pct is not None else ""
+        return f"{t} | {d} | {s}{pct_text}"
 
     def update_history_view(self):
-        self.history_list.delete(0, tk.END)
-        scores = load_scores()
-        for rec in scores:
-            t = rec.get("time", "")
-            s = rec.get("score", 0)
-            d = rec.get("difficulty", "")
-            pct = rec.get("percentage")
-            pct_text = f" ({pct:.0f}%)" if pct is not None else ""
-            pretty = f"{t} | {d} | {s}{pct_text}"
-            self.history_list.insert(tk.END, pretty)
+        self.history_pager.reset()
 
     def clear_history(self):
         try:
-            if os.path.exists(SCORES_FILE):
-                os.remove(SCORES_FILE)
+            STORE.clear_scores()
         except Exception:
             pass
         self.update_history_view()
@@ -834,17 +1182,16 @@ class RoutingLearnApp(tk.Tk):
     def start_quiz(self):
         diff = self.diff_var.get()
         requested = self.qlen_var.get()
-        pool = QUESTIONS_BY_DIFF.get(diff, [])
-        if not pool:
+        available = BANK.count(diff)
+        if not available:
             messagebox.showwarning("No questions", f"No questions available for {diff}")
             return
-        count = min(requested, len(pool))
-        if count < requested:
+        if available < requested:
             messagebox.showinfo(
                 "Fewer questions available",
-                f"Only {len(pool)} {diff} questions available. Using all of them."
+                f"Only {available} {diff} questions available. Using all of them."
             )
-        self.current_questions = random.sample(pool, count)
+        self.current_questions = BANK.sample(requested, difficulty=diff)
         self.current_index = 0
         self.score = 0
         self.correct_count = 0
@@ -1001,16 +1348,11 @@ class RoutingLearnApp(tk.Tk):
         self.progress_var.set("0/0")
 
     def start_review(self):
-        # load review list and map to actual question objects
-        entries = load_review_list()
-        if not entries:
+        # map saved review IDs to question objects through the bank's ID index
+        if not STORE.review_count():
             messagebox.showinfo("Review list empty", "No questions in the review list. Answer some questions incorrectly to add them.")
             return
-        objs = []
-        for ent in entries:
-            matches = [q for q in QUESTIONS if q.get('difficulty') == ent.get('difficulty') and q.get('question') == ent.get('question')]
-            if matches:
-                objs.append(matches[0])
+        objs = BANK.resolve(STORE.review_ids())
         if not objs:
             messagebox.showinfo("No matches", "No matching questions found for the saved review list.")
             return
@@ -0,0 +1,76 @@
+"""Benchmark RouteTable build time, memory and lookup speed.
+
+    python bench_lpm.py --routes 500000 --lookups 200000 --batch 5000000
+
+Prefixes are random IPv4 networks with an Internet-like length mix
+(mostly /24, then /16-/23); lookups are random addresses. --batch also
+times BatchMatcher (NumPy when installed) on that many destinations.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+try:
+    import resource
+except ImportError:    # Windows
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from route_batch import BatchMatcher, random_destinations
+from route_table import RouteTable
+
+# rough share of each prefix length in a full IPv4 table
+LENGTH_WEIGHTS = {24: 60, 23: 6, 22: 10, 21: 5, 20: 5, 19: 4, 18: 2, 17: 1, 16: 4, 15: 1, 12: 1, 8: 1}
+
+
+def random_routes(count, seed=1):
+    rng = random.Random(seed)
+    lengths = rng.choices(list(LENGTH_WEIGHTS), weights=list(LENGTH_WEIGHTS.values()), k=count)
+    return [(rng.getrandbits(32), plen, rng.choice((20, 110, 200)), rng.randint(0, 1000), f'nh{rng.randint(0, 63)}')
+            for plen in lengths]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Benchmark the Route Lab LPM table.')
+    ap.add_argument('--routes', type=int, default=500000)
+    ap.add_argument('--lookups', type=int, default=200000)
+    ap.add_argument('--batch', type=int, default=0, help='destinations for the batch lookup benchmark')
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args(argv)
+
+    routes = random_routes(args.routes, args.seed)
+    start = time.perf_counter()
+    table = RouteTable()
+    add = table.add_int
+    for network, plen, ad, metric, nh in routes:
+        add(4, network, plen, ad, metric, nh)
+    build = time.perf_counter() - start
+    print(f'built {len(table)} routes ({table.node_count()} trie nodes) in {build:.2f}s')
+
+    rng = random.Random(args.seed + 1)
+    addrs = [rng.getrandbits(32) for _ in range(args.lookups)]
+    lookup = table.lookup_int
+    start = time.perf_counter()
+    hits = sum(1 for a in addrs if lookup(a) >= 0)
+    elapsed = time.perf_counter() - start
+    print(f'{args.lookups} lookups in {elapsed:.2f}s: {elapsed / args.lookups * 1e6:.2f} us/lookup, '
+          f'{hits} matched')
+    if args.batch:
+        addrs = random_destinations(args.batch, seed=args.seed + 2)
+        matcher = BatchMatcher(table)
+        start = time.perf_counter()
+        counts, unmatched = matcher.histogram(addrs)
+        elapsed = time.perf_counter() - start
+        mode = 'NumPy' if matcher.vectorized else 'per-address trie'
+        print(f'batch of {args.batch} ({mode}) in {elapsed:.2f}s: {args.batch / elapsed / 1e6:.2f} M lookups/s, '
+              f'{sum(1 for c in counts if c)} routes hit, {unmatched} unmatched')
+    if resource is not None:
+        print(f'peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
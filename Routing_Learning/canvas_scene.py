@@ -0,0 +1,111 @@
+"""Retained-mode drawing for the lab canvases.
+
+A CanvasScene keeps one canvas item per key (a node, a link, a label)
+instead of deleting and recreating everything on each redraw. A render
+pass is begin(), one item() call per thing that should be visible, then
+end():
+
+    scene.begin()
+    scene.item(('link', 'A', 'B'), 'line', (x1, y1, x2, y2), fill=color, width=2)
+    scene.end()
+
+item() creates the canvas item the first time a key is seen and after
+that only calls coords()/itemconfig() for the options that changed since
+the last pass. Items not drawn in a pass are hidden, not deleted, so
+switching back to them is cheap too; reset() drops everything (for a new
+layout). update() changes a single item between passes when the caller
+already knows what changed. Each item also carries its layer as a tag and end() restacks
+the layers in the order given to the constructor, so an item created late
+(a highlight shown for the first time) still sits in the right layer.
+"""
+
+
+class CanvasScene:
+    """Keyed canvas items on one canvas, updated in place between render passes."""
+
+    def __init__(self, canvas, layers=('main',), tag='scene'):
+        self.canvas = canvas
+        self.tag = tag
+        self.layers = list(layers)
+        self._items = {}        # key -> canvas item id
+        self._options = {}      # key -> options last sent to the canvas (incl. coords)
+        self._seen = set()
+        self._restack = False
+        self.created = 0        # per pass, for tests and timing output
+        self.updated = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def begin(self):
+        self._seen = set()
+        self._restack = False
+        self.created = 0
+        self.updated = 0
+
+    def item(self, key, kind, coords, layer='main', **options):
+        """Draw canvas item kind ('line', 'oval', 'rectangle', 'text') for key; returns its id."""
+        canvas = self.canvas
+        coords = tuple(coords)
+        options['state'] = 'normal'
+        self._seen.add(key)
+        item_id = self._items.get(key)
+        if item_id is None:
+            if layer not in self.layers:
+                self.layers.append(layer)
+            item_id = getattr(canvas, 'create_' + kind)(*coords, tags=(self.tag, f'{self.tag}:{layer}'), **options)
+            self._items[key] = item_id
+            self._options[key] = dict(options, coords=coords)
+            # a new item lands on top of the whole canvas; restack unless that is its layer anyway
+            self._restack = self._restack or layer != self.layers[-1]
+            self.created += 1
+            return item_id
+        self._apply(key, item_id, coords, options)
+        return item_id
+
+    def update(self, key, coords=None, **options):
+        """Change options (and coords) of an item already drawn, outside a full pass.
+
+        For callers that know exactly what changed since the last pass, such
+        as a re-highlight touching a handful of links out of thousands.
+        Returns False when key has no item.
+        """
+        item_id = self._items.get(key)
+        if item_id is None:
+            return False
+        self._apply(key, item_id, None if coords is None else tuple(coords), options)
+        return True
+
+    def _apply(self, key, item_id, coords, options):
+        last = self._options[key]
+        if coords is not None and last['coords'] != coords:
+            self.canvas.coords(item_id, *coords)
+            last['coords'] = coords
+            self.updated += 1
+        changed = {k: v for k, v in options.items() if last.get(k) != v}
+        if changed:
+            self.canvas.itemconfigure(item_id, **changed)
+            last.update(changed)
+            self.updated += 1
+
+    def end(self):
+        """Hide the items that were not drawn since begin()."""
+        for key, item_id in self._items.items():
+            if key not in self._seen and self._options[key]['state'] != 'hidden':
+                self.canvas.itemconfigure(item_id, state='hidden')
+                self._options[key]['state'] = 'hidden'
+                self.updated += 1
+        if self._restack:
+            for layer in self.layers:
+                self.canvas.tag_raise(f'{self.tag}:{layer}')
+            self._restack = False
+
+    def reset(self):
+        """Delete every item of this scene; the next pass creates them again."""
+        self.canvas.delete(self.tag)
+        self._items.clear()
+        self._options.clear()
+        self._seen = set()
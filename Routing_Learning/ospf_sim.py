@@ -0,0 +1,591 @@
+"""OSPF simulation behind the OSPF Lab.
+
+OspfDomain holds a topology (routers, point-to-point links, multi-access
+LANs with DR election, stub prefixes, external routes, stub areas) and
+derives what OSPF would build from it:
+
+* lsdb(area): the Type 1 (router), Type 2 (network), Type 3 (summary),
+  Type 4 (ASBR summary) and Type 5 (external) LSAs visible in an area
+* routing_table(router): intra-area, inter-area (O IA) and external
+  (O E1/E2) routes with costs and equal-cost next hops, following the
+  usual preference order
+* roles(router): internal, backbone, ABR, ASBR
+
+Shortest paths come from SpfTree, a heap-based Dijkstra over one area's
+graph (routers plus a vertex per LAN). Trees are cached per (area, root);
+set_cost() repairs the cached trees incrementally instead of recomputing
+them, touching only the routers whose distance or parents can change.
+
+generate() builds random multi-area domains (thousands of routers are
+fine) for the lab.
+"""
+import heapq
+import ipaddress
+import random
+from collections import namedtuple
+
+BACKBONE = 0
+INFINITY = float('inf')
+STUB_DEFAULT_COST = 1
+
+Lsa = namedtuple('Lsa', 'type area ls_id adv_router detail')
+OspfRoute = namedtuple('OspfRoute', 'prefix kind cost next_hops area')
+
+# route kinds in the order OSPF prefers them for the same prefix
+ROUTE_PREFERENCE = {'O': 0, 'O IA': 1, 'O E1': 2, 'O E2': 3}
+
+
+def lan_vertex(name):
+    """Graph vertex of a LAN (routers are plain strings)."""
+    return ('LAN', name)
+
+
+def is_lan(vertex):
+    return isinstance(vertex, tuple)
+
+
+class SpfTree:
+    """Shortest-path tree from root over a directed graph {u: {v: cost}}.
+
+    dist and parents (every equal-cost predecessor) are kept per vertex.
+    update_edge() applies one changed cost without a full recompute; the
+    number of vertices it had to settle is left in last_touched.
+    """
+
+    def __init__(self, graph, root):
+        self.graph = graph
+        self.root = root
+        self.dist = {}
+        self.parents = {}
+        self._next_hops = {}
+        self.last_touched = 0
+        self.compute()
+
+    def compute(self):
+        self.dist = {self.root: 0}
+        self.parents = {self.root: set()}
+        self.last_touched = self._run([(0, 0, self.root)])
+
+    def _run(self, heap):
+        """Dijkstra from the seeded heap, relaxing against the current dist; returns vertices settled."""
+        graph, dist, parents = self.graph, self.dist, self.parents
+        self._next_hops = {}
+        counter = len(heap)
+        settled = 0
+        heapq.heapify(heap)
+        while heap:
+            d, _, u = heapq.heappop(heap)
+            if d > dist.get(u, INFINITY):
+                continue
+            settled += 1
+            for v, cost in graph.get(u, {}).items():
+                nd = d + cost
+                old = dist.get(v, INFINITY)
+                if nd < old:
+                    dist[v] = nd
+                    parents[v] = {u}
+                    counter += 1
+                    heapq.heappush(heap, (nd, counter, v))
+                elif nd == old and v != self.root:
+                    parents[v].add(u)
+        return settled
+
+    def update_edge(self, u, v, cost):
+        """Set the cost of edge u->v (already changed in graph) and repair the tree."""
+        if u not in self.dist:
+            self.last_touched = 0
+            return
+        du = self.dist[u]
+        old = self.dist.get(v, INFINITY)
+        if du + cost <= old:
+            # cheaper (or equal-cost) path through u: relax outwards from v
+            if du + cost < old:
+                self.dist[v] = du + cost
+                self.parents[v] = {u}
+            else:
+                self.parents[v].add(u)
+            self.last_touched = self._run([(du + cost, 0, v)])
+            return
+        if u not in self.parents.get(v, ()):
+            self.last_touched = 0            # the edge was not on any shortest path
+            return
+        # the edge got more expensive: v and everything below it in the tree is re-derived
+        graph, dist, parents = self.graph, self.dist, self.parents
+        affected = {v}
+        stack = [v]
+        while stack:
+            x = stack.pop()
+            for w in graph.get(x, ()):
+                if w not in affected and x in parents.get(w, ()):
+                    affected.add(w)
+                    stack.append(w)
+        for w in affected:
+            del dist[w]
+            del parents[w]
+        # links are two-way, so a vertex's neighbours are also the ones that can reach it
+        heap = []
+        for w in affected:
+            for x in graph.get(w, ()):
+                dx = dist.get(x)
+                if dx is None or w not in graph.get(x, ()):
+                    continue
+                nd = dx + graph[x][w]
+                if nd < dist.get(w, INFINITY):
+                    dist[w] = nd
+                    parents[w] = {x}
+                    heap.append((nd, len(heap), w))
+                elif nd == dist[w]:
+                    parents[w].add(x)
+        self.last_touched = self._run(heap)
+
+    def next_hops(self, vertex):
+        """First-hop routers on the shortest paths to vertex; () when directly attached."""
+        cached = self._next_hops.get(vertex)
+        if cached is not None:
+            return cached
+        hops = set()
+        for p in self.parents.get(vertex, ()):
+            if p == self.root or (is_lan(p) and self.root in self.parents.get(p, ())):
+                if not is_lan(vertex):
+                    hops.add(vertex)
+            else:
+                hops.update(self.next_hops(p))
+        result = tuple(sorted(hops))
+        self._next_hops[vertex] = result
+        return result
+
+
+class OspfDomain:
+    """One OSPF routing domain; see the module docstring."""
+
+    def __init__(self):
+        self.routers = {}          # name -> {'router_id': int, 'priority': int}
+        self.links = {}            # (a, b) sorted -> {'area', 'cost': {a: cost, b: cost}, 'prefix'}
+        self.lans = {}             # name -> {'area', 'prefix', 'members': {router: cost}}
+        self.stubs = []            # (router, prefix, cost, area)
+        self.externals = []        # (router, prefix, metric, 'E1' | 'E2')
+        self.stub_areas = set()
+        self._graphs = {}
+        self._trees = {}
+        self._areas_of = None
+        self._routes = {}          # derived routes/summaries, dropped on every change
+
+    # --- building ---------------------------------------------------------
+
+    def _changed(self):
+        self._graphs.clear()
+        self._trees.clear()
+        self._areas_of = None
+        self._routes.clear()
+
+    def _cached(self, key, build):
+        value = self._routes.get(key)
+        if value is None:
+            value = self._routes[key] = build()
+        return value
+
+    def add_router(self, name, priority=1, router_id=None):
+        self.routers[name] = {'router_id': router_id if router_id is not None else len(self.routers) + 1,
+                              'priority': priority}
+        self._changed()
+
+    def add_link(self, a, b, cost=1, area=BACKBONE, prefix=None, cost_back=None):
+        """Point-to-point link; cost_back is the b->a cost when it differs."""
+        key = tuple(sorted((a, b)))
+        self.links[key] = {'area': area, 'cost': {a: cost, b: cost if cost_back is None else cost_back},
+                           'prefix': prefix}
+        self._changed()
+
+    def add_lan(self, name, members, area=BACKBONE, prefix=None):
+        """Multi-access segment; members maps router -> interface cost."""
+        self.lans[name] = {'area': area, 'prefix': prefix, 'members': dict(members)}
+        self._changed()
+
+    def add_stub(self, router, prefix, cost=1, area=BACKBONE):
+        self.stubs.append((router, prefix, cost, area))
+        self._changed()
+
+    def add_external(self, router, prefix, metric=20, etype='E2'):
+        self.externals.append((router, prefix, metric, etype))
+        self._changed()
+
+    def set_stub_area(self, area, stub=True):
+        (self.stub_areas.add if stub else self.stub_areas.discard)(area)
+        self._changed()
+
+    # --- structure --------------------------------------------------------
+
+    def areas_of(self, router):
+        if self._areas_of is None:
+            areas = {r: set() for r in self.routers}
+            for (a, b), link in self.links.items():
+                areas[a].add(link['area'])
+                areas[b].add(link['area'])
+            for lan in self.lans.values():
+                for r in lan['members']:
+                    areas[r].add(lan['area'])
+            for r, _, _, area in self.stubs:
+                areas[r].add(area)
+            self._areas_of = areas
+        return self._areas_of.get(router, set())
+
+    def areas(self):
+        found = set()
+        for r in self.routers:
+            found |= self.areas_of(r)
+        return sorted(found)
+
+    def area_routers(self, area):
+        return [r for r in self.routers if area in self.areas_of(r)]
+
+    def is_abr(self, router):
+        areas = self.areas_of(router)
+        return len(areas) > 1 and BACKBONE in areas
+
+    def is_asbr(self, router):
+        return any(r == router for r, _, _, _ in self.externals)
+
+    def roles(self, router):
+        roles = []
+        if self.is_abr(router):
+            roles.append('ABR')
+        elif self.areas_of(router) == {BACKBONE}:
+            roles.append('Backbone')
+        else:
+            roles.append('Internal')
+        if self.is_asbr(router):
+            roles.append('ASBR')
+        return roles
+
+    def abrs(self, area):
+        return self._cached(('abrs', area), lambda: [r for r in self.area_routers(area) if self.is_abr(r)])
+
+    def dr_election(self, lan):
+        """(DR, BDR) on a LAN: highest priority, then highest router id; priority 0 never wins."""
+        members = [r for r in self.lans[lan]['members'] if self.routers[r]['priority'] > 0]
+        members.sort(key=lambda r: (self.routers[r]['priority'], self.routers[r]['router_id']), reverse=True)
+        return (members[0] if members else None, members[1] if len(members) > 1 else None)
+
+    def graph(self, area):
+        """{vertex: {vertex: cost}} for one area, as described by its Type 1 and Type 2 LSAs."""
+        g = self._graphs.get(area)
+        if g is None:
+            g = {r: {} for r in self.area_routers(area)}
+            for (a, b), link in self.links.items():
+                if link['area'] == area:
+                    g[a][b] = link['cost'][a]
+                    g[b][a] = link['cost'][b]
+            for name, lan in self.lans.items():
+                if lan['area'] == area:
+                    v = lan_vertex(name)
+                    g[v] = {r: 0 for r in lan['members']}
+                    for r, cost in lan['members'].items():
+                        g[r][v] = cost
+            self._graphs[area] = g
+        return g
+
+    def spf(self, area, root):
+        """Cached SpfTree for root in area."""
+        key = (area, root)
+        tree = self._trees.get(key)
+        if tree is None:
+            tree = self._trees[key] = SpfTree(self.graph(area), root)
+        return tree
+
+    def set_cost(self, a, b, cost, cost_back=None):
+        """Change a point-to-point link's cost and repair cached SPF trees incrementally.
+
+        Returns (trees repaired, vertices settled in total).
+        """
+        link = self.links[tuple(sorted((a, b)))]
+        link['cost'][a] = cost
+        link['cost'][b] = cost if cost_back is None else cost_back
+        area = link['area']
+        self._routes.clear()
+        g = self._graphs.get(area)
+        touched = repaired = 0
+        if g is None:
+            return 0, 0
+        for u, v in ((a, b), (b, a)):
+            g[u][v] = link['cost'][u]
+            for (tree_area, _), tree in self._trees.items():
+                if tree_area == area:
+                    tree.update_edge(u, v, g[u][v])
+                    touched += tree.last_touched
+                    repaired += 1
+        return repaired, touched
+
+    # --- routes -----------------------------------------------------------
+
+    def _leaves(self, area):
+        """[(vertex, prefix, cost)] for every prefix advertised inside area."""
+        return self._cached(('leaves', area), lambda: list(self._iter_leaves(area)))
+
+    def _iter_leaves(self, area):
+        for (a, b), link in self.links.items():
+            if link['area'] == area and link['prefix']:
+                yield a, link['prefix'], link['cost'][a]
+                yield b, link['prefix'], link['cost'][b]
+        for name, lan in self.lans.items():
+            if lan['area'] == area and lan['prefix']:
+                yield lan_vertex(name), lan['prefix'], 0
+        for r, prefix, cost, stub_area in self.stubs:
+            if stub_area == area:
+                yield r, prefix, cost
+
+    def intra_area(self, router, area):
+        """{prefix: (cost, next hops)} reachable inside area from router."""
+        return self._cached(('intra', router, area), lambda: self._intra_area(router, area))
+
+    def _intra_area(self, router, area):
+        tree = self.spf(area, router)
+        routes = {}
+        for vertex, prefix, cost in self._leaves(area):
+            d = tree.dist.get(vertex)
+            if d is None:
+                continue
+            total = d + cost
+            hops = tree.next_hops(vertex)
+            if vertex == router or (is_lan(vertex) and router in self.graph(area)[vertex]):
+                hops = ()
+            best = routes.get(prefix)
+            if best is None or total < best[0]:
+                routes[prefix] = (total, hops)
+            elif total == best[0]:
+                routes[prefix] = (total, tuple(sorted(set(best[1]) | set(hops))))
+        return routes
+
+    def _summaries_from(self, abr):
+        """Type 3 contents an ABR originates: {into area: {prefix: cost}}."""
+        return self._cached(('summary', abr), lambda: self._build_summaries(abr))
+
+    def _build_summaries(self, abr):
+        areas = self.areas_of(abr)
+        intra = {area: self.intra_area(abr, area) for area in areas}
+        # inter-area routes the ABR learned over the backbone from the other ABRs
+        backbone_learned = {}
+        tree = self.spf(BACKBONE, abr)
+        for other in self.abrs(BACKBONE):
+            if other == abr or other not in tree.dist:
+                continue
+            for other_area in self.areas_of(other) - {BACKBONE}:
+                for prefix, (cost, _) in self.intra_area(other, other_area).items():
+                    total = tree.dist[other] + cost
+                    if total < backbone_learned.get(prefix, INFINITY):
+                        backbone_learned[prefix] = total
+        out = {}
+        for into in areas:
+            summaries = {}
+            for area, routes in intra.items():
+                if area == into:
+                    continue
+                for prefix, (cost, _) in routes.items():
+                    if cost < summaries.get(prefix, INFINITY):
+                        summaries[prefix] = cost
+            if into != BACKBONE:
+                for prefix, cost in backbone_learned.items():
+                    if prefix not in intra.get(into, {}) and cost < summaries.get(prefix, INFINITY):
+                        summaries[prefix] = cost
+            for prefix in intra.get(into, {}):
+                summaries.pop(prefix, None)
+            if into in self.stub_areas:
+                summaries['0.0.0.0/0'] = STUB_DEFAULT_COST
+            out[into] = summaries
+        return out
+
+    def _asbr_summaries_from(self, abr):
+        """Type 4 contents: {into area: {asbr: cost}} for ASBRs in the ABR's other areas."""
+        return self._cached(('asbr', abr), lambda: self._build_asbr_summaries(abr))
+
+    def _build_asbr_summaries(self, abr):
+        asbrs = {r for r, _, _, _ in self.externals}
+        out = {}
+        for into in self.areas_of(abr):
+            if into in self.stub_areas:
+                continue
+            found = {}
+            for area in self.areas_of(abr) - {into}:
+                tree = self.spf(area, abr)
+                for asbr in asbrs:
+                    if asbr in tree.dist and into not in self.areas_of(asbr):
+                        found[asbr] = min(found.get(asbr, INFINITY), tree.dist[asbr])
+            out[into] = found
+        return out
+
+    def routing_table(self, router):
+        """OSPF routes of router, one OspfRoute per prefix, sorted by prefix."""
+        best = {}
+
+        def offer(prefix, kind, cost, hops, area, tie=0):
+            rank = (ROUTE_PREFERENCE[kind], cost, tie)
+            current = best.get(prefix)
+            if current is None or rank < current[0]:
+                best[prefix] = (rank, OspfRoute(prefix, kind, cost, hops, area))
+            elif rank == current[0]:
+                merged = tuple(sorted(set(current[1].next_hops) | set(hops)))
+                best[prefix] = (rank, current[1]._replace(next_hops=merged))
+
+        areas = sorted(self.areas_of(router))
+        for area in areas:
+            for prefix, (cost, hops) in self.intra_area(router, area).items():
+                offer(prefix, 'O', cost, hops, area)
+
+        # an ABR only uses summaries heard over the backbone
+        summary_areas = [BACKBONE] if self.is_abr(router) else areas
+        asbr_cost = {}
+        for area in areas:
+            tree = self.spf(area, router)
+            for asbr in {r for r, _, _, _ in self.externals}:
+                if asbr in tree.dist and tree.dist[asbr] < asbr_cost.get(asbr, (INFINITY,))[0]:
+                    asbr_cost[asbr] = (tree.dist[asbr], tree.next_hops(asbr) if asbr != router else ())
+            for abr in self.abrs(area):
+                if abr == router or abr not in tree.dist:
+                    continue
+                d, hops = tree.dist[abr], tree.next_hops(abr)
+                if area in summary_areas:
+                    for prefix, cost in self._summaries_from(abr).get(area, {}).items():
+                        offer(prefix, 'O IA', d + cost, hops, area)
+                for asbr, cost in self._asbr_summaries_from(abr).get(area, {}).items():
+                    if d + cost < asbr_cost.get(asbr, (INFINITY,))[0]:
+                        asbr_cost[asbr] = (d + cost, hops)
+
+        if not all(area in self.stub_areas for area in areas):
+            for asbr, prefix, metric, etype in self.externals:
+                if asbr not in asbr_cost:
+                    continue
+                forward, hops = asbr_cost[asbr]
+                if etype == 'E1':
+                    offer(prefix, 'O E1', forward + metric, hops, None)
+                else:
+                    offer(prefix, 'O E2', metric, hops, None, tie=forward)
+        return [best[p][1] for p in sorted(best, key=_prefix_key)]
+
+    def lsdb(self, area):
+        """LSAs present in area's database (Type 5 only outside stub areas)."""
+        out = []
+        for r in self.area_routers(area):
+            links = sum(1 for v in self.graph(area)[r])
+            stubs = sum(1 for v, _, _ in self._leaves(area) if v == r)
+            flags = '/'.join(x for x in self.roles(r) if x in ('ABR', 'ASBR'))
+            detail = f'{links} neighbor links, {stubs} stub networks' + (f' ({flags})' if flags else '')
+            out.append(Lsa('Type 1', area, r, r, detail))
+        for name, lan in self.lans.items():
+            if lan['area'] == area:
+                dr, _ = self.dr_election(name)
+                out.append(Lsa('Type 2', area, name, dr, f"{len(lan['members'])} attached routers"))
+        for abr in self.abrs(area):
+            for prefix, cost in sorted(self._summaries_from(abr).get(area, {}).items(), key=lambda i: _prefix_key(i[0])):
+                out.append(Lsa('Type 3', area, prefix, abr, f'cost {cost}'))
+            for asbr, cost in sorted(self._asbr_summaries_from(abr).get(area, {}).items()):
+                out.append(Lsa('Type 4', area, asbr, abr, f'cost {cost}'))
+        if area not in self.stub_areas:
+            for asbr, prefix, metric, etype in self.externals:
+                out.append(Lsa('Type 5', 'External', prefix, asbr, f'{etype} metric {metric}'))
+        return out
+
+
+def _prefix_key(prefix):
+    net = ipaddress.ip_network(prefix, strict=False)
+    return net.version, int(net.network_address), net.prefixlen
+
+
+def generate(routers=60, areas=4, stub_areas=1, externals=4, lans=1, seed=None):
+    """Random connected multi-area domain.
+
+    Area 0 holds the ABRs (two per other area) and a few backbone routers;
+    every area is a random spanning tree plus extra links, with loopbacks,
+    /30 link prefixes and `lans` shared LANs per area. The last
+    `stub_areas` areas are stub areas; ASBRs sit in the others.
+    """
+    rng = random.Random(seed)
+    dom = OspfDomain()
+    link_net = ipaddress.ip_network('172.16.0.0/12').subnets(new_prefix=30)
+    costs = (1, 1, 10, 10, 64, 100)
+    areas = max(1, areas)
+    routers = max(routers, 2 * areas + 2)
+    names = [f'R{i}' for i in range(1, routers + 1)]
+    for i, name in enumerate(names, 1):
+        dom.routers[name] = {'router_id': i, 'priority': rng.choice((0, 1, 1, 1, 50, 100))}
+
+    members = {a: [] for a in range(areas)}
+    abr_pairs = {}
+    pos = 0
+    for a in range(1, areas):
+        abr_pairs[a] = names[pos:pos + 2]
+        members[a].extend(abr_pairs[a])
+        members[BACKBONE].extend(abr_pairs[a])
+        pos += 2
+    rest = names[pos:]
+    backbone_extra = max(2, len(rest) // (areas * 3)) if areas > 1 else len(rest)
+    members[BACKBONE].extend(rest[:backbone_extra])
+    for i, name in enumerate(rest[backbone_extra:]):
+        members[1 + i % (areas - 1) if areas > 1 else BACKBONE].append(name)
+
+    def connect(area, group):
+        order = list(group)
+        rng.shuffle(order)
+        for i in range(1, len(order)):
+            a, b = order[i], order[rng.randrange(i)]
+            dom.add_link(a, b, rng.choice(costs), area, str(next(link_net)))
+        for _ in range(len(order) // 2):
+            a, b = rng.sample(order, 2) if len(order) > 1 else (None, None)
+            if a and tuple(sorted((a, b))) not in dom.links:
+                dom.add_link(a, b, rng.choice(costs), area, str(next(link_net)))
+
+    lan_count = 0
+    for area, group in members.items():
+        connect(area, group)
+        for _ in range(lans if len(group) >= 3 else 0):
+            lan_count += 1
+            attached = rng.sample(group, min(len(group), rng.randint(3, 5)))
+            dom.add_lan(f'LAN{lan_count}', {r: rng.choice((1, 10)) for r in attached}, area,
+                        f'192.168.{lan_count % 256}.0/24')
+    for area, group in members.items():
+        for i, r in enumerate(group):
+            if area == BACKBONE and dom.areas_of(r) - {BACKBONE}:
+                continue        # an ABR's loopback goes in its non-backbone area
+            dom.add_stub(r, f'10.{area}.{i // 256}.{i % 256}/32', 1, area)
+    for area in range(max(1, areas - stub_areas), areas):
+        dom.set_stub_area(area)
+
+    candidates = [r for a in range(1, areas) if a not in dom.stub_areas
+                  for r in members[a] if r not in abr_pairs.get(a, ())] or members[BACKBONE]
+    external_net = ipaddress.ip_network('198.18.0.0/15').subnets(new_prefix=24)
+    for _ in range(externals):
+        dom.add_external(rng.choice(candidates), str(next(external_net)),
+                         rng.choice((20, 20, 50)), rng.choice(('E1', 'E2', 'E2')))
+    dom._changed()
+    return dom
+
+
+def layout(domain, width, height, margin=20, seed=0):
+    """{router or LAN name: (x, y)} placing each area in its own column band.
+
+    Routers in several areas (ABRs) sit on the boundary next to area 0.
+    Also returns {area: (x0, y0, x1, y1)} boxes: (positions, boxes).
+    """
+    rng = random.Random(seed)
+    areas = domain.areas()
+    band = (width - 2 * margin) / max(1, len(areas))
+    boxes = {}
+    for i, area in enumerate(areas):
+        x0 = margin + i * band
+        boxes[area] = (x0 + 3, margin + 18, x0 + band - 3, height - margin)
+    pos = {}
+    for r in domain.routers:
+        areas_r = sorted(domain.areas_of(r))
+        if not areas_r:
+            continue
+        home = next((a for a in areas_r if a != BACKBONE), areas_r[0])
+        x0, y0, x1, y1 = boxes[home]
+        if len(areas_r) > 1:
+            # ABRs on the edge of their area box that faces area 0
+            x = x0 + 8 if boxes[home][0] > boxes[BACKBONE][0] else x1 - 8
+        else:
+            x = rng.uniform(x0 + 12, x1 - 12)
+        pos[r] = (x, rng.uniform(y0 + 14, y1 - 12))
+    for name, lan in domain.lans.items():
+        pts = [pos[r] for r in lan['members'] if r in pos]
+        if pts:
+            pos[lan_vertex(name)] = (sum(p[0] for p in pts) / len(pts), sum(p[1] for p in pts) / len(pts))
+    return pos, boxes
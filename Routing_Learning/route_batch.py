@@ -0,0 +1,149 @@
+"""Bulk IPv4 destination lookups for the Route Lab batch mode.
+
+BatchMatcher resolves large arrays of destinations against a RouteTable
+and counts hits per route. With NumPy installed (pip install numpy) the
+table's prefixes are grouped by prefix length into sorted uint32 arrays
+and every group is matched against all still-unresolved destinations at
+once (mask, then binary search), longest length first. Destinations are
+sorted first: masking keeps them sorted, which makes each binary search
+pass walk the prefix array in order. Without NumPy it falls back to one
+trie lookup per destination.
+
+Destinations are kept as array('I') of integer addresses; read them with
+load_destinations() or make some with random_destinations().
+"""
+import random
+import socket
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+CHUNK = 1 << 22
+
+
+def parse_destination(text):
+    """Integer IPv4 address from the first comma/space separated field of text, or None."""
+    field = text.replace(',', ' ').split(None, 1)
+    if not field:
+        return None
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, field[0]), 'big')
+    except OSError:
+        return None
+
+
+def load_destinations(path):
+    """(addresses, skipped) from a text file with one IPv4 address per line.
+
+    Lines that are blank, comments (#) or not IPv4 addresses are counted in
+    skipped. The file is read line by line.
+    """
+    out = array('I')
+    skipped = 0
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if line.startswith('#'):
+                continue
+            addr = parse_destination(line)
+            if addr is None:
+                skipped += bool(line.strip())
+            else:
+                out.append(addr)
+    return out, skipped
+
+
+def random_destinations(count, seed=None, table=None, share_routed=0.9):
+    """count random IPv4 addresses; with table, share_routed of them fall inside its prefixes."""
+    rng = random.Random(seed)
+    prefixes = table.best_routes(4) if table is not None else []
+    out = array('I')
+    for _ in range(count):
+        if prefixes and rng.random() < share_routed:
+            network, plen, _ = rng.choice(prefixes)
+            host_bits = 32 - plen
+            out.append(network | (rng.getrandbits(host_bits) if host_bits else 0))
+        else:
+            out.append(rng.getrandbits(32))
+    return out
+
+
+class BatchMatcher:
+    """LPM for many IPv4 destinations at once against table.
+
+    The per-length prefix groups are rebuilt when the table grows.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self._size = None
+        self._groups = None
+
+    @property
+    def vectorized(self):
+        return np is not None
+
+    def _prefix_groups(self):
+        if self._size != len(self.table):
+            by_len = {}
+            for network, plen, rid in self.table.best_routes(4):
+                by_len.setdefault(plen, []).append((network, rid))
+            groups = []
+            for plen in sorted(by_len, reverse=True):
+                pairs = sorted(by_len[plen])
+                mask = ((1 << plen) - 1) << (32 - plen) if plen else 0
+                groups.append((np.uint32(mask),
+                               np.fromiter((p[0] for p in pairs), dtype=np.uint32, count=len(pairs)),
+                               np.fromiter((p[1] for p in pairs), dtype=np.int32, count=len(pairs))))
+            self._groups = groups
+            self._size = len(self.table)
+        return self._groups
+
+    def _lookup_chunk(self, addrs):
+        order = np.argsort(addrs)
+        addrs = addrs[order]
+        result = np.full(len(addrs), -1, dtype=np.int32)
+        pending = np.arange(len(addrs))
+        for mask, keys, rids in self._prefix_groups():
+            if not len(pending):
+                break
+            masked = addrs[pending] & mask
+            idx = np.searchsorted(keys, masked)
+            idx[idx == len(keys)] = 0
+            hit = keys[idx] == masked
+            result[pending[hit]] = rids[idx[hit]]
+            pending = pending[~hit]
+        out = np.empty_like(result)
+        out[order] = result
+        return out
+
+    def lookup(self, addrs):
+        """Winning route id per destination (-1 when none matches).
+
+        Returns a NumPy int32 array when NumPy is available, otherwise array('i').
+        """
+        if np is None:
+            lookup = self.table.lookup_int
+            return array('i', (lookup(a) for a in addrs))
+        addrs = np.asarray(addrs, dtype=np.uint32)
+        if len(addrs) <= CHUNK:
+            return self._lookup_chunk(addrs)
+        return np.concatenate([self._lookup_chunk(addrs[i:i + CHUNK]) for i in range(0, len(addrs), CHUNK)])
+
+    def histogram(self, addrs):
+        """(hits per route id as a list, number of unmatched destinations)."""
+        rids = self.lookup(addrs)
+        if np is None:
+            counts = [0] * len(self.table)
+            unmatched = 0
+            for rid in rids:
+                if rid < 0:
+                    unmatched += 1
+                else:
+                    counts[rid] += 1
+            return counts, unmatched
+        matched = rids[rids >= 0]
+        counts = np.bincount(matched, minlength=len(self.table))
+        return counts.tolist(), int(len(rids) - len(matched))
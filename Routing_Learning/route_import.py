@@ -0,0 +1,282 @@
+"""Load real routing tables into a RouteTable for the Route Lab.
+
+Three formats are read as streams, one line or record at a time, so the
+raw text is never held in memory:
+
+* Cisco ``show ip route`` / ``show ipv6 route`` output, including
+  "is subnetted" headers, routes whose next hop is on the following line
+  and extra equal-cost next hops
+* CSV with a header row: ``prefix`` plus optional ``ad``, ``metric``,
+  ``next_hop`` and ``protocol`` columns
+* MRT TABLE_DUMP_V2 RIB dumps (RFC 6396), plain or .gz/.bz2, as published
+  by RouteViews and RIPE RIS. Each prefix keeps the entry with the
+  shortest AS path, as a BGP speaker without local policy would.
+
+load_routes() picks the parser from the file name and content.
+"""
+import bz2
+import csv
+import gzip
+import io
+import ipaddress
+import re
+import struct
+
+from route_table import MAX_AD, MAX_METRIC, RouteTable
+
+# administrative distance when the output does not show one (connected/local routes)
+CISCO_PROTOCOLS = {
+    'C': ('Connected', 0), 'L': ('Local', 0), 'S': ('Static', 1), 'R': ('RIP', 120),
+    'O': ('OSPF', 110), 'D': ('EIGRP', 90), 'B': ('BGP', 20), 'i': ('IS-IS', 115),
+    'M': ('Mobile', 0), 'E': ('EGP', 140), 'U': ('Per-user static', 1), 'o': ('ODR', 160),
+    'P': ('Periodic download', 0), 'H': ('NHRP', 250), 'l': ('LISP', 10), 'a': ('Application', 0),
+}
+
+# "C", "S*", "O IA", "O*E2", "D EX", "OI" (IPv6), ...
+_ENTRY_RE = re.compile(
+    r'^(?P<code>[A-Za-z]{1,2}\*?(?: ?[A-Za-z][A-Za-z0-9]?\*?)?)\s+'
+    r'(?P<prefix>[0-9A-Fa-f:.]+(?:/\d{1,3})?)(?P<rest>.*)$')
+_SUBNETTED_RE = re.compile(r'^\s+(?P<prefix>[0-9.]+/\d{1,2}) is (?:variably )?subnetted')
+_ADMIN_RE = re.compile(r'\[(\d+)/(\d+)\]')
+_VIA_RE = re.compile(r'\bvia ([0-9A-Fa-f:.]+)')
+_CONNECTED_RE = re.compile(r'directly connected, (\S+)|via (\S+), directly connected')
+
+
+def _cisco_route(code, prefix, subnet_len):
+    protocol, ad = CISCO_PROTOCOLS.get(code[0], (code, 0))
+    detail = code[1:].replace('*', '').strip()
+    if detail and code[0] in CISCO_PROTOCOLS:
+        protocol += ' ' + detail
+    if '/' not in prefix and ':' not in prefix and subnet_len is not None:
+        prefix = f'{prefix}/{subnet_len}'
+    net = ipaddress.ip_network(prefix, strict=False)
+    return [net.version, int(net.network_address), net.prefixlen, ad, 0, '', protocol]
+
+
+def _apply_details(route, text):
+    m = _ADMIN_RE.search(text)
+    if m:
+        route[3], route[4] = int(m.group(1)), int(m.group(2))
+    m = _CONNECTED_RE.search(text)
+    if m:
+        route[5] = m.group(1) or m.group(2)
+        return True
+    m = _VIA_RE.search(text)
+    if m:
+        route[5] = m.group(1)
+        return True
+    return False
+
+
+def parse_show_ip_route(lines):
+    """Yield (version, network, prefixlen, ad, metric, next_hop, protocol) from show ip route output.
+
+    Equal-cost paths yield one tuple per next hop. Unrecognised lines (codes
+    legend, gateway of last resort, prompts) are ignored.
+    """
+    route = None          # the entry being read; emitted once its next hop is known
+    emitted = False
+    subnet_len = None     # mask from the last classful "is subnetted" header
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        if line[0].isspace():
+            m = _SUBNETTED_RE.match(line)
+            if m:
+                subnet_len = int(m.group('prefix').split('/')[1])
+                continue
+            if route is not None and ('via' in line or '[' in line or 'directly connected' in line):
+                # the entry's next hop on a wrapped line, or another equal-cost path
+                if _apply_details(route, line):
+                    emitted = True
+                    yield tuple(route)
+            continue
+        if route is not None and not emitted:
+            yield tuple(route)
+        route = None
+        m = _ENTRY_RE.match(line)
+        if not m:
+            continue
+        try:
+            route = _cisco_route(m.group('code'), m.group('prefix'), subnet_len)
+        except ValueError:
+            continue
+        emitted = _apply_details(route, m.group('rest'))
+        if emitted:
+            yield tuple(route)
+    if route is not None and not emitted:
+        yield tuple(route)
+
+
+def parse_csv(lines):
+    """Yield route tuples from CSV rows with a prefix column; bad rows (unparsable prefix,
+    non-numeric or negative AD/metric) are skipped and values above the field sizes clamped."""
+    for row in csv.DictReader(lines):
+        row = {(k or '').strip().lower(): (v or '').strip() for k, v in row.items()}
+        try:
+            net = ipaddress.ip_network(row.get('prefix', ''), strict=False)
+            ad = int(row.get('ad') or 0)
+            metric = int(row.get('metric') or 0)
+        except ValueError:
+            continue
+        if ad < 0 or metric < 0:
+            continue
+        ad, metric = min(ad, MAX_AD), min(metric, MAX_METRIC)
+        yield (net.version, int(net.network_address), net.prefixlen, ad, metric,
+               row.get('next_hop', ''), row.get('protocol', ''))
+
+
+# --- MRT TABLE_DUMP_V2 -------------------------------------------------------
+
+MRT_TABLE_DUMP_V2 = 13
+PEER_INDEX_TABLE = 1
+RIB_SUBTYPES = {2: (4, False), 4: (6, False), 8: (4, True), 10: (6, True)}   # subtype -> (version, add-path)
+ATTR_NEXT_HOP, ATTR_AS_PATH, ATTR_MED, ATTR_MP_REACH = 3, 2, 4, 14
+BGP_AD = 20
+
+_HEADER = struct.Struct('!IHHI')
+
+
+def _read_records(f):
+    while True:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        _, mrt_type, subtype, length = _HEADER.unpack(header)
+        body = f.read(length)
+        if len(body) < length:
+            return
+        yield mrt_type, subtype, body
+
+
+def _peer_table(body):
+    name_len = struct.unpack_from('!H', body, 4)[0]
+    pos = 6 + name_len
+    count = struct.unpack_from('!H', body, pos)[0]
+    pos += 2
+    peers = []
+    for _ in range(count):
+        kind = body[pos]
+        pos += 5                                  # type + BGP id
+        size = 16 if kind & 1 else 4
+        peers.append(str(ipaddress.ip_address(body[pos:pos + size])))
+        pos += size + (4 if kind & 2 else 2)
+    return peers
+
+
+def _attributes(data):
+    """(AS path length, MED, next hop bytes or None) from BGP path attributes."""
+    hops, med, next_hop = 0, 0, None
+    pos = 0
+    while pos + 3 <= len(data):
+        flags, kind = data[pos], data[pos + 1]
+        if flags & 0x10:
+            size = struct.unpack_from('!H', data, pos + 2)[0]
+            pos += 4
+        else:
+            size = data[pos + 2]
+            pos += 3
+        value = data[pos:pos + size]
+        pos += size
+        if kind == ATTR_AS_PATH:
+            i = 0
+            while i + 2 <= len(value):
+                seg_type, count = value[i], value[i + 1]
+                hops += count if seg_type == 2 else 1        # an AS_SET counts as one hop
+                i += 2 + 4 * count
+        elif kind == ATTR_MED and size == 4:
+            med = struct.unpack('!I', value)[0]
+        elif kind == ATTR_NEXT_HOP and size == 4:
+            next_hop = value
+        elif kind == ATTR_MP_REACH and value:
+            # RFC 6396 keeps only length + next hop; some writers include AFI/SAFI too
+            if 1 + value[0] <= len(value) and value[0] in (4, 16, 32):
+                next_hop = value[1:1 + min(value[0], 16)]
+            elif len(value) > 4:
+                next_hop = value[4:4 + min(value[3], 16)]
+    return hops, med, next_hop
+
+
+def parse_mrt(f):
+    """Yield route tuples, one per prefix, from a binary TABLE_DUMP_V2 stream."""
+    peers = []
+    for mrt_type, subtype, body in _read_records(f):
+        if mrt_type != MRT_TABLE_DUMP_V2:
+            continue
+        if subtype == PEER_INDEX_TABLE:
+            peers = _peer_table(body)
+            continue
+        if subtype not in RIB_SUBTYPES:
+            continue
+        version, add_path = RIB_SUBTYPES[subtype]
+        plen = body[4]
+        size = (plen + 7) // 8
+        width = 32 if version == 4 else 128
+        network = int.from_bytes(body[5:5 + size].ljust(width // 8, b'\0'), 'big')
+        pos = 5 + size
+        count = struct.unpack_from('!H', body, pos)[0]
+        pos += 2
+        best = None
+        for _ in range(count):
+            peer = struct.unpack_from('!H', body, pos)[0]
+            pos += 6 + (4 if add_path else 0)
+            attr_len = struct.unpack_from('!H', body, pos)[0]
+            pos += 2
+            hops, med, next_hop = _attributes(body[pos:pos + attr_len])
+            pos += attr_len
+            if best is None or hops < best[0]:
+                best = (hops, med, next_hop, peer)
+        if best is None:
+            continue
+        hops, med, next_hop, peer = best
+        if next_hop:
+            hop = str(ipaddress.ip_address(next_hop))
+        else:
+            hop = peers[peer] if peer < len(peers) else ''
+        yield (version, network, plen, BGP_AD, med, hop, 'BGP')
+
+
+# --- entry point ---------------------------------------------------------------
+
+def _open_binary(path):
+    lower = path.lower()
+    if lower.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if lower.endswith('.bz2'):
+        return bz2.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def detect_format(path):
+    """'mrt', 'csv' or 'cisco', from the extension and first bytes of path."""
+    lower = path.lower()
+    if lower.endswith('.csv'):
+        return 'csv'
+    with _open_binary(path) as f:
+        head = f.read(_HEADER.size)
+    if len(head) == _HEADER.size and _HEADER.unpack(head)[1] == MRT_TABLE_DUMP_V2:
+        return 'mrt'
+    return 'cisco'
+
+
+def load_routes(path, table=None, fmt=None):
+    """Add the routes in path to table (a new RouteTable by default).
+
+    Returns (table, number of routes added). fmt forces 'mrt', 'csv' or
+    'cisco' instead of detecting it.
+    """
+    table = table if table is not None else RouteTable()
+    fmt = fmt or detect_format(path)
+    add = table.add_int
+    before = len(table)
+    if fmt == 'mrt':
+        with _open_binary(path) as f:
+            for route in parse_mrt(f):
+                add(*route)
+    else:
+        parse = parse_csv if fmt == 'csv' else parse_show_ip_route
+        with io.TextIOWrapper(_open_binary(path), encoding='utf-8', errors='replace', newline='') as f:
+            for route in parse(f):
+                add(*route)
+    return table, len(table) - before
@@ -0,0 +1,321 @@
+"""Routing table with longest-prefix-match lookups for the Route Lab.
+
+RouteTable keeps one path-compressed binary trie (Patricia tree) per
+address family. Trie nodes and routes (RouteStore) live in flat arrays
+indexed by integer ids instead of one Python object each, so tables with hundreds of
+thousands of prefixes stay small and a lookup is a short loop of integer
+compares. Lookups begin at a 2**16-entry jump table (built lazily after
+changes) that skips the top of the tree.
+
+When several routes share a prefix, the one with the lower administrative
+distance wins, then the lower metric, then the one added first.
+
+    table = RouteTable()
+    table.add('10.0.0.0/8', ad=20, metric=100, next_hop='ISP')
+    rid = table.lookup('10.1.2.3')
+    table.route(rid)['prefix']          # '10.0.0.0/8'
+"""
+import ipaddress
+from array import array
+
+# lookups start from a table indexed by the top JUMP_BITS address bits instead of the root
+JUMP_BITS = 16
+# largest AD and metric a RouteStore holds; larger values are clamped, negative ones become 0
+MAX_AD = 255
+MAX_METRIC = 0xFFFFFFFF
+
+
+class _Trie:
+    """Patricia tree over width-bit keys; node 0 is the /0 root."""
+
+    def __init__(self, width):
+        self.width = width
+        # IPv4 keys fit an unsigned 32-bit array; IPv6 keys need Python ints
+        self.key = array('I', [0]) if width == 32 else [0]
+        self.plen = array('B', [0])
+        self.child0 = array('i', [-1])
+        self.child1 = array('i', [-1])
+        self.route = array('i', [-1])
+        self._jump = None
+        self._jump_best = None
+
+    def __len__(self):
+        return len(self.plen)
+
+    def _new(self, key, plen):
+        self.key.append(key)
+        self.plen.append(plen)
+        self.child0.append(-1)
+        self.child1.append(-1)
+        self.route.append(-1)
+        return len(self.plen) - 1
+
+    def _set_child(self, node, bit, child):
+        (self.child1 if bit else self.child0)[node] = child
+
+    def insert(self, key, plen):
+        """Node for key/plen, created (and the tree split) if needed."""
+        self._jump = None
+        w = self.width
+        K, P, C0, C1 = self.key, self.plen, self.child0, self.child1
+        n = 0
+        while True:
+            p = P[n]
+            if p == plen:
+                return n
+            bit = (key >> (w - 1 - p)) & 1
+            c = C1[n] if bit else C0[n]
+            if c < 0:
+                leaf = self._new(key, plen)
+                self._set_child(n, bit, leaf)
+                return leaf
+            pc = P[c]
+            diff = key ^ K[c]
+            common = min(w - diff.bit_length(), plen, pc)
+            if common == pc:
+                n = c
+                continue
+            # key and the child's prefix diverge (or key ends) above the child: split
+            mid_key = (key >> (w - common)) << (w - common) if common else 0
+            mid = self._new(mid_key, common)
+            self._set_child(n, bit, mid)
+            self._set_child(mid, (K[c] >> (w - 1 - common)) & 1, c)
+            if common == plen:
+                return mid
+            leaf = self._new(key, plen)
+            self._set_child(mid, (key >> (w - 1 - common)) & 1, leaf)
+            return leaf
+
+    def _build_jump(self):
+        """For each JUMP_BITS-bit address prefix: the deepest node of at most that length
+        containing it, and the best route found on the way there."""
+        shift = self.width - JUMP_BITS
+        jump = array('i', [0]) * (1 << JUMP_BITS)
+        best = array('i', [self.route[0]]) * (1 << JUMP_BITS)
+        stack = [(0, self.route[0])]
+        while stack:
+            n, b = stack.pop()
+            if self.route[n] >= 0:
+                b = self.route[n]
+            p = self.plen[n]
+            lo = self.key[n] >> shift
+            hi = lo + (1 << (JUMP_BITS - p))
+            jump[lo:hi] = array('i', [n]) * (hi - lo)
+            best[lo:hi] = array('i', [b]) * (hi - lo)
+            for c in (self.child0[n], self.child1[n]):
+                if c >= 0 and self.plen[c] <= JUMP_BITS:
+                    stack.append((c, b))
+        self._jump, self._jump_best = jump, best
+        return jump
+
+    def lookup(self, addr):
+        """Best route id of the longest prefix containing addr, or -1."""
+        w = self.width
+        K, P, C0, C1, R = self.key, self.plen, self.child0, self.child1, self.route
+        jump = self._jump
+        if jump is None:
+            jump = self._build_jump()
+        slot = addr >> (w - JUMP_BITS)
+        n = jump[slot]
+        best = self._jump_best[slot]
+        p = P[n]
+        while p < w:
+            c = C1[n] if (addr >> (w - 1 - p)) & 1 else C0[n]
+            if c < 0:
+                break
+            pc = P[c]
+            if (addr ^ K[c]) >> (w - pc):
+                break
+            if R[c] >= 0:
+                best = R[c]
+            n = c
+            p = pc
+        return best
+
+    def path(self, addr):
+        """Nodes holding routes whose prefix contains addr, shortest prefix first."""
+        w = self.width
+        K, P, C0, C1, R = self.key, self.plen, self.child0, self.child1, self.route
+        found = [0] if R[0] >= 0 else []
+        n = 0
+        p = 0
+        while p < w:
+            c = C1[n] if (addr >> (w - 1 - p)) & 1 else C0[n]
+            if c < 0:
+                break
+            pc = P[c]
+            if (addr ^ K[c]) >> (w - pc):
+                break
+            if R[c] >= 0:
+                found.append(c)
+            n = c
+            p = pc
+        return found
+
+
+class RouteStore:
+    """Routes as parallel arrays: version, network, prefix length, AD, metric,
+    next-hop id and protocol id (about 31 bytes a route).
+
+    Networks are split into two 64-bit halves so IPv6 fits; next hops and
+    protocol names are stored once and referenced by id.
+    """
+
+    def __init__(self):
+        self.version = array('B')
+        self.network_hi = array('Q')
+        self.network_lo = array('Q')
+        self.prefixlen = array('B')
+        self.ad = array('B')
+        self.metric = array('I')
+        self.next_hop_id = array('I')
+        self.protocol_id = array('I')
+        self.next_hops = []
+        self.protocols = []
+        self._next_hop_ids = {}
+        self._protocol_ids = {}
+
+    def __len__(self):
+        return len(self.prefixlen)
+
+    @staticmethod
+    def _intern(names, ids, value):
+        i = ids.get(value)
+        if i is None:
+            i = ids[value] = len(names)
+            names.append(value)
+        return i
+
+    def append(self, version, network, prefixlen, ad, metric, next_hop, protocol):
+        self.version.append(version)
+        self.network_hi.append(network >> 64)
+        self.network_lo.append(network & 0xFFFFFFFFFFFFFFFF)
+        self.prefixlen.append(prefixlen)
+        self.ad.append(max(0, min(ad, MAX_AD)))
+        self.metric.append(max(0, min(metric, MAX_METRIC)))
+        self.next_hop_id.append(self._intern(self.next_hops, self._next_hop_ids, next_hop))
+        self.protocol_id.append(self._intern(self.protocols, self._protocol_ids, protocol))
+        return len(self.prefixlen) - 1
+
+    def network(self, rid):
+        return self.network_hi[rid] << 64 | self.network_lo[rid]
+
+    def next_hop(self, rid):
+        return self.next_hops[self.next_hop_id[rid]]
+
+    def protocol(self, rid):
+        return self.protocols[self.protocol_id[rid]]
+
+
+class RouteTable:
+    """Routes (prefix, AD, metric, next hop, protocol, optional data) with LPM lookups.
+
+    Routes get integer ids in insertion order and are kept in a RouteStore
+    (self.routes); lookup() and matches() return ids and route() turns one
+    back into a dict.
+    """
+
+    def __init__(self):
+        self._tries = {4: _Trie(32), 6: _Trie(128)}
+        self.routes = RouteStore()
+        self._data = {}
+        # trie node -> every route id for that prefix, only for prefixes with more than one
+        self._ties = {4: {}, 6: {}}
+
+    def __len__(self):
+        return len(self.routes)
+
+    @classmethod
+    def from_routes(cls, routes):
+        """Table of route dicts with prefix/ad/metric/next_hop/protocol keys; each dict is kept as the route's data."""
+        table = cls()
+        for r in routes:
+            table.add(r['prefix'], r.get('ad', 0), r.get('metric', 0), r.get('next_hop', ''),
+                      r.get('protocol', ''), data=r)
+        return table
+
+    def _rank(self, rid):
+        return self.routes.ad[rid], self.routes.metric[rid], rid
+
+    def add(self, prefix, ad=0, metric=0, next_hop='', protocol='', data=None):
+        """Add a route for prefix (string or ip_network, host bits ignored); returns its id."""
+        net = prefix if isinstance(prefix, (ipaddress.IPv4Network, ipaddress.IPv6Network)) \
+            else ipaddress.ip_network(prefix, strict=False)
+        rid = self.add_int(net.version, int(net.network_address), net.prefixlen, ad, metric, next_hop, protocol)
+        if data is not None:
+            self._data[rid] = data
+        return rid
+
+    def add_int(self, version, network, prefixlen, ad=0, metric=0, next_hop='', protocol=''):
+        """add() for a network already given as an integer; used by bulk loaders."""
+        trie = self._tries[version]
+        w = trie.width
+        network = (network >> (w - prefixlen)) << (w - prefixlen) if prefixlen else 0
+        rid = self.routes.append(version, network, prefixlen, ad, metric, next_hop, protocol)
+
+        node = trie.insert(network, prefixlen)
+        current = trie.route[node]
+        if current < 0:
+            trie.route[node] = rid
+            return rid
+        ties = self._ties[version]
+        group = ties.setdefault(node, [current])
+        group.append(rid)
+        group.sort(key=self._rank)
+        trie.route[node] = group[0]
+        return rid
+
+    @staticmethod
+    def _address(address):
+        if isinstance(address, str):
+            address = ipaddress.ip_address(address)
+        return address.version, int(address)
+
+    def lookup(self, address):
+        """Id of the route a packet to address (string or ip_address) uses, or None."""
+        version, addr = self._address(address)
+        rid = self._tries[version].lookup(addr)
+        return rid if rid >= 0 else None
+
+    def lookup_int(self, addr, version=4):
+        """lookup() for an address given as an integer; returns -1 when nothing matches."""
+        return self._tries[version].lookup(addr)
+
+    def matches(self, address):
+        """Ids of every route containing address, best first: longest prefix, then AD, then metric."""
+        version, addr = self._address(address)
+        ties = self._ties[version]
+        trie = self._tries[version]
+        out = []
+        for node in reversed(trie.path(addr)):
+            out.extend(ties.get(node, (trie.route[node],)))
+        return out
+
+    def prefix(self, rid):
+        cls = ipaddress.IPv4Network if self.routes.version[rid] == 4 else ipaddress.IPv6Network
+        return cls((self.routes.network(rid), self.routes.prefixlen[rid]))
+
+    def route(self, rid):
+        """Route rid as a dict: its data (if any) plus prefix, network, prefixlen, ad, metric,
+        next_hop and protocol."""
+        net = self.prefix(rid)
+        routes = self.routes
+        item = dict(self._data.get(rid, ()))
+        item.update({
+            'prefix': item.get('prefix', str(net)),
+            'network': net,
+            'prefixlen': net.prefixlen,
+            'ad': routes.ad[rid],
+            'metric': routes.metric[rid],
+            'next_hop': routes.next_hop(rid),
+            'protocol': item.get('protocol') or routes.protocol(rid),
+        })
+        return item
+
+    def best_routes(self, version=4):
+        """(network, prefixlen, winning route id) for every distinct prefix of one family."""
+        trie = self._tries[version]
+        return [(trie.key[n], trie.plen[n], rid) for n, rid in enumerate(trie.route) if rid >= 0]
+
+    def node_count(self):
+        return sum(len(t) for t in self._tries.values())
@@ -0,0 +1,121 @@
+"""Unit tests for canvas_scene (run with pytest; no display needed)."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from canvas_scene import CanvasScene
+
+
+class RecordingCanvas:
+    """The part of the tk.Canvas API CanvasScene uses, recording every call."""
+
+    def __init__(self):
+        self.items = {}
+        self.calls = []
+        self.stack = []
+
+    def _create(self, kind, coords, tags, options):
+        item_id = len(self.items) + 1
+        self.items[item_id] = dict(options, kind=kind, coords=coords, tags=tags)
+        self.stack.append(item_id)
+        self.calls.append(('create', item_id))
+        return item_id
+
+    def __getattr__(self, name):
+        if name.startswith('create_'):
+            return lambda *coords, tags=(), **options: self._create(name[7:], coords, tags, options)
+        raise AttributeError(name)
+
+    def coords(self, item_id, *coords):
+        self.items[item_id]['coords'] = coords
+        self.calls.append(('coords', item_id))
+
+    def itemconfigure(self, item_id, **options):
+        self.items[item_id].update(options)
+        self.calls.append(('config', item_id, tuple(sorted(options))))
+
+    def tag_raise(self, tag):
+        tagged = [i for i in self.stack if tag in self.items[i]['tags']]
+        self.stack = [i for i in self.stack if i not in tagged] + tagged
+
+    def delete(self, tag):
+        for item_id in [i for i, item in self.items.items() if tag in item['tags']]:
+            del self.items[item_id]
+            self.stack.remove(item_id)
+
+
+def draw(scene, active):
+    scene.begin()
+    scene.item('bg', 'rectangle', (0, 0, 10, 10), layer='background', fill='black')
+    for i in range(3):
+        scene.item(('link', i), 'line', (0, i, 10, i), layer='links',
+                   fill='yellow' if i == active else 'grey', width=2 if i == active else 1)
+    if active == 2:
+        scene.item('note', 'text', (1, 1), layer='links', text='two')
+    scene.end()
+
+
+def test_items_are_created_once_and_only_changes_are_sent():
+    canvas = RecordingCanvas()
+    scene = CanvasScene(canvas, layers=('background', 'links'))
+    draw(scene, 0)
+    assert scene.created == 4 and len(canvas.items) == 4
+    canvas.calls.clear()
+
+    draw(scene, 0)
+    assert canvas.calls == [] and scene.updated == 0
+
+    draw(scene, 1)
+    assert scene.created == 0
+    assert sorted(c[1] for c in canvas.calls) == [scene._items[('link', 0)], scene._items[('link', 1)]]
+    assert all(c[2] == ('fill', 'width') for c in canvas.calls)
+    assert canvas.items[scene._items[('link', 1)]]['fill'] == 'yellow'
+
+
+def test_undrawn_items_are_hidden_then_shown_again():
+    canvas = RecordingCanvas()
+    scene = CanvasScene(canvas, layers=('background', 'links'))
+    draw(scene, 2)
+    note = scene._items['note']
+    draw(scene, 0)
+    assert canvas.items[note]['state'] == 'hidden'
+    draw(scene, 2)
+    assert canvas.items[note]['state'] == 'normal'
+    assert len(canvas.items) == 5
+
+
+def test_late_items_are_restacked_into_their_layer():
+    canvas = RecordingCanvas()
+    scene = CanvasScene(canvas, layers=('background', 'links', 'labels'))
+    scene.begin()
+    scene.item('label', 'text', (1, 1), layer='labels', text='top')
+    scene.item('bg', 'rectangle', (0, 0, 10, 10), layer='background')
+    scene.end()
+    scene.begin()
+    scene.item('label', 'text', (1, 1), layer='labels', text='top')
+    scene.item('bg', 'rectangle', (0, 0, 10, 10), layer='background')
+    scene.item('link', 'line', (0, 0, 5, 5), layer='links')
+    scene.end()
+    order = [canvas.items[i]['kind'] for i in canvas.stack]
+    assert order == ['rectangle', 'line', 'text']
+
+
+def test_coords_change_and_reset():
+    canvas = RecordingCanvas()
+    scene = CanvasScene(canvas)
+    scene.begin()
+    item_id = scene.item('dot', 'oval', (0, 0, 4, 4), fill='red')
+    scene.end()
+    scene.begin()
+    scene.item('dot', 'oval', (2, 2, 6, 6), fill='red')
+    scene.end()
+    assert canvas.items[item_id]['coords'] == (2, 2, 6, 6)
+    assert scene.updated == 1
+
+    scene.reset()
+    assert not canvas.items and len(scene) == 0
+    scene.begin()
+    scene.item('dot', 'oval', (2, 2, 6, 6), fill='red')
+    scene.end()
+    assert scene.created == 1
@@ -0,0 +1,68 @@
+"""Unit tests for ospf_sim (run with pytest; no Tk needed)."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ospf_sim import OspfDomain, SpfTree, generate
+
+
+def lab_domain():
+    """The OSPF Lab picture: LAN0 in area 0, R2 as ABR into area 1, an ASBR behind R5."""
+    d = OspfDomain()
+    for name, prio in (('R1', 1), ('R2', 100), ('R3', 50), ('R4', 1), ('R5', 1)):
+        d.add_router(name, priority=prio)
+    d.add_lan('LAN0', {'R1': 10, 'R2': 10, 'R3': 10}, area=0, prefix='10.0.0.0/24')
+    d.add_link('R2', 'R4', 10, area=1, prefix='10.1.0.0/30')
+    d.add_link('R2', 'R5', 10, area=1, prefix='10.1.0.4/30')
+    d.add_link('R4', 'R5', 1, area=1, prefix='10.1.0.8/30')
+    d.add_stub('R5', '10.1.5.0/24', 1, area=1)
+    d.add_external('R5', '198.51.100.0/24', 20, 'E2')
+    d.add_external('R5', '203.0.113.0/24', 20, 'E1')
+    return d
+
+
+def test_roles_dr_and_routes():
+    d = lab_domain()
+    assert d.roles('R2') == ['ABR'] and d.roles('R5') == ['Internal', 'ASBR'] and d.roles('R1') == ['Backbone']
+    assert d.dr_election('LAN0') == ('R2', 'R3')
+    routes = {r.prefix: r for r in d.routing_table('R1')}
+    assert routes['10.0.0.0/24'].kind == 'O' and routes['10.0.0.0/24'].next_hops == ()
+    assert (routes['10.1.5.0/24'].kind, routes['10.1.5.0/24'].cost) == ('O IA', 10 + 10 + 1)
+    assert routes['10.1.5.0/24'].next_hops == ('R2',)
+    assert (routes['198.51.100.0/24'].kind, routes['198.51.100.0/24'].cost) == ('O E2', 20)
+    assert (routes['203.0.113.0/24'].kind, routes['203.0.113.0/24'].cost) == ('O E1', 10 + 10 + 20)
+    # R2 reaches R5's stub both directly (10 + 1) and via R4 (10 + 1 + 1): direct wins
+    assert {r.prefix: r for r in d.routing_table('R2')}['10.1.5.0/24'].next_hops == ('R5',)
+    d.set_cost('R2', 'R5', 11)
+    assert {r.prefix: r for r in d.routing_table('R2')}['10.1.5.0/24'].next_hops == ('R4', 'R5')
+
+
+def test_stub_area_gets_default_instead_of_externals():
+    d = lab_domain()
+    d.add_router('R6')
+    d.add_link('R2', 'R6', 5, area=2, prefix='10.2.0.0/30')
+    d.set_stub_area(2)
+    types = {lsa.type for lsa in d.lsdb(2)}
+    assert 'Type 5' not in types and 'Type 4' not in types
+    routes = {r.prefix: r for r in d.routing_table('R6')}
+    assert routes['0.0.0.0/0'].kind == 'O IA' and routes['0.0.0.0/0'].next_hops == ('R2',)
+    assert '198.51.100.0/24' not in routes and '10.1.5.0/24' in routes
+
+
+def test_incremental_spf_matches_full_recompute():
+    d = generate(routers=120, areas=3, seed=5)
+    rng = random.Random(5)
+    roots = rng.sample(list(d.routers), 6)
+    for root in roots:
+        for area in d.areas_of(root):
+            d.spf(area, root)
+    links = list(d.links)
+    for _ in range(60):
+        a, b = rng.choice(links)
+        d.set_cost(a, b, rng.choice((1, 2, 10, 64, 500)))
+        for (area, root), tree in d._trees.items():
+            full = SpfTree(tree.graph, root)
+            assert tree.dist == full.dist
+            assert tree.parents == full.parents
@@ -0,0 +1,48 @@
+"""Unit tests for route_batch (run with pytest; NumPy is optional)."""
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import route_batch
+from route_batch import BatchMatcher, load_destinations, random_destinations
+from route_table import RouteTable
+
+
+def make_table():
+    rng = random.Random(3)
+    table = RouteTable()
+    for _ in range(300):
+        plen = rng.randint(4, 32)
+        table.add_int(4, rng.getrandbits(32), plen, rng.choice([1, 20, 110]), rng.randint(0, 5))
+    table.add('10.0.0.0/8', 20, 0)
+    table.add('10.0.0.0/8', 1, 0)
+    return table
+
+
+@pytest.mark.parametrize('vectorized', [True, False])
+def test_batch_lookup_matches_trie(vectorized, monkeypatch):
+    if vectorized and route_batch.np is None:
+        pytest.skip('NumPy not installed')
+    if not vectorized:
+        monkeypatch.setattr(route_batch, 'np', None)
+    table = make_table()
+    addrs = random_destinations(5000, seed=1, table=table, share_routed=0.7)
+    matcher = BatchMatcher(table)
+    assert list(matcher.lookup(addrs)) == [table.lookup_int(a) for a in addrs]
+
+    counts, unmatched = matcher.histogram(addrs)
+    assert sum(counts) + unmatched == len(addrs) and unmatched > 0
+    table.add('0.0.0.0/0', 200, 0)
+    counts, unmatched = matcher.histogram(addrs)
+    assert unmatched == 0 and counts[-1] > 0
+
+
+def test_load_destinations_skips_bad_lines(tmp_path):
+    path = tmp_path / 'dests.txt'
+    path.write_text('# sample\n10.0.0.1\n192.168.1.9, web\n\nnot-an-ip\n2001:db8::1\n', encoding='utf-8')
+    addrs, skipped = load_destinations(str(path))
+    assert list(addrs) == [0x0A000001, 0xC0A80109] and skipped == 2
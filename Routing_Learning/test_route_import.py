@@ -0,0 +1,83 @@
+"""Unit tests for route_import (run with pytest; no Tk needed)."""
+import gzip
+import os
+import struct
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from route_import import detect_format, load_routes
+
+SAMPLE = os.path.join(BASE_DIR, 'sample_tables', 'edge_show_ip_route.txt')
+
+
+def test_show_ip_route_sample():
+    table, added = load_routes(SAMPLE)
+    assert added == 12
+    best = table.route(table.lookup('10.10.1.200'))
+    assert (best['prefix'], best['protocol'], best['next_hop']) == ('10.10.1.128/25', 'Static', '192.168.0.1')
+    ecmp = [table.route(r)['next_hop'] for r in table.matches('10.10.1.5') if table.route(r)['prefixlen'] == 24]
+    assert ecmp == ['192.168.0.2', '192.168.0.10']
+    wrapped = table.route(table.lookup('10.20.1.1'))
+    assert (wrapped['protocol'], wrapped['ad'], wrapped['metric']) == ('OSPF IA', 110, 65)
+    assert table.route(table.lookup('172.16.2.9'))['prefix'] == '172.16.2.0/24'    # mask from "is subnetted"
+
+
+def test_csv(tmp_path):
+    path = tmp_path / 'routes.csv'
+    path.write_text('prefix,ad,metric,next_hop,protocol\n10.0.0.0/8,20,5,isp,BGP\nbogus,1,1,x,S\n'
+                    '2001:db8::/32,1,0,fe80::1,Static\n', encoding='utf-8')
+    table, added = load_routes(str(path))
+    assert added == 2
+    assert table.route(table.lookup('2001:db8::5'))['next_hop'] == 'fe80::1'
+
+
+def test_csv_skips_negative_values_and_clamps_large_ones(tmp_path):
+    path = tmp_path / 'routes.csv'
+    path.write_text('prefix,ad,metric,next_hop,protocol\n10.0.0.0/8,20,-5,a,BGP\n10.1.0.0/16,-1,0,b,S\n'
+                    '10.2.0.0/16,999,99999999999,c,S\n10.3.0.0/16,1,1,d,S\n', encoding='utf-8')
+    table, added = load_routes(str(path))
+    assert added == 2
+    assert table.lookup('10.0.0.1') is None
+    route = table.route(table.lookup('10.2.0.1'))
+    assert (route['ad'], route['metric']) == (255, 0xFFFFFFFF)
+
+
+def test_csv_with_more_protocols_than_a_byte_holds(tmp_path):
+    path = tmp_path / 'routes.csv'
+    rows = ''.join(f'10.{i // 256}.{i % 256}.0/24,1,0,hop,proto{i}\n' for i in range(300))
+    path.write_text('prefix,ad,metric,next_hop,protocol\n' + rows, encoding='utf-8')
+    table, added = load_routes(str(path))
+    assert added == 300
+    assert table.route(table.lookup('10.1.43.9'))['protocol'] == 'proto299'
+
+
+def mrt_record(subtype, body):
+    return struct.pack('!IHHI', 0, 13, subtype, len(body)) + body
+
+
+def attr(kind, value):
+    return bytes([0x40, kind, len(value)]) + value
+
+
+def rib_entry(peer, path, next_hop):
+    as_path = bytes([2, len(path)]) + b''.join(struct.pack('!I', a) for a in path)
+    attrs = attr(2, as_path) + attr(3, bytes(next_hop))
+    return struct.pack('!HIH', peer, 0, len(attrs)) + attrs
+
+
+def test_mrt_table_dump_v2_keeps_shortest_as_path(tmp_path):
+    peers = struct.pack('!IH', 0, 0) + struct.pack('!H', 2)
+    peers += bytes([2]) + bytes(4) + bytes([192, 0, 2, 1]) + struct.pack('!I', 64500)
+    peers += bytes([2]) + bytes(4) + bytes([192, 0, 2, 2]) + struct.pack('!I', 64501)
+    entries = rib_entry(0, [64500, 3356, 15169], [192, 0, 2, 1]) + rib_entry(1, [64501, 15169], [192, 0, 2, 2])
+    rib = struct.pack('!IB', 0, 24) + bytes([8, 8, 8]) + struct.pack('!H', 2) + entries
+    path = tmp_path / 'rib.20260101.0000.gz'
+    with gzip.open(path, 'wb') as f:
+        f.write(mrt_record(1, peers) + mrt_record(2, rib))
+    assert detect_format(str(path)) == 'mrt'
+    table, added = load_routes(str(path))
+    assert added == 1
+    route = table.route(table.lookup('8.8.8.8'))
+    assert (route['prefix'], route['next_hop'], route['protocol'], route['ad']) == ('8.8.8.0/24', '192.0.2.2', 'BGP', 20)
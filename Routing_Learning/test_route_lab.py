@@ -0,0 +1,37 @@
+"""Route Lab analysis on imported tables (run with pytest; no window is opened)."""
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BASE_DIR)
+
+import pytest
+
+pytest.importorskip('tkinter')
+
+from app import ROUTE_LAB_TABLE, route_lab_matches, route_lab_summary
+from route_import import load_routes
+
+SAMPLE = os.path.join(BASE_DIR, 'sample_tables', 'edge_show_ip_route.txt')
+
+
+def test_summary_of_lab_topology_routes_names_the_interface():
+    _, matches, error = route_lab_matches(ROUTE_LAB_TABLE, '10.10.1.200')
+    assert error == ''
+    assert route_lab_summary(matches[0]) == 'Best match: 10.10.1.128/25 via Static from R1 on Gi0/0.'
+
+
+def test_summary_of_imported_show_ip_route():
+    table, _ = load_routes(SAMPLE)
+    _, matches, _ = route_lab_matches(table, '10.10.1.200')
+    assert route_lab_summary(matches[0]) == 'Best match: 10.10.1.128/25 via Static from 192.168.0.1.'
+
+
+def test_summary_of_imported_csv_without_next_hop(tmp_path):
+    path = tmp_path / 'routes.csv'
+    path.write_text('prefix,ad,protocol\n10.0.0.0/8,20,BGP\n', encoding='utf-8')
+    table, _ = load_routes(str(path))
+    _, matches, _ = route_lab_matches(table, '10.9.9.9')
+    assert route_lab_summary(matches[0]) == 'Best match: 10.0.0.0/8 via BGP.'
+    assert route_lab_matches(table, '192.0.2.1')[1] == []
+    assert route_lab_matches(table, 'nope')[0] is None
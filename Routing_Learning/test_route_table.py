@@ -0,0 +1,51 @@
+"""Unit tests for route_table (run with pytest; no Tk needed)."""
+import ipaddress
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from route_table import RouteTable
+
+
+def brute_force(nets, routes, address):
+    addr = ipaddress.ip_address(address)
+    hits = [i for i, net in enumerate(nets) if net.version == addr.version and addr in net]
+    return sorted(hits, key=lambda i: (-nets[i].prefixlen, routes[i][1], routes[i][2], i))
+
+
+def test_matches_agree_with_linear_scan():
+    rng = random.Random(7)
+    routes = [('0.0.0.0/0', 200, 0), ('::/0', 200, 0)]
+    for _ in range(400):
+        plen = rng.randint(1, 32)
+        routes.append((f'{ipaddress.IPv4Address(rng.getrandbits(8) << 24 | rng.getrandbits(24))}/{plen}',
+                       rng.choice([1, 20, 90, 110]), rng.randint(0, 3)))
+    for _ in range(100):
+        plen = rng.randint(1, 128)
+        routes.append((f'{ipaddress.IPv6Address(0x2001 << 112 | rng.getrandbits(112))}/{plen}', 1, 0))
+    routes += [routes[5][:1] + (routes[5][1], 0), routes[9]]    # exact ties
+    table = RouteTable()
+    for p, ad, metric in routes:
+        table.add(p, ad, metric)
+    probes = [r[0].split('/')[0] for r in routes] + ['10.1.2.3', '2001::1', '255.255.255.255']
+    probes += [str(ipaddress.IPv4Address(rng.getrandbits(32))) for _ in range(300)]
+    nets = [ipaddress.ip_network(p, strict=False) for p, _, _ in routes]
+    for address in probes:
+        expected = brute_force(nets, routes, address)
+        assert table.matches(address) == expected, address
+        assert table.lookup(address) == expected[0]
+
+
+def test_tie_break_and_route_data():
+    table = RouteTable.from_routes([
+        {'prefix': '10.10.1.0/24', 'ad': 110, 'metric': 20, 'next_hop': 'R2', 'color': 'blue'},
+        {'prefix': '10.10.1.0/24', 'ad': 90, 'metric': 30720, 'next_hop': 'R3'},
+        {'prefix': '10.0.0.0/8', 'ad': 20, 'metric': 100, 'next_hop': 'ISP'},
+    ])
+    best = table.route(table.lookup('10.10.1.130'))
+    assert (best['next_hop'], best['prefixlen']) == ('R3', 24)
+    assert [table.route(r)['next_hop'] for r in table.matches('10.10.1.130')] == ['R3', 'R2', 'ISP']
+    assert table.route(0)['color'] == 'blue'
+    assert table.lookup('192.0.2.1') is None and table.lookup_int(1) == -1
@@ -3,77 +3,44 @@ from tkinter import ttk, messagebox, scrolledtext, filedialog
 import json
 import os
 import random
+import sys
 from datetime import datetime
 
 BASE_DIR = os.path.dirname(__file__)
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, '..')))
+from learning_common.question_bank import QuestionBank, get_bank, save_ids
+from learning_common.storage import open_store
+from learning_common.tk_history import HistoryPager
+from learning_common.tk_study_search import StudySearchBar
+
 QUESTIONS_FILE = os.path.join(BASE_DIR, "questions.json")
 STUDY_FILE = os.path.join(BASE_DIR, "study_content.md")
-SCORES_FILE = os.path.join(BASE_DIR, "scores.json")
-REVIEW_FILE = os.path.join(BASE_DIR, "review_list.json")
 
 
 def load_questions():
     try:
-        with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return get_bank(QUESTIONS_FILE)
     except Exception:
-        return []
+        return QuestionBank([])
 
 
-def load_scores():
-    try:
-        if os.path.exists(SCORES_FILE):
-            with open(SCORES_FILE, 'r', encoding='utf-8') as sf:
-                return json.load(sf)
-    except Exception:
-        pass
-    return []
+# scores, the review list and attempts go through the configured store (journal files or SQLite)
+SCORES_KEEP = 50
+HISTORY_PAGE_SIZE = 20
+STORE = open_store(BASE_DIR, 'web_security', bank=load_questions(), scores_keep=SCORES_KEEP)
 
 
-def save_score_record(record):
-    scores = load_scores()
-    scores.insert(0, record)
-    scores = scores[:50]
+def load_scores(limit=SCORES_KEEP, offset=0):
+    """Return one page of score records, newest first."""
     try:
-        with open(SCORES_FILE, 'w', encoding='utf-8') as sf:
-            json.dump(scores, sf, indent=2)
+        return STORE.scores(limit, offset)
     except Exception:
-        pass
-
-
-def load_review_list():
-    try:
-        if os.path.exists(REVIEW_FILE):
-            with open(REVIEW_FILE, 'r', encoding='utf-8') as rf:
-                return json.load(rf)
-    except Exception:
-        pass
-    return []
-
-
-def save_review_list(lst):
-    try:
-        with open(REVIEW_FILE, 'w', encoding='utf-8') as rf:
-            json.dump(lst, rf, indent=2)
-    except Exception:
-        pass
-
-
-def add_question_to_review(q):
-    try:
-        lst = load_review_list()
-        key = {'difficulty': q.get('difficulty'), 'question': q.get('question')}
-        if key not in lst:
-            lst.append(key)
-            save_review_list(lst)
-    except Exception:
-        pass
+        return []
 
 
-def clear_review_list():
+def save_score_record(record):
     try:
-        if os.path.exists(REVIEW_FILE):
-            os.remove(REVIEW_FILE)
+        STORE.add_score(record)
     except Exception:
         pass
 
@@ -85,7 +52,8 @@ class WebSecLearnApp(tk.Tk):
         self.geometry("820x620")
         self.resizable(False, False)
 
-        self.questions = load_questions()
+        self.bank = load_questions()
+        self.questions = self.bank.questions
 
         self.nb = ttk.Notebook(self)
         self.nb.pack(fill=tk.BOTH, expand=True)
@@ -106,6 +74,8 @@ class WebSecLearnApp(tk.Tk):
         lbl = ttk.Label(self.study_frame, text="Study: Web Security Topics", font=(None, 16))
         lbl.pack(pady=8)
         self.study_text = scrolledtext.ScrolledText(self.study_frame, wrap=tk.WORD)
+        self.study_search = StudySearchBar(self.study_frame, self.study_text, label="Search:")
+        self.study_search.pack(fill=tk.X, padx=10)
         self.study_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
         content = "Study content not found."
         try:
@@ -116,6 +86,7 @@ class WebSecLearnApp(tk.Tk):
             pass
         self.study_text.insert(tk.END, content)
         self.study_text.configure(state=tk.DISABLED)
+        self.study_search.load(content)
 
     def _build_quiz_tab(self):
         top = ttk.Frame(self.quiz_frame)
@@ -162,7 +133,7 @@ class WebSecLearnApp(tk.Tk):
         self.progress = ttk.Progressbar(top, length=180, mode='determinate')
         self.progress.pack(side=tk.RIGHT, padx=6)
 
-        self.review_count_var = tk.StringVar(value=str(len(load_review_list())))
+        self.review_count_var = tk.StringVar(value=str(STORE.review_count()))
         ttk.Label(top, text="Review:").pack(side=tk.RIGHT)
         ttk.Label(top, textvariable=self.review_count_var).pack(side=tk.RIGHT, padx=4)
 
@@ -213,10 +184,12 @@ class WebSecLearnApp(tk.Tk):
         self.submit_answer(i)
 
     def _build_history_tab(self):
-        lbl = ttk.Label(self.history_frame, text="Score History (last 50)", font=(None, 14))
+        lbl = ttk.Label(self.history_frame, text="Score History", font=(None, 14))
         lbl.pack(pady=8)
-        self.history_list = tk.Listbox(self.history_frame, height=18)
-        self.history_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        self.history_pager = HistoryPager(self.history_frame, load_scores, STORE.score_count, self._format_score,
+                                          page_size=HISTORY_PAGE_SIZE, height=18)
+        self.history_pager.pack(fill=tk.BOTH, expand=True, padx=10, pady=6)
+        self.history_list = self.history_pager.listbox
         btn_frame = ttk.Frame(self.history_frame)
         btn_frame.pack(fill=tk.X, pady=6)
         ttk.Button(btn_frame, text="Clear History", command=self.clear_history).pack(side=tk.RIGHT, padx=6)
@@ -258,7 +231,10 @@ class WebSecLearnApp(tk.Tk):
             if isinstance(data, list):
                 with open(QUESTIONS_FILE, 'w', encoding='utf-8') as wf:
                     json.dump(data, wf, indent=2)
-                self.questions = data
+                # imported questions keep their IDs even if they are edited later
+                save_ids(QUESTIONS_FILE)
+                self.bank = load_questions()
+                self.questions = self.bank.questions
                 messagebox.showinfo('Imported', 'Questions imported successfully')
             else:
                 messagebox.showerror('Invalid', 'JSON must be a list of questions')
@@ -276,27 +252,25 @@ class WebSecLearnApp(tk.Tk):
         except Exception as e:
             messagebox.showerror('Error', f'Failed to export: {e}')
 
+    def _format_score(self, rec):
+        t = rec.get('time', '')
+        s = rec.get('score', 0)
+        d = rec.get('mode', '')
+        return f"{t} | {d} | {s}"
+
     def update_history_view(self):
-        self.history_list.delete(0, tk.END)
-        for rec in load_scores():
-            t = rec.get('time', '')
-            s = rec.get('score', 0)
-            d = rec.get('mode', '')
-            pretty = f"{t} | {d} | {s}"
-            self.history_list.insert(tk.END, pretty)
+        self.history_pager.reset()
 
     def clear_history(self):
         try:
-            if os.path.exists(SCORES_FILE):
-                os.remove(SCORES_FILE)
+            STORE.clear_scores()
         except Exception:
             pass
         self.update_history_view()
 
     def start_quiz(self):
         diff = self.diff_var.get()
-        pool = [q for q in self.questions if diff == 'all' or q.get('difficulty') == diff]
-        if not pool:
+        if not self.bank.count(diff):
             messagebox.showwarning('No questions', 'No questions available for that difficulty')
             return
         # sample up to user-selected number (default 20)
@@ -304,8 +278,7 @@ class WebSecLearnApp(tk.Tk):
             requested = int(self.num_var.get())
         except Exception:
             requested = 20
-        n = min(max(1, requested), len(pool))
-        self.current_questions = random.sample(pool, n)
+        self.current_questions = self.bank.sample(max(1, requested), difficulty=diff)
         self.current_index = 0
         self.score = 0
         self.score_var.set(self.score)
@@ -380,11 +353,11 @@ class WebSecLearnApp(tk.Tk):
                 else:
                     self.score -= 5
                     self.feedback_var.set(f"Wrong. -5. Correct: {', '.join(correct)}")
-                    add_question_to_review(q)
+                    STORE.add_review(q)
             except Exception:
                 self.score -= 5
                 self.feedback_var.set(f"Wrong. -5. Correct: {', '.join(correct)}")
-                add_question_to_review(q)
+                STORE.add_review(q)
         elif qtype == 'text':
             ans = ''
             try:
@@ -397,7 +370,7 @@ class WebSecLearnApp(tk.Tk):
             else:
                 self.score -= 5
                 self.feedback_var.set(f"Wrong. -5. Correct: {correct}")
-                add_question_to_review(q)
+                STORE.add_review(q)
         else:
             # mcq (single choice buttons)
             try:
@@ -412,9 +385,9 @@ class WebSecLearnApp(tk.Tk):
             else:
                 self.score -= 5
                 self.feedback_var.set(f"Wrong. -5. Correct: {correct}")
-                add_question_to_review(q)
+                STORE.add_review(q)
         try:
-            self.review_count_var.set(str(len(load_review_list())))
+            self.review_count_var.set(str(STORE.review_count()))
         except Exception:
             pass
         self.score_var.set(self.score)
@@ -459,15 +432,10 @@ class WebSecLearnApp(tk.Tk):
         self.qcount_var.set('0/0')
 
     def start_review(self):
-        entries = load_review_list()
-        if not entries:
+        if not STORE.review_count():
             messagebox.showinfo('Review empty', 'No questions in the review list yet.')
             return
-        objs = []
-        for ent in entries:
-            matches = [q for q in self.questions if q.get('difficulty') == ent.get('difficulty') and q.get('question') == ent.get('question')]
-            if matches:
-                objs.append(matches[0])
+        objs = self.bank.resolve(STORE.review_ids())
         if not objs:
             messagebox.showinfo('No matches', 'Saved review questions could not be resolved.')
             return
@@ -485,7 +453,8 @@ class WebSecLearnApp(tk.Tk):
 
     def _clear_review_prompt(self):
         if messagebox.askyesno('Clear Review', 'Clear saved review questions?'):
-            clear_review_list()
+            STORE.clear_review()
+            self.review_count_var.set('0')
             messagebox.showinfo('Cleared', 'Review list cleared.')
 
 
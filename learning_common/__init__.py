@@ -0,0 +1,9 @@
+"""Code shared by the Basic-Storage learning apps.
+
+The apps are run as plain scripts from their own folders, so each one adds
+the repository root to sys.path before importing from this package.
+"""
+from .question_bank import QuestionBank, get_bank, question_id, question_text
+from .review import ReviewList
+
+__all__ = ['QuestionBank', 'ReviewList', 'get_bank', 'question_id', 'question_text']
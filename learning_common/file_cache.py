@@ -0,0 +1,199 @@
+"""Process-level cache of parsed data files.
+
+A CachedFile keeps the parsed contents of one file together with its
+serialized JSON body, so hot read paths can answer without touching the
+disk or re-encoding. The file is re-read when its (inode, mtime, size)
+signature changes, checked at most once per check_interval seconds, and
+writes made through store() update the cache directly.
+
+Each entry also carries a strong ETag derived from the body's SHA-256 and
+gzip/brotli variants compressed once on first use (brotli only when the
+optional ``brotli`` package is installed).
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from functools import cached_property
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .journal import write_json_atomic
+from .question_bank import _file_signature
+
+
+class CacheEntry:
+    """One cached version of a file: the parsed data plus its JSON body.
+
+    body may be given directly for non-JSON payloads (e.g. generated SVG).
+    """
+
+    def __init__(self, data, body=None):
+        self.data = data
+        self._derived = {}
+        if body is not None:
+            self.__dict__['body'] = body
+
+    def derived(self, name, build):
+        """CacheEntry for build(data), computed once per file version."""
+        entry = self._derived.get(name)
+        if entry is None:
+            entry = self._derived[name] = CacheEntry(build(self.data))
+        return entry
+
+    @cached_property
+    def body(self):
+        return json.dumps(self.data).encode('utf-8')
+
+    @cached_property
+    def digest(self):
+        return hashlib.sha256(self.body).hexdigest()[:32]
+
+    def etag(self, encoding=None):
+        """Strong ETag for the body as sent with the given content encoding."""
+        return self.digest if encoding is None else f'{self.digest}-{encoding}'
+
+    @cached_property
+    def gzip(self):
+        # mtime=0 keeps the compressed bytes identical for identical content
+        return gzip.compress(self.body, compresslevel=6, mtime=0)
+
+    @cached_property
+    def br(self):
+        return brotli.compress(self.body) if brotli is not None else None
+
+    def encoded(self, accepted):
+        """Pick the smallest variant allowed by accepted (a set of encodings).
+
+        Returns (encoding, payload); encoding is None for the plain body.
+        """
+        if 'br' in accepted and brotli is not None and len(self.br) < len(self.body):
+            return 'br', self.br
+        if 'gzip' in accepted and len(self.gzip) < len(self.body):
+            return 'gzip', self.gzip
+        return None, self.body
+
+
+class CachedFile:
+    """Parsed view of path, reloaded only when the file changes.
+
+    load(path) parses the file; default is used when it is missing or
+    cannot be parsed. Callers must treat the returned data as read-only
+    and copy it before making changes.
+    """
+
+    def __init__(self, path, load, default=None, check_interval=1.0):
+        self.path = path
+        self.load = load
+        self.default = default
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entry = None
+        self._sig = None
+        self._checked = 0.0
+
+    def _signature(self):
+        try:
+            return _file_signature(self.path)
+        except OSError:
+            return None
+
+    def entry(self):
+        """Return the current CacheEntry, re-reading the file if it changed."""
+        now = time.monotonic()
+        entry = self._entry
+        if entry is not None and now - self._checked < self.check_interval:
+            return entry
+        with self._lock:
+            sig = self._signature()
+            if self._entry is None or sig != self._sig:
+                data = self.default
+                if sig is not None:
+                    try:
+                        data = self.load(self.path)
+                    except Exception:
+                        data = self.default
+                self._entry = CacheEntry(data)
+                self._sig = sig
+            self._checked = now
+            return self._entry
+
+    def get(self):
+        return self.entry().data
+
+    def derived(self, name, build):
+        """Data computed from the cached data (see CacheEntry.derived), rebuilt when the file changes."""
+        return self.entry().derived(name, build)
+
+    def body(self):
+        """Serialized JSON bytes of the cached data."""
+        return self.entry().body
+
+    def store(self, data, write=write_json_atomic):
+        """Write data to the file and make it the cached version."""
+        with self._lock:
+            write(self.path, data)
+            self._entry = CacheEntry(data)
+            self._sig = self._signature()
+            self._checked = time.monotonic()
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+
+class CachedBuild:
+    """Result of build() cached until one of the files it was built from changes.
+
+    sources() lists those files; their signatures are checked at most once
+    per check_interval seconds. build() returns a CacheEntry.
+    """
+
+    def __init__(self, build, sources, check_interval=1.0):
+        self.build = build
+        self.sources = sources
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entry = None
+        self._sig = None
+        self._checked = 0.0
+
+    def _signature(self):
+        sig = []
+        for path in self.sources():
+            try:
+                sig.append((path, _file_signature(path)))
+            except OSError:
+                sig.append((path, None))
+        return tuple(sig)
+
+    def entry(self):
+        now = time.monotonic()
+        entry = self._entry
+        if entry is not None and now - self._checked < self.check_interval:
+            return entry
+        with self._lock:
+            sig = self._signature()
+            if self._entry is None or sig != self._sig:
+                self._entry = self.build()
+                self._sig = sig
+            self._checked = now
+            return self._entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_text(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
@@ -0,0 +1,273 @@
+"""Append-only JSON-lines journal for score and attempt history.
+
+Recording an event appends one line to an open file, so its cost does not
+depend on how much history exists. fsync is batched (every few records or
+every second), a torn last line left by a crash is skipped on read, and
+journals with a retention limit are periodically compacted by writing the
+kept records to a temp file and atomically renaming it over the journal.
+Writers hold a file lock (see locking.py), so several processes can share
+one journal without interleaved lines or appends lost to a compaction.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+
+from .locking import file_lock
+
+_BLOCK = 64 * 1024
+
+
+def write_json_atomic(path, data, indent=2):
+    """Write JSON to path via temp file + fsync + rename, so readers never see a partial file."""
+    tmp = f'{path}.tmp.{os.getpid()}.{threading.get_ident()}'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _decode(line):
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class Journal:
+    """JSON-lines file with O(1) appends.
+
+    keep: number of most recent records to retain (None keeps everything).
+    legacy_path: old JSON-array file imported once when the journal does not
+    exist yet; it is renamed to <name>.bak afterwards. legacy_newest_first
+    says whether that array was stored newest-first.
+    """
+
+    def __init__(self, path, keep=None, compact_slack=200, fsync_every=16,
+                 fsync_interval=1.0, legacy_path=None, legacy_newest_first=False):
+        self.path = path
+        self.keep = keep
+        self.compact_slack = compact_slack
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+        self._fh = None
+        self._count = None
+        self._size = None           # bytes counted so far, always at a line boundary
+        self._ino = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        if legacy_path:
+            self._import_legacy(legacy_path, legacy_newest_first)
+        atexit.register(self.close)
+
+    def _import_legacy(self, legacy_path, newest_first):
+        with file_lock(self.path):
+            if os.path.exists(self.path) or not os.path.exists(legacy_path):
+                return
+            self._import_legacy_locked(legacy_path, newest_first)
+
+    def _import_legacy_locked(self, legacy_path, newest_first):
+        try:
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception:
+            return
+        if not isinstance(data, list):
+            return
+        if newest_first:
+            data = list(reversed(data))
+        self._rewrite(data)
+        try:
+            os.replace(legacy_path, legacy_path + '.bak')
+        except OSError:
+            pass
+
+    def _open(self):
+        if self._fh is not None and self._replaced():
+            # another process compacted or cleared the journal; follow the new file
+            self._sync(force=True)
+            self._fh.close()
+            self._fh = None
+        if self._fh is None:
+            self._fh = open(self.path, 'a+b')
+            # a crash can leave a torn final line; terminate it so the next
+            # record starts on a fresh line and the fragment is skipped on read
+            self._fh.seek(0, os.SEEK_END)
+            if self._fh.tell():
+                self._fh.seek(-1, os.SEEK_END)
+                if self._fh.read(1) != b'\n':
+                    self._fh.write(b'\n')
+        return self._fh
+
+    def _replaced(self):
+        try:
+            return os.fstat(self._fh.fileno()).st_ino != os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return True
+
+    def _sync(self, force=False):
+        if self._fh is None or not self._unsynced:
+            return
+        now = time.monotonic()
+        if force or self._unsynced >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._unsynced = 0
+            self._last_sync = now
+
+    def count(self):
+        """Number of records currently in the journal.
+
+        Only the bytes appended since the last count are read (by this or
+        another process); the file is rescanned when it shrank or was
+        replaced by a compaction or clear.
+        """
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            try:
+                st = os.stat(self.path)
+                size, ino = st.st_size, st.st_ino
+            except FileNotFoundError:
+                size, ino = 0, None
+            if self._count is None or ino != self._ino or size < self._size:
+                self._count, self._size, self._ino = 0, 0, ino
+            if size > self._size:
+                try:
+                    with open(self.path, 'rb') as f:
+                        f.seek(self._size)
+                        data = f.read(size - self._size)
+                except FileNotFoundError:
+                    data = b''
+                # a line still being written by another process is counted once it is complete
+                end = data.rfind(b'\n') + 1
+                self._count += sum(1 for line in data[:end].split(b'\n')
+                                   if line.strip() and _decode(line) is not None)
+                self._size += end
+            return self._count
+
+    def append(self, record):
+        """Append one record; returns the new record count."""
+        return self.extend([record])
+
+    def extend(self, records):
+        """Append several records with a single write; returns the new record count."""
+        data = b''.join(json.dumps(r, separators=(',', ':')).encode('utf-8') + b'\n' for r in records)
+        with self._lock, file_lock(self.path):
+            fh = self._open()
+            count = self.count()
+            fh.write(data)
+            fh.flush()
+            self._count = count + len(records)
+            self._size = fh.tell()
+            self._unsynced += len(records)
+            self._sync()
+            if self.keep is not None and self._count > self.keep + self.compact_slack:
+                self.compact()
+            return self._count
+
+    def records(self):
+        """Return all records, oldest first."""
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            try:
+                with open(self.path, 'rb') as f:
+                    lines = f.read().splitlines()
+            except FileNotFoundError:
+                return []
+        out = []
+        for line in lines:
+            rec = _decode(line) if line.strip() else None
+            if rec is not None:
+                out.append(rec)
+        return out
+
+    def tail(self, n, offset=0):
+        """Return up to n records, newest first, skipping the newest `offset`.
+
+        Reads the file backwards in blocks, so the cost depends on n + offset
+        rather than on the size of the journal.
+        """
+        if n <= 0:
+            return []
+        wanted = n + offset
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                return []
+        out = []
+        with f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            rest = b''
+            while pos > 0 and len(out) < wanted:
+                step = min(_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                chunk = f.read(step) + rest
+                lines = chunk.split(b'\n')
+                # the first piece may be a partial line unless we reached the start
+                rest = lines.pop(0) if pos > 0 else b''
+                for line in reversed(lines):
+                    rec = _decode(line) if line.strip() else None
+                    if rec is not None:
+                        out.append(rec)
+                        if len(out) >= wanted:
+                            break
+            if rest and len(out) < wanted:
+                rec = _decode(rest)
+                if rec is not None:
+                    out.append(rec)
+        return out[offset:wanted]
+
+    def _rewrite(self, records):
+        tmp = f'{self.path}.tmp.{os.getpid()}'
+        with open(tmp, 'wb') as f:
+            for r in records:
+                f.write(json.dumps(r, separators=(',', ':')).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        st = os.stat(self.path)
+        self._count = len(records)
+        self._size = st.st_size
+        self._ino = st.st_ino
+
+    def compact(self):
+        """Rewrite the journal keeping only the most recent `keep` records."""
+        with self._lock, file_lock(self.path):
+            recs = self.records()
+            if self.keep is not None:
+                recs = recs[-self.keep:] if self.keep else []
+            self.close()
+            self._rewrite(recs)
+
+    def flush(self):
+        """Force buffered records to disk."""
+        with self._lock:
+            self._sync(force=True)
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._sync(force=True)
+                self._fh.close()
+                self._fh = None
+
+    def clear(self):
+        with self._lock, file_lock(self.path):
+            self.close()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self._count = 0
+            self._size = 0
+            self._ino = None
@@ -0,0 +1,59 @@
+"""Cross-process file locks for the shared data files.
+
+file_lock(path) holds an exclusive lock on a sidecar ``<path>.lock`` file,
+so several app processes (or server workers) serialize their
+read-modify-write cycles on the same JSON or journal file. Threads in one
+process take an in-process lock first, so the OS lock is only contended
+between processes.
+"""
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+_locks = {}
+_locks_guard = threading.Lock()
+_held = threading.local()
+
+
+def _thread_lock(path):
+    with _locks_guard:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = threading.Lock()
+        return lock
+
+
+@contextmanager
+def file_lock(path):
+    """Exclusive lock for path, shared by threads and processes; re-entrant per thread."""
+    lock_path = os.path.abspath(path) + '.lock'
+    held = _held.__dict__.setdefault('paths', set())
+    if lock_path in held:
+        yield
+        return
+    with _thread_lock(lock_path):
+        fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                # LK_LOCK retries for about 10 seconds before failing
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            held.add(lock_path)
+            try:
+                yield
+            finally:
+                held.discard(lock_path)
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
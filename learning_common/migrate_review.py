@@ -0,0 +1,35 @@
+"""Store question IDs in questions.json and convert text-keyed review_list.json
+files to those IDs.
+
+Usage: python -m learning_common.migrate_review Routing_Learning Web_Security_Learning
+"""
+import os
+import sys
+
+from .question_bank import get_bank, save_ids
+from .review import ReviewList
+
+
+def migrate_app_dir(app_dir):
+    """Write the missing IDs into <app_dir>/questions.json and rewrite
+    <app_dir>/review_list.json as an ID list; returns (IDs written, entry count)."""
+    questions_file = os.path.join(app_dir, 'questions.json')
+    review_file = os.path.join(app_dir, 'review_list.json')
+    bank = None
+    written = 0
+    try:
+        written = save_ids(questions_file)
+        bank = get_bank(questions_file)
+    except Exception:
+        pass
+    return written, len(ReviewList(review_file, bank))
+
+
+def main(argv=None):
+    for app_dir in (sys.argv[1:] if argv is None else argv):
+        written, entries = migrate_app_dir(app_dir)
+        print(app_dir, written, 'question IDs written,', entries, 'review entries')
+
+
+if __name__ == '__main__':
+    main()
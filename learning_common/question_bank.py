@@ -0,0 +1,219 @@
+"""Indexed question bank shared by all learning apps.
+
+Each questions.json is parsed once per process and indexed by difficulty,
+question type and stable question ID, so starting a quiz or a review session
+is a dictionary lookup instead of a scan over the whole bank.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+
+from .locking import file_lock
+
+_banks = {}
+_banks_lock = threading.Lock()
+_STRING_RE = re.compile(r'"(?:[^"\\]|\\.)*"')
+_SPACE_RE = re.compile(r'\s*')
+
+
+def question_text(q):
+    """Return the prompt text of a question (Hardware uses 'prompt')."""
+    return q.get('question') or q.get('prompt') or ''
+
+
+def _normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def question_id(q):
+    """Return the stable ID of a question.
+
+    An explicit 'id' field wins. Otherwise the ID is a hash of the
+    difficulty and the case/whitespace-normalized text, so it can also be
+    recomputed from an old {'difficulty', 'question'} review entry.
+    """
+    if q.get('id'):
+        return str(q['id'])
+    raw = f"{_normalize(q.get('difficulty'))}|{_normalize(question_text(q))}"
+    return 'q_' + hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+class QuestionBank:
+    """In-memory question list with difficulty/type/ID indexes.
+
+    Questions without an 'id' get their content-hashed ID assigned here, so
+    it travels with the question when the bank is exported and re-imported.
+    It only survives edits to the question once save_ids() has written it
+    into the question file.
+    """
+
+    def __init__(self, questions):
+        self.questions = [q for q in questions if isinstance(q, dict)]
+        self._by_id = {}
+        self._by_text = {}
+        self._by_difficulty = {}
+        self._by_type = {}
+        self._by_difficulty_type = {}
+        for q in self.questions:
+            diff = q.get('difficulty')
+            qtype = q.get('type', 'mcq')
+            qid = question_id(q)
+            q.setdefault('id', qid)
+            # first definition wins, matching the old "matches[0]" lookups
+            self._by_id.setdefault(qid, q)
+            self._by_text.setdefault((_normalize(diff), _normalize(question_text(q))), q)
+            self._by_difficulty.setdefault(diff, []).append(q)
+            self._by_type.setdefault(qtype, []).append(q)
+            self._by_difficulty_type.setdefault((diff, qtype), []).append(q)
+
+    @classmethod
+    def load(cls, path):
+        """Parse a question file; accepts a plain list or {"questions": [...]}."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('questions', [])
+        if not isinstance(data, list):
+            raise ValueError(f'{path}: expected a list of questions')
+        return cls(data)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __iter__(self):
+        return iter(self.questions)
+
+    def difficulties(self):
+        return list(self._by_difficulty)
+
+    def pool(self, difficulty=None, qtype=None):
+        """Return the indexed list for a difficulty and/or type ('all' or None = any).
+
+        The returned list is shared with the index; callers must not mutate it.
+        """
+        if difficulty == 'all':
+            difficulty = None
+        if difficulty is None and qtype is None:
+            return self.questions
+        if qtype is None:
+            return self._by_difficulty.get(difficulty, [])
+        if difficulty is None:
+            return self._by_type.get(qtype, [])
+        return self._by_difficulty_type.get((difficulty, qtype), [])
+
+    def count(self, difficulty=None, qtype=None):
+        return len(self.pool(difficulty, qtype))
+
+    def sample(self, n, difficulty=None, qtype=None, rng=random):
+        """Return up to n random questions from the matching pool."""
+        pool = self.pool(difficulty, qtype)
+        return rng.sample(pool, min(max(0, n), len(pool)))
+
+    def get(self, qid, default=None):
+        return self._by_id.get(qid, default)
+
+    def find(self, difficulty, text):
+        """Look a question up by difficulty and text (used to migrate old review entries)."""
+        return self._by_text.get((_normalize(difficulty), _normalize(text)))
+
+    def resolve(self, ids):
+        """Map a sequence of IDs to questions, skipping unknown IDs."""
+        found = []
+        for qid in ids:
+            q = self._by_id.get(qid)
+            if q is not None:
+                found.append(q)
+        return found
+
+
+def _question_starts(text):
+    """Offsets just past the '{' of each question object in a question file's text:
+    the objects of the root list, or of the root object's "questions" list."""
+    starts = []
+    stack = []              # open brackets; the root object's "questions" list is marked as such
+    key = None              # last string read directly inside the root object
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch == '"':
+            end = _STRING_RE.match(text, i).end()
+            if stack == ['{']:
+                key = text[i + 1:end - 1]
+            i = end
+            continue
+        if ch == '{' and stack in (['['], ['{', 'questions']):
+            starts.append(i + 1)
+        if ch in '[{':
+            stack.append('questions' if ch == '[' and stack == ['{'] and key == 'questions' else ch)
+        elif ch in ']}':
+            stack.pop()
+        i += 1
+    return starts
+
+
+def save_ids(path):
+    """Write the ID of every question that has none into the question file itself.
+
+    A content-hashed ID changes when a question is reworded or moved to
+    another difficulty, which orphans its review entries; once written to
+    the file the ID no longer depends on the text. Only the "id" members are
+    inserted, so the file keeps its layout. Returns how many were written.
+    """
+    with file_lock(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        data = json.loads(text)
+        questions = data.get('questions', []) if isinstance(data, dict) else data
+        questions = [q for q in questions if isinstance(q, dict)] if isinstance(questions, list) else []
+        starts = _question_starts(text)
+        if len(starts) != len(questions):
+            raise ValueError(f'{path}: could not locate the questions')
+        parts = []
+        last = 0
+        for q, pos in zip(questions, starts):
+            if 'id' in q:
+                continue
+            # follow the file's layout: a question spread over lines gets the id on its own line
+            ws = _SPACE_RE.match(text, pos).group()
+            member = f'"id": {json.dumps(question_id(q))}'
+            if text[pos + len(ws)] != '}':
+                member += ',' if '\n' in ws else ', '
+            parts.append(text[last:pos] + (ws + member if '\n' in ws else member))
+            last = pos
+        if not parts:
+            return 0
+        text = ''.join(parts) + text[last:]
+        json.loads(text)
+        tmp = f'{path}.tmp.{os.getpid()}.{threading.get_ident()}'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        return len(parts)
+
+
+def _file_signature(path):
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def get_bank(path, reload=False):
+    """Return the process-wide bank for path, re-parsing only when the file changes.
+
+    Raises OSError/ValueError when the file is missing or malformed so each
+    app can keep its own error handling.
+    """
+    path = os.path.abspath(path)
+    sig = _file_signature(path)
+    with _banks_lock:
+        cached = _banks.get(path)
+        if cached and not reload and cached[0] == sig:
+            return cached[1]
+    bank = QuestionBank.load(path)
+    with _banks_lock:
+        _banks[path] = (sig, bank)
+    return bank
@@ -0,0 +1,131 @@
+"""Missed-question review lists stored as stable question IDs.
+
+Older review_list.json files hold {'difficulty', 'question'} dicts; those
+are converted to IDs the first time the list is loaded (or in bulk with
+``python -m learning_common.migrate_review``) and the file is rewritten in
+the new format.
+
+add() and clear() hold a file lock and re-read the file first, so
+concurrent writers (threads or processes) never drop each other's entries.
+"""
+import json
+import os
+
+from .journal import write_json_atomic
+from .locking import file_lock
+from .question_bank import _file_signature, question_id
+
+
+def migrate_entries(entries, bank=None):
+    """Convert review entries to question IDs.
+
+    Returns (ids, changed). Text-keyed dicts are looked up in the bank when
+    one is given (so explicit question IDs are honoured); otherwise their
+    content-hashed ID is recomputed directly.
+    """
+    ids = []
+    seen = set()
+    changed = False
+    for ent in entries:
+        if isinstance(ent, dict):
+            changed = True
+            q = bank.find(ent.get('difficulty'), ent.get('question')) if bank is not None else None
+            qid = q['id'] if q is not None else question_id(ent)
+        elif isinstance(ent, str):
+            qid = ent
+        else:
+            changed = True
+            continue
+        if qid in seen:
+            changed = True
+            continue
+        seen.add(qid)
+        ids.append(qid)
+    return ids, changed
+
+
+class ReviewList:
+    """Ordered set of question IDs persisted to a JSON file."""
+
+    def __init__(self, path, bank=None):
+        self.path = path
+        self.ids = []
+        self._seen = set()
+        self._sig = None
+        self.reload(bank)
+
+    def _signature(self):
+        try:
+            return _file_signature(self.path)
+        except OSError:
+            return None
+
+    def reload(self, bank=None):
+        entries = []
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as rf:
+                    entries = json.load(rf)
+        except Exception:
+            entries = []
+        if not isinstance(entries, list):
+            entries = []
+        self.ids, changed = migrate_entries(entries, bank)
+        self._seen = set(self.ids)
+        if changed:
+            self.save()
+        else:
+            self._sig = self._signature()
+
+    def refresh(self, bank=None):
+        """Reload when another process has replaced or removed the file."""
+        if self._signature() != self._sig:
+            self.reload(bank)
+
+    def save(self):
+        try:
+            write_json_atomic(self.path, self.ids)
+        except Exception:
+            pass
+        self._sig = self._signature()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, qid):
+        return qid in self._seen
+
+    def add(self, q):
+        """Add a question (or a question ID); returns True when it was new."""
+        return self.add_many([q]) == 1
+
+    def add_many(self, items):
+        """Add several questions or IDs with a single write; returns how many were new."""
+        added = 0
+        with file_lock(self.path):
+            self.refresh()
+            for q in items:
+                qid = q if isinstance(q, str) else question_id(q)
+                if qid in self._seen:
+                    continue
+                self._seen.add(qid)
+                self.ids.append(qid)
+                added += 1
+            if added:
+                self.save()
+        return added
+
+    def clear(self):
+        with file_lock(self.path):
+            self.ids = []
+            self._seen = set()
+            try:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+            except Exception:
+                pass
+            self._sig = self._signature()
+
+    def resolve(self, bank):
+        """Return the question objects for the saved IDs, in review order."""
+        return bank.resolve(self.ids)
@@ -0,0 +1,407 @@
+"""Pluggable storage for score history, review lists and attempt logs.
+
+Two backends share one interface:
+
+* JournalStore (default) keeps the per-app files: scores.jsonl and
+  <attempts>.jsonl journals plus review_list.json.
+* SqliteStore keeps everything in one SQLite database in WAL mode, with
+  indexes on attempts by question, user and time. Several apps can share
+  one database file because every row carries the app name.
+
+Pick the backend with LEARNING_STORAGE=sqlite (and optionally LEARNING_DB
+for the database path). On first use SqliteStore imports the app's
+existing JSON/JSON-lines files.
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from .journal import Journal
+from .question_bank import question_id
+from .review import ReviewList, migrate_entries
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app TEXT NOT NULL,
+    user TEXT,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_app ON scores(app, id);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app TEXT NOT NULL,
+    question_id TEXT,
+    user TEXT,
+    ok INTEGER,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_attempts_app ON attempts(app, id);
+CREATE INDEX IF NOT EXISTS idx_attempts_question ON attempts(app, question_id, id);
+CREATE INDEX IF NOT EXISTS idx_attempts_user ON attempts(app, user, id);
+CREATE INDEX IF NOT EXISTS idx_attempts_time ON attempts(app, created_at);
+CREATE TABLE IF NOT EXISTS review (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    added_at TEXT NOT NULL,
+    UNIQUE (app, item_id)
+);
+CREATE TABLE IF NOT EXISTS imports (
+    app TEXT NOT NULL,
+    source TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    PRIMARY KEY (app, source)
+);
+"""
+
+
+def _now():
+    return datetime.now().isoformat()
+
+
+def _record_time(rec):
+    return rec.get('time') or rec.get('timestamp') or _now()
+
+
+def _record_user(rec):
+    return rec.get('user') or rec.get('name')
+
+
+def _matches(rec, question_id, user):
+    if question_id is not None and rec.get('question_id') != question_id:
+        return False
+    if user is not None and _record_user(rec) != user:
+        return False
+    return True
+
+
+class JournalStore:
+    """File backend: append-only journals plus the JSON review list."""
+
+    backend = 'journal'
+
+    def __init__(self, base_dir, app, bank=None, scores_keep=None, attempts_name='attempts',
+                 legacy_scores_newest_first=True):
+        self.app = app
+        self.base_dir = base_dir
+        self.scores_keep = scores_keep
+        self._scores = Journal(os.path.join(base_dir, 'scores.jsonl'), keep=scores_keep,
+                               legacy_path=os.path.join(base_dir, 'scores.json'),
+                               legacy_newest_first=legacy_scores_newest_first)
+        self._attempts = Journal(os.path.join(base_dir, attempts_name + '.jsonl'),
+                                 legacy_path=os.path.join(base_dir, attempts_name + '.json'))
+        self._bank = bank
+        self._review = ReviewList(os.path.join(base_dir, 'review_list.json'), bank)
+        self._review_lock = threading.Lock()
+
+    # scores
+    def add_score(self, record):
+        self._scores.append(record)
+
+    def scores(self, limit=20, offset=0):
+        """Score records, newest first."""
+        if self.scores_keep is not None:
+            limit = max(0, min(limit, self.scores_keep - offset))
+        return self._scores.tail(limit, offset)
+
+    def score_count(self):
+        n = self._scores.count()
+        return min(n, self.scores_keep) if self.scores_keep is not None else n
+
+    def clear_scores(self):
+        self._scores.clear()
+
+    # attempts
+    def record_attempt(self, attempt):
+        """Append one attempt; returns the total attempt count."""
+        return self._attempts.append(attempt)
+
+    def record_attempts(self, attempts, review=()):
+        """Append a batch of attempts with one write and add `review` items to the
+        review list with one more; returns the total attempt count."""
+        count = self._attempts.extend(list(attempts))
+        if review:
+            self.add_reviews(review)
+        return count
+
+    def attempts(self, limit=50, offset=0, question_id=None, user=None):
+        """Attempt records, newest first, optionally filtered by question or user."""
+        if question_id is None and user is None:
+            return self._attempts.tail(limit, offset)
+        found = [r for r in reversed(self._attempts.records()) if _matches(r, question_id, user)]
+        return found[offset:offset + limit]
+
+    def attempt_count(self, question_id=None, user=None):
+        if question_id is None and user is None:
+            return self._attempts.count()
+        return sum(1 for r in self._attempts.records() if _matches(r, question_id, user))
+
+    # review list
+    def review_ids(self, limit=None, offset=0):
+        with self._review_lock:
+            self._review.refresh(self._bank)
+            ids = self._review.ids
+            return ids[offset:] if limit is None else ids[offset:offset + limit]
+
+    def review_count(self):
+        with self._review_lock:
+            self._review.refresh(self._bank)
+            return len(self._review)
+
+    def has_review(self, item_id):
+        with self._review_lock:
+            self._review.refresh(self._bank)
+            return item_id in self._review
+
+    def add_review(self, item):
+        """Add a question (or an ID/name); returns True when it was new."""
+        with self._review_lock:
+            self._review.refresh(self._bank)
+            return self._review.add(item)
+
+    def add_reviews(self, items):
+        """Add several questions or IDs; returns how many were new."""
+        with self._review_lock:
+            return self._review.add_many(items)
+
+    def clear_review(self):
+        with self._review_lock:
+            self._review.clear()
+
+    def close(self):
+        self._scores.close()
+        self._attempts.close()
+
+
+class SqliteStore:
+    """SQLite backend (WAL mode) with indexed attempt queries and paging."""
+
+    backend = 'sqlite'
+
+    def __init__(self, db_path, app):
+        self.db_path = db_path
+        self.app = app
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _query(self, sql, args=()):
+        return self._conn().execute(sql, args).fetchall()
+
+    # scores
+    def add_score(self, record):
+        with self._conn() as conn:
+            conn.execute('INSERT INTO scores (app, user, created_at, record) VALUES (?, ?, ?, ?)',
+                         (self.app, _record_user(record), _record_time(record), json.dumps(record)))
+
+    def scores(self, limit=20, offset=0):
+        rows = self._query('SELECT record FROM scores WHERE app = ? ORDER BY id DESC LIMIT ? OFFSET ?',
+                           (self.app, limit, offset))
+        return [json.loads(r[0]) for r in rows]
+
+    def score_count(self):
+        return self._query('SELECT COUNT(*) FROM scores WHERE app = ?', (self.app,))[0][0]
+
+    def clear_scores(self):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM scores WHERE app = ?', (self.app,))
+
+    # attempts
+    def _attempt_row(self, a):
+        ok = a.get('ok')
+        return (self.app, a.get('question_id'), _record_user(a), None if ok is None else int(bool(ok)),
+                _record_time(a), json.dumps(a))
+
+    def record_attempt(self, attempt):
+        return self.record_attempts([attempt])
+
+    def record_attempts(self, attempts, review=()):
+        """Insert a batch of attempts, and add `review` items to the review list,
+        in one transaction; returns the total attempt count."""
+        rows = [self._attempt_row(a) for a in attempts]
+        with self._conn() as conn:
+            conn.executemany('INSERT INTO attempts (app, question_id, user, ok, created_at, record) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', rows)
+            if review:
+                self._insert_review(conn, review)
+        return self.attempt_count()
+
+    def _attempt_filter(self, question_id, user):
+        sql = 'WHERE app = ?'
+        args = [self.app]
+        if question_id is not None:
+            sql += ' AND question_id = ?'
+            args.append(question_id)
+        if user is not None:
+            sql += ' AND user = ?'
+            args.append(user)
+        return sql, args
+
+    def attempts(self, limit=50, offset=0, question_id=None, user=None):
+        where, args = self._attempt_filter(question_id, user)
+        rows = self._query(f'SELECT record FROM attempts {where} ORDER BY id DESC LIMIT ? OFFSET ?',
+                           args + [limit, offset])
+        return [json.loads(r[0]) for r in rows]
+
+    def attempts_between(self, start, end, limit=50, offset=0):
+        """Attempts with start <= created_at < end (ISO strings), oldest first."""
+        rows = self._query('SELECT record FROM attempts WHERE app = ? AND created_at >= ? AND created_at < ? '
+                           'ORDER BY created_at LIMIT ? OFFSET ?', (self.app, start, end, limit, offset))
+        return [json.loads(r[0]) for r in rows]
+
+    def attempt_count(self, question_id=None, user=None):
+        where, args = self._attempt_filter(question_id, user)
+        return self._query(f'SELECT COUNT(*) FROM attempts {where}', args)[0][0]
+
+    # review list
+    def review_ids(self, limit=None, offset=0):
+        rows = self._query('SELECT item_id FROM review WHERE app = ? ORDER BY id LIMIT ? OFFSET ?',
+                           (self.app, -1 if limit is None else limit, offset))
+        return [r[0] for r in rows]
+
+    def review_count(self):
+        return self._query('SELECT COUNT(*) FROM review WHERE app = ?', (self.app,))[0][0]
+
+    def has_review(self, item_id):
+        return bool(self._query('SELECT 1 FROM review WHERE app = ? AND item_id = ?', (self.app, item_id)))
+
+    def _insert_review(self, conn, items):
+        ids = [i if isinstance(i, str) else question_id(i) for i in items]
+        before = conn.total_changes
+        conn.executemany('INSERT OR IGNORE INTO review (app, item_id, added_at) VALUES (?, ?, ?)',
+                         [(self.app, i, _now()) for i in ids])
+        return conn.total_changes - before
+
+    def add_review(self, item):
+        return self.add_reviews([item]) == 1
+
+    def add_reviews(self, items):
+        """Add several questions or IDs in one transaction; returns how many were new."""
+        with self._conn() as conn:
+            return self._insert_review(conn, items)
+
+    def clear_review(self):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM review WHERE app = ?', (self.app,))
+
+    # import of the file-based history
+    def import_json(self, base_dir, bank=None, attempts_name='attempts', legacy_scores_newest_first=True):
+        """Import an app's JSON/JSON-lines files once; returns the number of rows added."""
+        added = 0
+        sources = (
+            ('scores.json', 'scores'), ('scores.jsonl', 'scores'),
+            (attempts_name + '.json', 'attempts'), (attempts_name + '.jsonl', 'attempts'),
+            ('review_list.json', 'review'),
+        )
+        conn = self._conn()
+        for name, kind in sources:
+            path = os.path.join(base_dir, name)
+            if not os.path.exists(path):
+                continue
+            if self._query('SELECT 1 FROM imports WHERE app = ? AND source = ?', (self.app, name)):
+                continue
+            records = _read_records(path)
+            if records is None:
+                continue
+            with conn:
+                if kind == 'scores':
+                    if name.endswith('.json') and legacy_scores_newest_first:
+                        records = list(reversed(records))
+                    conn.executemany('INSERT INTO scores (app, user, created_at, record) VALUES (?, ?, ?, ?)',
+                                     [(self.app, _record_user(r), _record_time(r), json.dumps(r))
+                                      for r in records if isinstance(r, dict)])
+                elif kind == 'attempts':
+                    conn.executemany('INSERT INTO attempts (app, question_id, user, ok, created_at, record) '
+                                     'VALUES (?, ?, ?, ?, ?, ?)',
+                                     [self._attempt_row(r) for r in records if isinstance(r, dict)])
+                else:
+                    ids, _ = migrate_entries(records, bank)
+                    conn.executemany('INSERT OR IGNORE INTO review (app, item_id, added_at) VALUES (?, ?, ?)',
+                                     [(self.app, i, _now()) for i in ids])
+                conn.execute('INSERT INTO imports (app, source, imported_at) VALUES (?, ?, ?)',
+                             (self.app, name, _now()))
+            added += len(records)
+        return added
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def _read_records(path):
+    """Read a JSON array or JSON-lines file; returns None if it cannot be parsed."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if path.endswith('.jsonl'):
+                out = []
+                for line in f:
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        pass
+                return out
+            data = json.load(f)
+    except Exception:
+        return None
+    return data if isinstance(data, list) else None
+
+
+def open_store(base_dir, app, bank=None, scores_keep=None, attempts_name='attempts',
+               legacy_scores_newest_first=True, backend=None):
+    """Open the configured store for an app (LEARNING_STORAGE=journal|sqlite).
+
+    scores_keep bounds the file backend's score journal; the SQLite backend
+    keeps full history and relies on paging instead.
+    """
+    backend = (backend or os.environ.get('LEARNING_STORAGE') or 'journal').lower()
+    if backend == 'sqlite':
+        db_path = os.environ.get('LEARNING_DB') or os.path.join(base_dir, 'learning.db')
+        store = SqliteStore(db_path, app)
+        try:
+            store.import_json(base_dir, bank=bank, attempts_name=attempts_name,
+                              legacy_scores_newest_first=legacy_scores_newest_first)
+        except Exception:
+            pass
+        return store
+    return JournalStore(base_dir, app, bank=bank, scores_keep=scores_keep, attempts_name=attempts_name,
+                        legacy_scores_newest_first=legacy_scores_newest_first)
+
+
+def main(argv=None):
+    """python -m learning_common.storage <db> <app> <app_dir> [attempts_name]: import JSON files into SQLite."""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 3:
+        print('usage: python -m learning_common.storage <db> <app> <app_dir> [attempts_name]')
+        return 2
+    db_path, app, app_dir = argv[:3]
+    attempts_name = argv[3] if len(argv) > 3 else 'attempts'
+    bank = None
+    try:
+        from .question_bank import get_bank
+        bank = get_bank(os.path.join(app_dir, 'questions.json'))
+    except Exception:
+        pass
+    store = SqliteStore(db_path, app)
+    print('imported', store.import_json(app_dir, bank=bank, attempts_name=attempts_name), 'records')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Word index over a study guide, for search-as-you-type in the Study tabs.
+
+StudyIndex maps every lowercase word of the text to the (line, column)
+positions where it starts, packed two ints at a time in an array so a
+multi-megabyte guide costs a few bytes per word. Lines are added in
+chunks (add_lines) so a Tk app can build the index across several event
+loop turns; find() only works once finish() has sorted the vocabulary.
+
+find(query) returns the case-insensitive occurrences of query that start
+at the start of a word: the words of the index beginning with the
+query's first word give the candidate positions, and each candidate is
+checked against the stored line. "ip add" therefore finds "ip address"
+and "IP ADDRESS" but not "vip address". A query that does not start with
+a word character ("/24", "#") is answered by scanning the lines.
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+WORD_RE = re.compile(r'\w+')
+
+
+class StudyIndex:
+    """Word -> (line, column) positions over the lines of one text; lines are 1-based
+    and columns 0-based, as in Tk text indices."""
+
+    def __init__(self):
+        self.lines = []             # lowercase lines
+        self.positions = {}         # word -> array of line, column pairs
+        self.vocabulary = None      # sorted words, set by finish()
+
+    @classmethod
+    def build(cls, text):
+        """Index of text in one go (for small texts and tests)."""
+        index = cls()
+        index.add_lines(text.split('\n'))
+        return index.finish()
+
+    @property
+    def complete(self):
+        return self.vocabulary is not None
+
+    def add_lines(self, lines):
+        """Index the next lines of the text."""
+        positions = self.positions
+        for line in lines:
+            low = line.lower()
+            self.lines.append(low)
+            number = len(self.lines)
+            for m in WORD_RE.finditer(low):
+                found = positions.get(m.group())
+                if found is None:
+                    found = positions[m.group()] = array('I')
+                found.append(number)
+                found.append(m.start())
+
+    def finish(self):
+        self.vocabulary = sorted(self.positions)
+        return self
+
+    def _words(self, prefix):
+        vocab = self.vocabulary
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            yield vocab[i]
+            i += 1
+
+    def find(self, query):
+        """Sorted (line, column) starts of query; it spans len(query) characters."""
+        query = query.lower()
+        if not query.strip():
+            return []
+        m = WORD_RE.match(query)
+        if m is None:
+            return self._scan(query)
+        first = m.group()
+        # a word followed by more text must be the whole word and the rest is checked
+        # against the line; a query that is a single word matches as a prefix
+        more = m.end() < len(query)
+        lines = self.lines
+        found = []
+        for word in [first] if more else self._words(first):
+            pairs = self.positions.get(word, ())
+            for i in range(0, len(pairs), 2):
+                line, col = pairs[i], pairs[i + 1]
+                if not more or lines[line - 1].startswith(query, col):
+                    found.append((line, col))
+        found.sort()
+        return found
+
+    def _scan(self, query):
+        found = []
+        for number, line in enumerate(self.lines, start=1):
+            col = line.find(query)
+            while col != -1:
+                found.append((number, col))
+                col = line.find(query, col + len(query))
+        return found
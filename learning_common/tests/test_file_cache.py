@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+from learning_common.file_cache import CacheEntry, CachedBuild, CachedFile, load_json
+from learning_common.review import ReviewList
+
+
+def test_serves_cached_body_until_file_changes(tmp_path):
+    path = tmp_path / 'components.json'
+    path.write_text(json.dumps([{'id': 'a'}]), encoding='utf-8')
+    loads = []
+
+    def load(p):
+        loads.append(p)
+        return load_json(p)
+
+    cache = CachedFile(str(path), load, default=[], check_interval=0)
+    assert cache.get() == [{'id': 'a'}]
+    assert json.loads(cache.body()) == [{'id': 'a'}]
+    assert cache.body() is cache.body()
+    assert len(loads) == 1
+
+    # another writer replaces the file: new inode, so the cache reloads
+    tmp = tmp_path / 'new.json'
+    tmp.write_text(json.dumps([{'id': 'b'}]), encoding='utf-8')
+    os.replace(tmp, path)
+    assert cache.get() == [{'id': 'b'}]
+    assert len(loads) == 2
+
+
+def test_store_updates_cache_without_reload(tmp_path):
+    path = tmp_path / 'components.json'
+    cache = CachedFile(str(path), load_json, default=[], check_interval=0)
+    assert cache.get() == []
+    cache.store([{'id': 'c'}])
+    assert json.loads(path.read_text(encoding='utf-8')) == [{'id': 'c'}]
+    assert json.loads(cache.body()) == [{'id': 'c'}]
+
+
+def test_missing_or_bad_file_uses_default(tmp_path):
+    path = tmp_path / 'x.json'
+    path.write_text('{not json', encoding='utf-8')
+    assert CachedFile(str(path), load_json, default=[]).get() == []
+    assert CachedFile(str(tmp_path / 'missing.json'), load_json, default='').get() == ''
+
+
+def test_review_list_refreshes_after_external_write(tmp_path):
+    path = tmp_path / 'review_list.json'
+    review = ReviewList(str(path))
+    review.add('q1')
+    other = ReviewList(str(path))
+    other.add('q2')
+    review.refresh()
+    assert review.ids == ['q1', 'q2']
+
+
+def test_etag_and_compressed_variants(tmp_path):
+    import gzip
+    path = tmp_path / 'questions.json'
+    path.write_text(json.dumps([{'question': 'What is a NIC?' * 20}] * 20), encoding='utf-8')
+    cache = CachedFile(str(path), load_json, check_interval=0)
+    entry = cache.entry()
+    assert entry.etag() == CachedFile(str(path), load_json).entry().etag()
+    encoding, payload = entry.encoded({'gzip'})
+    assert encoding == 'gzip' and entry.etag(encoding) != entry.etag()
+    assert gzip.decompress(payload) == entry.body
+    assert entry.encoded(set()) == (None, entry.body)
+    cache.store([])
+    assert cache.entry().etag() != entry.etag()
+
+
+def test_cached_build_rebuilds_when_a_source_changes(tmp_path):
+    a, b = tmp_path / 'a.txt', tmp_path / 'b.txt'
+    a.write_text('1', encoding='utf-8')
+    builds = []
+
+    def build():
+        builds.append(1)
+        return CacheEntry(None, body=a.read_bytes() + (b.read_bytes() if b.exists() else b''))
+
+    cache = CachedBuild(build, lambda: [str(a), str(b)], check_interval=0)
+    assert cache.entry().body == b'1'
+    assert cache.entry().body == b'1' and len(builds) == 1
+    b.write_text('22', encoding='utf-8')
+    assert cache.entry().body == b'122' and len(builds) == 2
@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+from learning_common.journal import Journal
+
+
+def test_append_and_tail(tmp_path):
+    j = Journal(str(tmp_path / 'scores.jsonl'))
+    for i in range(5):
+        assert j.append({'score': i}) == i + 1
+    assert [r['score'] for r in j.records()] == [0, 1, 2, 3, 4]
+    assert [r['score'] for r in j.tail(2)] == [4, 3]
+    assert [r['score'] for r in j.tail(2, offset=3)] == [1, 0]
+    j.close()
+    assert Journal(str(tmp_path / 'scores.jsonl')).count() == 5
+
+
+def test_tail_spans_blocks(tmp_path, monkeypatch):
+    import learning_common.journal as journal
+    monkeypatch.setattr(journal, '_BLOCK', 16)
+    j = Journal(str(tmp_path / 'a.jsonl'))
+    j.extend([{'n': i, 'pad': 'x' * (i % 7)} for i in range(50)])
+    assert [r['n'] for r in j.tail(50)] == list(range(49, -1, -1))
+
+
+def test_torn_last_line_is_skipped_and_terminated(tmp_path):
+    path = tmp_path / 'attempts.jsonl'
+    path.write_bytes(b'{"ok":true}\n{"ok":fa')
+    j = Journal(str(path))
+    assert j.records() == [{'ok': True}]
+    j.append({'ok': False})
+    assert j.records() == [{'ok': True}, {'ok': False}]
+
+
+def test_compaction_keeps_recent_records(tmp_path):
+    path = tmp_path / 'scores.jsonl'
+    j = Journal(str(path), keep=3, compact_slack=2)
+    for i in range(6):
+        j.append({'score': i})
+    # the sixth append crossed keep + slack and triggered an atomic rewrite
+    assert [r['score'] for r in j.records()] == [3, 4, 5]
+    assert j.count() == 3
+    assert not [p for p in os.listdir(tmp_path) if '.tmp' in p]
+
+
+def test_imports_legacy_newest_first_file(tmp_path):
+    legacy = tmp_path / 'scores.json'
+    legacy.write_text(json.dumps([{'score': 2}, {'score': 1}]), encoding='utf-8')
+    j = Journal(str(tmp_path / 'scores.jsonl'), legacy_path=str(legacy), legacy_newest_first=True)
+    assert [r['score'] for r in j.tail(10)] == [2, 1]
+    assert not legacy.exists()
+    assert (tmp_path / 'scores.json.bak').exists()
+    j.clear()
+    assert j.records() == []
+
+
+def test_counting_reads_only_what_other_writers_appended(tmp_path, monkeypatch):
+    import learning_common.journal as journal
+    path = str(tmp_path / 'shared.jsonl')
+    a, b = Journal(path), Journal(path)
+    a.extend([{'n': i} for i in range(500)])
+    assert b.count() == 500
+    decoded = []
+    real_decode = journal._decode
+    monkeypatch.setattr(journal, '_decode', lambda line: decoded.append(line) or real_decode(line))
+    for i in range(20):
+        a.append({'a': i})
+        assert b.append({'b': i}) == 500 + 2 * (i + 1)
+    # each append decodes only the one record the other writer added since, never the history
+    assert len(decoded) == 2 * 20 - 1
+    a.compact()
+    a.clear()
+    a.append({'after': 'clear'})
+    assert b.count() == 1 and b.append({'b': 'again'}) == 2
+    a.close()
+    b.close()
@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+from learning_common.journal import Journal
+from learning_common.review import ReviewList
+
+
+def _append_many(path, worker, n, keep):
+    j = Journal(path, keep=keep, compact_slack=5)
+    for i in range(n):
+        j.append({'worker': worker, 'i': i})
+    j.close()
+
+
+def _review_many(path, worker, n):
+    review = ReviewList(path)
+    for i in range(n):
+        review.add(f'w{worker}-{i}')
+
+
+def _run_processes(target, args_list):
+    ctx = multiprocessing.get_context('spawn')
+    procs = [ctx.Process(target=target, args=args) for args in args_list]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+
+
+def test_journal_appends_from_threads_and_processes(tmp_path):
+    path = str(tmp_path / 'attempts.jsonl')
+    threads = [threading.Thread(target=_append_many, args=(path, f't{w}', 50, None)) for w in range(4)]
+    for t in threads:
+        t.start()
+    _run_processes(_append_many, [(path, f'p{w}', 50, None) for w in range(3)])
+    for t in threads:
+        t.join()
+    recs = Journal(path).records()
+    assert len(recs) == 350
+    assert len({(r['worker'], r['i']) for r in recs}) == 350
+
+
+def test_compaction_in_another_process_loses_nothing_recent(tmp_path):
+    path = str(tmp_path / 'scores.jsonl')
+    _run_processes(_append_many, [(path, f'p{w}', 40, 20) for w in range(3)])
+    j = Journal(path)
+    assert j.count() <= 25
+    assert j.tail(1)[0]['i'] == 39
+
+
+def test_review_adds_from_processes(tmp_path):
+    path = str(tmp_path / 'review_list.json')
+    _run_processes(_review_many, [(path, w, 30) for w in range(3)])
+    review = ReviewList(path)
+    assert len(review) == 90
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import sys
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+from learning_common.question_bank import QuestionBank, get_bank, question_id, save_ids
+
+
+SAMPLE = [
+    {'difficulty': 'easy', 'question': 'Q1', 'choices': ['a', 'b'], 'answer': 'a'},
+    {'difficulty': 'easy', 'question': 'Q2', 'type': 'text', 'answer': 'x'},
+    {'difficulty': 'hard', 'question': 'Q3', 'choices': ['a', 'b'], 'answer': 'b'},
+    {'id': 'q4', 'difficulty': 'medium', 'prompt': 'Wire it', 'type': 'wiring'},
+    'not a question',
+]
+
+
+def test_indexes_by_difficulty_and_type():
+    bank = QuestionBank(SAMPLE)
+    assert len(bank) == 4
+    assert bank.count('easy') == 2
+    assert bank.count('all') == 4
+    assert bank.count(qtype='mcq') == 2
+    assert [q['question'] for q in bank.pool('easy', 'text')] == ['Q2']
+    assert bank.pool('missing') == []
+
+
+def test_stable_ids():
+    questions = [dict(q) for q in SAMPLE[:4]]
+    bank = QuestionBank(questions)
+    q3 = bank.find('HARD', '  q3 ')
+    assert q3['answer'] == 'b'
+    assert q3['id'] == question_id({'difficulty': 'hard', 'question': 'Q3'})
+    assert bank.get(q3['id']) is q3
+    assert bank.get('q4')['prompt'] == 'Wire it'
+    # IDs are content hashes, so a fresh load of the same bank agrees
+    assert QuestionBank([dict(q) for q in SAMPLE[:4]]).get(q3['id'])['question'] == 'Q3'
+    assert bank.resolve([q3['id'], 'nope', 'q4']) == [q3, questions[3]]
+
+
+def test_sample_is_capped_and_unique():
+    bank = QuestionBank(SAMPLE)
+    picked = bank.sample(10, difficulty='easy', rng=random.Random(1))
+    assert len(picked) == 2
+    assert {q['question'] for q in picked} == {'Q1', 'Q2'}
+
+
+def test_get_bank_caches_until_file_changes(tmp_path):
+    path = tmp_path / 'questions.json'
+    path.write_text(json.dumps({'questions': SAMPLE[:2]}), encoding='utf-8')
+    first = get_bank(str(path))
+    assert get_bank(str(path)) is first
+    path.write_text(json.dumps(SAMPLE[:3]), encoding='utf-8')
+    os.utime(path, ns=(1, 1))
+    second = get_bank(str(path))
+    assert second is not first
+    assert len(second) == 3
+
+
+def test_repo_banks_load():
+    for app_dir in ('Routing_Learning', 'DNS_learning_game', 'DHCP_learning_game',
+                    'Web_Security_Learning', 'Cisco_Admin_game', 'Hardware_Learning'):
+        bank = get_bank(os.path.join(ROOT, app_dir, 'questions.json'))
+        assert len(bank) > 0
+
+
+def test_save_ids_keeps_the_file_layout(tmp_path):
+    path = tmp_path / 'questions.json'
+    compact = '[\n  {"difficulty": "easy", "question": "Q1"},\n  {"id": "q2", "question": "Q2 {\\"x\\": [1]}"},\n  "x"\n]\n'
+    path.write_text(compact, encoding='utf-8')
+    q1 = question_id({'difficulty': 'easy', 'question': 'Q1'})
+    assert save_ids(str(path)) == 1
+    assert path.read_text(encoding='utf-8') == compact.replace('{"difficulty"', f'{{"id": "{q1}", "difficulty"')
+    assert save_ids(str(path)) == 0
+
+    nested = {'title': 'bank', 'other': [{'question': 'not this one'}],
+              'questions': [{'difficulty': 'hard', 'question': 'Q3', 'choices': ['a', 'b']}]}
+    path.write_text(json.dumps(nested, indent=2), encoding='utf-8')
+    assert save_ids(str(path)) == 1
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['questions'][0]['id'] == question_id({'difficulty': 'hard', 'question': 'Q3'})
+    assert saved['other'] == nested['other']
+    assert '{\n      "id": ' in path.read_text(encoding='utf-8')
+
+
+def test_repo_banks_store_their_ids():
+    for app_dir in ('Routing_Learning', 'DNS_learning_game', 'DHCP_learning_game',
+                    'Web_Security_Learning', 'Cisco_Admin_game', 'Hardware_Learning'):
+        with open(os.path.join(ROOT, app_dir, 'questions.json'), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        questions = data['questions'] if isinstance(data, dict) else data
+        assert all(q.get('id') for q in questions)
@@ -0,0 +1,66 @@
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+from learning_common.question_bank import QuestionBank, get_bank, save_ids
+from learning_common.review import ReviewList, migrate_entries
+
+
+def make_bank():
+    return QuestionBank([
+        {'difficulty': 'easy', 'question': 'What is RIP?', 'answer': 'a'},
+        {'id': 'ospf-1', 'difficulty': 'hard', 'question': 'What is an ABR?', 'answer': 'b'},
+    ])
+
+
+def test_migrates_text_keyed_file(tmp_path):
+    bank = make_bank()
+    path = tmp_path / 'review_list.json'
+    path.write_text(json.dumps([
+        {'difficulty': 'easy', 'question': 'What is RIP?'},
+        {'difficulty': 'hard', 'question': 'What is an ABR?'},
+        {'difficulty': 'easy', 'question': 'What is RIP?'},
+    ]), encoding='utf-8')
+    review = ReviewList(str(path), bank)
+    rip = bank.find('easy', 'What is RIP?')
+    assert review.ids == [rip['id'], 'ospf-1']
+    assert json.loads(path.read_text(encoding='utf-8')) == [rip['id'], 'ospf-1']
+    assert [q['answer'] for q in review.resolve(bank)] == ['a', 'b']
+
+
+def test_migration_without_bank_recomputes_hash():
+    bank = make_bank()
+    ids, changed = migrate_entries([{'difficulty': 'easy', 'question': 'What is RIP?'}])
+    assert changed
+    assert bank.get(ids[0])['question'] == 'What is RIP?'
+
+
+def test_add_and_clear(tmp_path):
+    bank = make_bank()
+    path = tmp_path / 'review_list.json'
+    review = ReviewList(str(path))
+    assert review.add(bank.questions[0])
+    assert not review.add(bank.questions[0]['id'])
+    assert len(ReviewList(str(path))) == 1
+    review.clear()
+    assert len(review) == 0
+    assert not path.exists()
+
+
+def test_review_entry_survives_rewording(tmp_path):
+    questions = tmp_path / 'questions.json'
+    questions.write_text(json.dumps([{'difficulty': 'easy', 'question': 'What is RIP?', 'answer': 'a'}]),
+                         encoding='utf-8')
+    save_ids(str(questions))
+    review = ReviewList(str(tmp_path / 'review_list.json'))
+    review.add(get_bank(str(questions)).questions[0])
+
+    data = json.loads(questions.read_text(encoding='utf-8'))
+    data[0].update(difficulty='medium', question='What does RIP use as its metric?')
+    questions.write_text(json.dumps(data), encoding='utf-8')
+    bank = get_bank(str(questions), reload=True)
+    assert [q['question'] for q in review.resolve(bank)] == ['What does RIP use as its metric?']
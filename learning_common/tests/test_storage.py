@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+from learning_common.question_bank import QuestionBank
+from learning_common.storage import JournalStore, SqliteStore, open_store
+
+
+def make_bank():
+    return QuestionBank([
+        {'difficulty': 'easy', 'question': 'What is RIP?', 'answer': 'a'},
+        {'id': 'ospf-1', 'difficulty': 'hard', 'question': 'What is an ABR?', 'answer': 'b'},
+    ])
+
+
+@pytest.fixture(params=['journal', 'sqlite'])
+def store(request, tmp_path, monkeypatch):
+    monkeypatch.delenv('LEARNING_DB', raising=False)
+    s = open_store(str(tmp_path), 'test', bank=make_bank(), backend=request.param)
+    yield s
+    s.close()
+
+
+def test_scores_are_paged_newest_first(store):
+    for i in range(25):
+        store.add_score({'score': i})
+    assert store.score_count() == 25
+    assert [r['score'] for r in store.scores(limit=3)] == [24, 23, 22]
+    assert [r['score'] for r in store.scores(limit=3, offset=23)] == [1, 0]
+    store.clear_scores()
+    assert store.score_count() == 0
+
+
+def test_attempt_filters(store):
+    store.record_attempt({'question_id': 'q1', 'user': 'ann', 'ok': True})
+    total = store.record_attempts([
+        {'question_id': 'q2', 'user': 'bob', 'ok': False},
+        {'question_id': 'q1', 'user': 'bob', 'ok': False},
+    ])
+    assert total == 3
+    assert store.attempt_count(question_id='q1') == 2
+    assert [a['user'] for a in store.attempts(question_id='q1')] == ['bob', 'ann']
+    assert [a['question_id'] for a in store.attempts(user='bob', limit=1)] == ['q1']
+
+
+def test_review_by_question_or_id(store):
+    bank = make_bank()
+    assert store.add_review(bank.questions[0])
+    assert not store.add_review(bank.questions[0]['id'])
+    assert store.add_review('ospf-1')
+    assert store.review_ids() == [bank.questions[0]['id'], 'ospf-1']
+    assert store.review_ids(limit=1, offset=1) == ['ospf-1']
+    assert store.has_review('ospf-1')
+    store.clear_review()
+    assert store.review_count() == 0
+
+
+def test_scores_keep_bounds_journal_store(tmp_path):
+    s = JournalStore(str(tmp_path), 'test', scores_keep=5)
+    for i in range(8):
+        s.add_score({'score': i})
+    assert s.score_count() == 5
+    assert [r['score'] for r in s.scores(limit=10, offset=3)] == [4, 3]
+    s.close()
+
+
+def test_sqlite_imports_json_once(tmp_path):
+    (tmp_path / 'scores.json').write_text(json.dumps([{'score': 2}, {'score': 1}]), encoding='utf-8')
+    (tmp_path / 'attempts.jsonl').write_text('{"question_id": "q1", "ok": true}\n{"bad\n', encoding='utf-8')
+    (tmp_path / 'review_list.json').write_text(json.dumps([
+        {'difficulty': 'hard', 'question': 'What is an ABR?'}]), encoding='utf-8')
+    db = str(tmp_path / 'learning.db')
+    s = SqliteStore(db, 'test')
+    assert s.import_json(str(tmp_path), bank=make_bank()) == 4
+    assert s.import_json(str(tmp_path), bank=make_bank()) == 0
+    assert [r['score'] for r in s.scores()] == [2, 1]
+    assert s.attempt_count(question_id='q1') == 1
+    assert s.review_ids() == ['ospf-1']
+    s.close()
+
+
+def test_batch_attempts_add_wrong_answers_to_review(store):
+    total = store.record_attempts([
+        {'question_id': 'q1', 'ok': False},
+        {'question_id': 'q2', 'ok': True},
+        {'question_id': 'q3', 'ok': False},
+    ], review=['q1', 'q3', 'q1'])
+    assert total == 3
+    assert store.review_ids() == ['q1', 'q3']
+    assert store.add_reviews(['q3', 'q4']) == 1
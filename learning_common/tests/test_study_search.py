@@ -0,0 +1,155 @@
+import os
+import sys
+
+BASE_DIR = os.path.dirname(__file__)
+ROOT = os.path.abspath(os.path.join(BASE_DIR, '..', '..'))
+sys.path.insert(0, ROOT)
+
+from learning_common import tk_study_search
+from learning_common.study_index import StudyIndex
+from learning_common.tk_study_search import StudySearch
+
+GUIDE = """# Routing
+Use `ip route 0.0.0.0 0.0.0.0 10.0.0.1` for a default route.
+Routers learn routes; IP ROUTING must be on.
+vip address and ip address differ.
+Mask /24 and /30."""
+
+
+class FakeText:
+    """The part of the tk.Text API StudySearch uses; highlights are kept per character."""
+
+    def __init__(self):
+        self.tags = {}
+        self.jobs = {}
+        self.calls = 0
+        self.seen = None
+
+    def _chars(self, first, last):
+        line, col = map(int, first.split('.'))
+        if last == 'end':
+            return {c for c in self.tags.get('*', ())}
+        end = int(last.split('.')[1])
+        return {(line, c) for c in range(col, end)}
+
+    def tag_configure(self, tag, **options):
+        pass
+
+    def tag_raise(self, tag):
+        pass
+
+    def tag_add(self, tag, first, last):
+        self.calls += 1
+        self.tags.setdefault(tag, set()).update(self._chars(first, last))
+
+    def tag_remove(self, tag, first, last):
+        self.calls += 1
+        if last == 'end':
+            self.tags[tag] = set()
+        else:
+            self.tags.setdefault(tag, set()).difference_update(self._chars(first, last))
+
+    def index(self, spec):
+        return '1.0'
+
+    def see(self, index):
+        self.seen = index
+
+    def after(self, ms, func, *args):
+        job = f'after#{len(self.jobs)}'
+        self.jobs[job] = (func, args)
+        return job
+
+    def after_cancel(self, job):
+        self.jobs.pop(job, None)
+
+    def run_job(self):
+        func, args = self.jobs.pop(next(iter(self.jobs)))
+        func(*args)
+
+    def run_jobs(self):
+        while self.jobs:
+            self.run_job()
+
+    def highlighted(self, tag='search'):
+        return sorted(self.tags.get(tag, ()))
+
+
+def spans(text):
+    """Highlighted characters grouped into (line, first column, length)."""
+    out = []
+    for line, col in text.highlighted():
+        if out and out[-1][0] == line and out[-1][1] + out[-1][2] == col:
+            out[-1] = (line, out[-1][1], out[-1][2] + 1)
+        else:
+            out.append((line, col, 1))
+    return out
+
+
+def test_find_matches_at_word_starts_ignoring_case():
+    index = StudyIndex.build(GUIDE)
+    assert index.find('route') == [(2, 8), (2, 54), (3, 0), (3, 14)]
+    assert index.find('ip r') == [(2, 5), (3, 22)]
+    # "vip address" does not start at a word boundary
+    assert index.find('IP Address') == [(4, 16)]
+    assert index.find('0.0.0.0 10') == [(2, 22)]
+    assert index.find('/2') == [(5, 5)]
+    assert index.find('ddress') == [] and index.find('  ') == []
+
+
+def test_typing_only_changes_the_ranges_that_differ():
+    text = FakeText()
+    search = StudySearch(text)
+    search.load(GUIDE)
+    search.search('ro')
+    assert spans(text) == [(1, 2, 2), (2, 8, 2), (2, 54, 2), (3, 0, 2), (3, 14, 2), (3, 25, 2)]
+    text.calls = 0
+    search.search('rou')
+    # one call per surviving range (it is extended) plus the current-match tag
+    assert spans(text) == [(1, 2, 3), (2, 8, 3), (2, 54, 3), (3, 0, 3), (3, 14, 3), (3, 25, 3)]
+    assert text.calls == 6 + 2
+    search.search('route')
+    assert spans(text) == [(2, 8, 5), (2, 54, 5), (3, 0, 5), (3, 14, 5)]
+    search.search('rou')
+    assert spans(text) == [(1, 2, 3), (2, 8, 3), (2, 54, 3), (3, 0, 3), (3, 14, 3), (3, 25, 3)]
+    search.search('mask')
+    assert spans(text) == [(5, 0, 4)]
+    search.clear()
+    assert spans(text) == [] and search.matches == []
+
+
+def test_current_match_and_status():
+    text = FakeText()
+    statuses = []
+    search = StudySearch(text, on_status=statuses.append)
+    search.load(GUIDE)
+    search.search('ip')
+    assert statuses[-1] == '1 of 3' and text.seen == '2.5'
+    search.next()
+    assert text.highlighted('search_current') == [(3, 22), (3, 23)] and statuses[-1] == '2 of 3'
+    search.previous()
+    search.previous()
+    assert statuses[-1] == '3 of 3'
+    search.search('nothing here')
+    assert statuses[-1] == 'No matches' and text.highlighted('search_current') == []
+
+
+def test_large_guides_are_indexed_and_highlighted_in_chunks(monkeypatch):
+    monkeypatch.setattr(tk_study_search, 'BUILD_CHUNK', 100)
+    monkeypatch.setattr(tk_study_search, 'TAG_CHUNK', 50)
+    text = FakeText()
+    statuses = []
+    search = StudySearch(text, on_status=statuses.append)
+    search.load('\n'.join(f'line {i} ospf area {i % 7}' for i in range(1000)))
+    search.search('ospf')
+    # nothing happens until the index is built; the query is then run
+    assert not search.index.complete and statuses[-1] == 'Indexing... 10%'
+    while not search.index.complete:
+        text.run_job()
+    assert statuses[-1] == '1 of 1000'
+    # the first chunk of highlights is applied at once, the rest on later turns
+    assert len(spans(text)) == 50 and len(text.jobs) == 1
+    # a new keystroke replaces the highlighting still pending
+    search.search('ospf area 3')
+    text.run_jobs()
+    assert spans(text) == [(i + 1, 6 + len(str(i)), 11) for i in range(1000) if i % 7 == 3]
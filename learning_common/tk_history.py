@@ -0,0 +1,66 @@
+"""Paged history list for the Tk apps' History tabs."""
+import tkinter as tk
+from tkinter import ttk
+
+
+class HistoryPager(ttk.Frame):
+    """Listbox showing one page of records with Newer/Older navigation.
+
+    fetch(limit, offset) returns records newest first, count() returns the
+    total, and fmt(record) turns a record into a listbox line. Only the
+    visible page is ever loaded.
+    """
+
+    def __init__(self, parent, fetch, count, fmt, page_size=20, height=15):
+        super().__init__(parent)
+        self.fetch = fetch
+        self.count = count
+        self.fmt = fmt
+        self.page_size = page_size
+        self.page = 0
+
+        self.listbox = tk.Listbox(self, height=height)
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+
+        nav = ttk.Frame(self)
+        nav.pack(fill=tk.X, pady=(4, 0))
+        self.newer_btn = ttk.Button(nav, text="< Newer", command=self.newer)
+        self.newer_btn.pack(side=tk.LEFT)
+        self.page_var = tk.StringVar(value="")
+        ttk.Label(nav, textvariable=self.page_var).pack(side=tk.LEFT, padx=8)
+        self.older_btn = ttk.Button(nav, text="Older >", command=self.older)
+        self.older_btn.pack(side=tk.LEFT)
+
+    def pages(self):
+        try:
+            total = self.count()
+        except Exception:
+            total = 0
+        return total, max(1, (total + self.page_size - 1) // self.page_size)
+
+    def refresh(self):
+        total, pages = self.pages()
+        self.page = min(self.page, pages - 1)
+        try:
+            records = self.fetch(self.page_size, self.page * self.page_size)
+        except Exception:
+            records = []
+        self.listbox.delete(0, tk.END)
+        for rec in records:
+            self.listbox.insert(tk.END, self.fmt(rec))
+        self.page_var.set(f"Page {self.page + 1}/{pages} ({total} total)")
+        self.newer_btn.state(["!disabled"] if self.page > 0 else ["disabled"])
+        self.older_btn.state(["!disabled"] if self.page < pages - 1 else ["disabled"])
+
+    def newer(self):
+        if self.page > 0:
+            self.page -= 1
+            self.refresh()
+
+    def older(self):
+        self.page += 1
+        self.refresh()
+
+    def reset(self):
+        self.page = 0
+        self.refresh()
@@ -0,0 +1,194 @@
+"""Search-as-you-type for the Tk apps' Study tabs.
+
+StudySearchBar is a row with a search entry, Previous/Next/Clear buttons
+and a match count, attached to the Text widget that shows the guide:
+
+    bar = StudySearchBar(frame, self.study_text, label='Search Study:')
+    bar.pack(fill=tk.X)
+    bar.load(content)
+
+load() builds a StudyIndex of the content a few thousand lines per event
+loop turn. Each keystroke then looks the query up in the index and only
+changes the highlights that differ from the previous query's: typing one
+more letter shortens the list of matches, so most ranges are extended
+rather than removed and added again. The tag changes themselves are also
+applied in chunks through after(), and a newer keystroke replaces the
+work still pending, so a query with tens of thousands of matches in a
+multi-megabyte guide never blocks the event loop for long.
+"""
+import tkinter as tk
+from bisect import bisect_left
+from tkinter import ttk
+
+from .study_index import StudyIndex
+
+BUILD_CHUNK = 5000      # lines indexed per event loop turn
+TAG_CHUNK = 500         # highlight ranges changed per event loop turn
+
+
+class StudySearch:
+    """Highlights the occurrences of a query in a Text widget using a StudyIndex.
+
+    on_status(text) is called with the match count (or indexing progress)
+    whenever it changes.
+    """
+
+    def __init__(self, text, tag='search', current_tag='search_current', on_status=None):
+        self.text = text
+        self.tag = tag
+        self.current_tag = current_tag
+        self.on_status = on_status or (lambda status: None)
+        text.tag_configure(tag, background='yellow')
+        text.tag_configure(current_tag, background='orange')
+        text.tag_raise(current_tag)
+        self.index = StudyIndex().finish()
+        self.query = ''
+        self.matches = []       # sorted (line, column) of the current query
+        self.current = -1
+        self._shown = {}        # (line, column) -> highlighted length, as in the widget
+        self._build_job = None
+        self._tag_job = None
+        self._lines = None
+
+    # --- index -------------------------------------------------------------------
+
+    def load(self, content):
+        """Index content (the text shown in the widget), a chunk of lines per event loop turn."""
+        for job in (self._build_job, self._tag_job):
+            if job is not None:
+                self.text.after_cancel(job)
+        self._tag_job = None
+        # the widget's text (and its tags) were replaced along with the content
+        self._shown = {}
+        self.matches = []
+        self.index = StudyIndex()
+        self._lines = content.split('\n')
+        self._build_step(0)
+
+    def _build_step(self, start):
+        end = start + BUILD_CHUNK
+        self.index.add_lines(self._lines[start:end])
+        if end < len(self._lines):
+            self.on_status(f'Indexing... {end * 100 // len(self._lines)}%')
+            self._build_job = self.text.after(1, self._build_step, end)
+            return
+        self._build_job = None
+        self._lines = None
+        self.index.finish()
+        self.search(self.query)
+
+    # --- highlighting ------------------------------------------------------------
+
+    def search(self, query):
+        """Highlight query's matches, replacing the previous query's, and show the first
+        match below the top of the view."""
+        self.query = query
+        if not self.index.complete:
+            return              # searched when the index is done
+        if self._tag_job is not None:
+            self.text.after_cancel(self._tag_job)
+            self._tag_job = None
+        self.matches = self.index.find(query)
+        length = len(query)
+        kept = [pos for pos in self.matches if pos in self._shown]
+        ops = []
+        if not kept and self._shown:
+            # nothing survives: one call clears every old range
+            self.text.tag_remove(self.tag, '1.0', tk.END)
+            self._shown = {}
+        else:
+            keep = set(kept)
+            ops.extend((pos, n, 0) for pos, n in self._shown.items() if pos not in keep)
+        for pos in self.matches:
+            old = self._shown.get(pos, 0)
+            if old != length:
+                ops.append((pos, old, length))
+        self._apply(ops, 0)
+        self.current = -1
+        if self.matches:
+            top = int(self.text.index('@0,0').split('.')[0])
+            self._select(bisect_left(self.matches, (top, 0)) % len(self.matches))
+        else:
+            self.text.tag_remove(self.current_tag, '1.0', tk.END)
+        self._status()
+
+    def _apply(self, ops, start):
+        """Move each range from its highlighted length to the new one; 0 means not highlighted."""
+        text, tag, shown = self.text, self.tag, self._shown
+        for (line, col), old, new in ops[start:start + TAG_CHUNK]:
+            if new > old:
+                text.tag_add(tag, f'{line}.{col + old}', f'{line}.{col + new}')
+            else:
+                text.tag_remove(tag, f'{line}.{col + new}', f'{line}.{col + old}')
+            if new:
+                shown[(line, col)] = new
+            else:
+                shown.pop((line, col), None)
+        start += TAG_CHUNK
+        self._tag_job = text.after(1, self._apply, ops, start) if start < len(ops) else None
+
+    def _select(self, i):
+        self.text.tag_remove(self.current_tag, '1.0', tk.END)
+        self.current = i
+        line, col = self.matches[i]
+        first, last = f'{line}.{col}', f'{line}.{col + len(self.query)}'
+        self.text.tag_add(self.current_tag, first, last)
+        self.text.see(first)
+
+    def _status(self):
+        if not self.query.strip():
+            self.on_status('')
+        elif not self.matches:
+            self.on_status('No matches')
+        else:
+            self.on_status(f'{self.current + 1} of {len(self.matches)}')
+
+    def next(self):
+        if self.matches:
+            self._select((self.current + 1) % len(self.matches))
+            self._status()
+
+    def previous(self):
+        if self.matches:
+            self._select((self.current - 1) % len(self.matches))
+            self._status()
+
+    def clear(self):
+        self.search('')
+
+
+class StudySearchBar(ttk.Frame):
+    """Search entry for a study Text widget: highlights as you type (from min_chars
+    characters), Enter/Shift+Enter step through the matches."""
+
+    def __init__(self, parent, text, label='Search:', width=40, min_chars=2):
+        super().__init__(parent)
+        self.min_chars = min_chars
+        self.status_var = tk.StringVar(value='')
+        self.search = StudySearch(text, on_status=self.status_var.set)
+        ttk.Label(self, text=label).pack(side=tk.LEFT)
+        self.query_var = tk.StringVar()
+        self.entry = ttk.Entry(self, textvariable=self.query_var, width=width)
+        self.entry.pack(side=tk.LEFT, padx=(6, 4))
+        ttk.Button(self, text='Previous', command=self.search.previous).pack(side=tk.LEFT)
+        ttk.Button(self, text='Next', command=self.find_next).pack(side=tk.LEFT, padx=4)
+        ttk.Button(self, text='Clear', command=lambda: self.query_var.set('')).pack(side=tk.LEFT)
+        ttk.Label(self, textvariable=self.status_var).pack(side=tk.LEFT, padx=8)
+        self.query_var.trace_add('write', lambda *args: self._changed())
+        self.entry.bind('<Return>', lambda e: self.find_next())
+        self.entry.bind('<Shift-Return>', lambda e: self.search.previous())
+
+    def load(self, content):
+        self.search.load(content)
+
+    def _changed(self):
+        query = self.query_var.get()
+        # a single character matches most of a guide; wait for the next one
+        self.search.search(query if len(query.strip()) >= self.min_chars else '')
+
+    def find_next(self):
+        query = self.query_var.get()
+        if query != self.search.query:
+            self.search.search(query)
+        else:
+            self.search.next()